@@ -1,13 +1,39 @@
 import os
-import win32com.client as win32
-from typing import List
+import time
+import queue
+import signal
+import sys
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import instrumentacion
+from instrumentacion import metrics
 
 # --- DIRECTORIO DE TRABAJO ---
-# ⚠️ CAMBIA ESTA RUTA POR LA QUE NECESITES
-TARGET_DIRECTORY = r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025" 
+# ⚠️ CAMBIA ESTA RUTA POR LA QUE NECESITES (o pasala como argumento, o en PEDIDOS_CARPETA)
+TARGET_DIRECTORY = os.environ.get("PEDIDOS_CARPETA", r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025")
 # La 'r' (raw string) asegura que las barras invertidas se traten correctamente.
 # -----------------------------
 
+# Motor COM: instancias de Excel por defecto (cada una es un EXCEL.EXE con su memoria)
+COM_WORKERS = 1
+# Motor COM: segundos máximos por archivo antes de dar por colgada la instancia de Excel
+COM_TIMEOUT = 120
+# Segundos máximos para que un proceso del pool tenga su instancia de Excel lista
+COM_START_TIMEOUT = 60
+# Intentos seguidos de iniciar Excel en un mismo proceso antes de darlo por perdido
+MAX_START_FAILURES = 3
+
+class ConversionResult(NamedTuple):
+    xls_path: str
+    status: str          # "convertido", "saltado" o "fallido"
+    seconds: float
+    error: Optional[str] = None
+
+
 def find_xls_files(root_dir: str) -> List[str]:
     """Busca recursivamente archivos .xls dentro del directorio raíz."""
     xls_files = []
@@ -19,82 +45,426 @@ def find_xls_files(root_dir: str) -> List[str]:
                 xls_files.append(full_path)
     return xls_files
 
-def convert_xls_to_xlsx(xls_path: str, excel_app, target_dir: str) -> bool:
+def xlsx_path_for(xls_path: str, target_dir: str) -> str:
+    """Ruta del .xlsx que corresponde a un .xls dentro del directorio destino."""
+    # Usamos os.path.basename para obtener solo el nombre del archivo original.
+    filename = os.path.basename(xls_path)
+    base_name = filename[:-4] # Quitar .xls
+    return os.path.join(target_dir, base_name + ".xlsx")
+
+def is_up_to_date(xls_path: str, xlsx_path: str) -> bool:
+    """True si el .xlsx ya existe y es más nuevo que su .xls de origen."""
+    return os.path.exists(xlsx_path) and os.path.getmtime(xlsx_path) >= os.path.getmtime(xls_path)
+
+def convert_xls_to_xlsx_python(xls_path: str, xlsx_path: str) -> None:
     """
-    Convierte un archivo .xls a .xlsx usando la aplicación de Excel, 
-    guardándolo en el directorio destino especificado.
+    Convierte un .xls a .xlsx sin Excel: lee con xlrd y escribe con openpyxl.
+    Copia los valores de todas las hojas (no el formato), que es lo que usan los pasos siguientes.
     """
+    import xlrd
+    import openpyxl
+
+    book = xlrd.open_workbook(xls_path)
+    workbook = openpyxl.Workbook(write_only=True)
+
+    for sheet in book.sheets():
+        ws = workbook.create_sheet(title=sheet.name)
+        for row_index in range(sheet.nrows):
+            row = []
+            for cell in sheet.row(row_index):
+                if cell.ctype == xlrd.XL_CELL_NUMBER:
+                    # Excel guarda todos los números como float: 1234.0 vuelve a ser 1234
+                    value = int(cell.value) if cell.value == int(cell.value) else cell.value
+                elif cell.ctype == xlrd.XL_CELL_DATE:
+                    value = xlrd.xldate_as_datetime(cell.value, book.datemode)
+                elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                    value = bool(cell.value)
+                elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                    value = None
+                else:
+                    value = cell.value
+                row.append(value)
+            ws.append(row)
+
+    workbook.save(xlsx_path)
+
+# ====================================================================
+# === MOTORES DE CONVERSIÓN ===
+# ====================================================================
+
+def _serve_jobs(worker_id: str, tasks, results, convert: Callable[[str, str], None],
+                excel_pid: Optional[int]) -> None:
+    """Bucle de un proceso del pool: avisa que está listo y convierte los archivos que recibe."""
+    results.put(("listo", worker_id, excel_pid))
+    while True:
+        job = tasks.get()
+        if job is None:
+            return
+        xls_path, xlsx_path = job
+        start = time.perf_counter()
+        try:
+            convert(xls_path, xlsx_path)
+            result = ConversionResult(xls_path, "convertido", time.perf_counter() - start)
+        except Exception as e:
+            result = ConversionResult(xls_path, "fallido", time.perf_counter() - start, str(e))
+        results.put(("resultado", worker_id, result))
+
+
+def _com_worker_main(worker_id: str, tasks, results) -> None:
+    """Proceso del pool COM: una instancia propia de Excel (DispatchEx) para todos sus archivos."""
+    import pythoncom
+    import win32process
+    import win32com.client as win32
+
+    pythoncom.CoInitialize()
+    # DispatchEx abre siempre una instancia nueva, no comparte la de otro proceso
+    excel = win32.DispatchEx("Excel.Application")
+    excel.Visible = False
+    excel.DisplayAlerts = False
+    # PID de EXCEL.EXE: si la instancia se cuelga, el proceso principal la termina
+    _, excel_pid = win32process.GetWindowThreadProcessId(excel.Hwnd)
+
+    def convert(xls_path: str, xlsx_path: str) -> None:
+        try:
+            workbook = excel.Workbooks.Open(xls_path)
+            # 51 es el código para el formato xlOpenXMLWorkbook (xlsx)
+            workbook.SaveAs(xlsx_path, FileFormat=51)
+            workbook.Close(SaveChanges=False)  # No guardar cambios en el .xls original
+        except Exception:
+            # Cerrar lo que haya quedado abierto para que la instancia sirva para el próximo archivo
+            for workbook in list(excel.Workbooks):
+                try:
+                    workbook.Close(SaveChanges=False)
+                except Exception:
+                    pass
+            raise
+
     try:
-        # 1. Calcular la nueva ruta de archivo .xlsx en el directorio destino
-        # Usamos os.path.basename para obtener solo el nombre del archivo original.
-        filename = os.path.basename(xls_path)
-        base_name = filename[:-4] # Quitar .xls
-        xlsx_filename = base_name + ".xlsx"
-        xlsx_path = os.path.join(target_dir, xlsx_filename)
-        
-        # 2. Abrir el archivo .xls (la ruta original)
-        print(f"   Abriendo: {filename}...")
-        workbook = excel_app.Workbooks.Open(xls_path)
-        
-        # 3. Guardar como formato .xlsx (FileFormat=51)
-        # 51 es el código para el formato xlOpenXMLWorkbook (xlsx)
-        print(f"   Guardando como: {xlsx_filename} en {target_dir}...")
-        workbook.SaveAs(xlsx_path, FileFormat=51)
-        
-        # 4. Cerrar el libro
-        workbook.Close(SaveChanges=False) # No guardar cambios en el .xls original
-        
-        print(f"   ✅ Convertido con éxito.")
-        return True
-    
+        _serve_jobs(worker_id, tasks, results, convert, excel_pid)
+    finally:
+        excel.Quit()
+        pythoncom.CoUninitialize()
+
+
+class _PoolWorker:
+    """Estado de un lugar del pool: su proceso actual, el archivo asignado y desde cuándo."""
+
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.generation = 0
+        self.process = None
+        self.tasks = None
+        self.ready = False
+        self.excel_pid: Optional[int] = None
+        self.job: Optional[Tuple[str, str]] = None
+        self.since = 0.0
+        self.start_failures = 0
+
+    @property
+    def worker_id(self) -> str:
+        return f"{self.slot}.{self.generation}"
+
+
+class ExcelWorkerPool:
+    """
+    N procesos, cada uno con su propia instancia de Excel, que reciben los archivos de una
+    cola central de a uno. Un archivo que tarda más de `timeout` segundos o un proceso que
+    termina inesperadamente se marcan como fallidos y el proceso (con su Excel) se reinicia.
+    """
+
+    def __init__(self, workers: int, timeout: float = COM_TIMEOUT,
+                 worker_main: Callable = _com_worker_main):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.worker_main = worker_main
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = None
+
+    def _start(self, worker: _PoolWorker) -> None:
+        worker.generation += 1
+        worker.tasks = self._ctx.Queue()
+        worker.ready, worker.excel_pid, worker.job = False, None, None
+        worker.since = time.perf_counter()
+        worker.process = self._ctx.Process(target=self.worker_main,
+                                           args=(worker.worker_id, worker.tasks, self._results), daemon=True)
+        worker.process.start()
+
+    def _stop(self, worker: _PoolWorker) -> None:
+        """Termina el proceso y su instancia de Excel (que es otro proceso y no muere con él)."""
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join(5)
+        if worker.excel_pid:
+            try:
+                os.kill(worker.excel_pid, signal.SIGTERM)
+            except OSError:
+                pass  # Excel ya se cerró
+
+    def _restart(self, worker: _PoolWorker) -> None:
+        self._stop(worker)
+        self.restarts += 1
+        self._start(worker)
+
+    def convert_many(self, jobs: List[Tuple[str, str]]) -> List[ConversionResult]:
+        pending = deque(jobs)
+        results: List[ConversionResult] = []
+        self._results = self._ctx.Queue()
+        pool = [_PoolWorker(slot) for slot in range(min(self.workers, len(jobs)))]
+        for worker in pool:
+            self._start(worker)
+
+        try:
+            while pool and (pending or any(w.job for w in pool)):
+                # Repartir los archivos pendientes entre los procesos libres
+                for worker in pool:
+                    if worker.ready and worker.job is None and pending:
+                        worker.job = pending.popleft()
+                        worker.since = time.perf_counter()
+                        worker.tasks.put(worker.job)
+
+                try:
+                    kind, worker_id, payload = self._results.get(timeout=0.2)
+                except queue.Empty:
+                    kind = None
+                worker = next((w for w in pool if w.worker_id == worker_id), None) if kind else None
+                if worker is not None:  # Los mensajes de un proceso ya reiniciado se descartan
+                    if kind == "listo":
+                        worker.ready, worker.excel_pid, worker.start_failures = True, payload, 0
+                    elif kind == "resultado":
+                        results.append(payload)
+                        self._print_result(payload)
+                        worker.job = None
+
+                now = time.perf_counter()
+                for worker in list(pool):
+                    if worker.job and now - worker.since > self.timeout:
+                        failed = ConversionResult(worker.job[0], "fallido", now - worker.since,
+                                                  f"tiempo agotado ({self.timeout:.0f} s); se reinicia Excel")
+                    elif worker.job and not worker.process.is_alive():
+                        failed = ConversionResult(worker.job[0], "fallido", now - worker.since,
+                                                  "el proceso de Excel terminó inesperadamente; se reinicia")
+                    elif not worker.ready and (not worker.process.is_alive() or now - worker.since > COM_START_TIMEOUT):
+                        # Excel no llegó a iniciar
+                        worker.start_failures += 1
+                        if worker.start_failures >= MAX_START_FAILURES:
+                            print(f"   ❌ No se pudo iniciar Excel en el proceso {worker.slot} "
+                                  f"({MAX_START_FAILURES} intentos); se descarta.")
+                            self._stop(worker)
+                            pool.remove(worker)
+                        else:
+                            self._restart(worker)
+                        continue
+                    else:
+                        continue
+                    results.append(failed)
+                    self._print_result(failed)
+                    self._restart(worker)
+        finally:
+            for worker in pool:
+                worker.tasks.put(None)
+            for worker in pool:
+                worker.process.join(30)
+                if worker.process.exitcode != 0:
+                    self._stop(worker)  # No cerró su Excel
+
+        # Sin procesos disponibles (Excel no inicia): el resto queda como fallido
+        results.extend(ConversionResult(xls_path, "fallido", 0.0, "no se pudo iniciar Excel")
+                       for xls_path, _ in pending)
+        return results
+
+    @staticmethod
+    def _print_result(result: ConversionResult) -> None:
+        if result.status == "convertido":
+            print(f"   ✅ {os.path.basename(result.xls_path)} convertido ({result.seconds:.2f} s)")
+        else:
+            print(f"   ❌ ERROR al procesar {os.path.basename(result.xls_path)}: {result.error}")
+
+
+class ComBackend:
+    """Conversión con Microsoft Excel vía COM (sólo Windows): un pool de instancias de Excel."""
+    name = "com"
+
+    def __init__(self, workers: int = 1, timeout: float = COM_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.restarts = 0
+
+    def convert_many(self, jobs: List[Tuple[str, str]]) -> List[ConversionResult]:
+        instances = max(1, min(self.workers, len(jobs)))
+        print(f"Iniciando {instances} instancias de Microsoft Excel (tiempo máximo por archivo: {self.timeout:.0f} s)...")
+        pool = ExcelWorkerPool(instances, self.timeout)
+        start = time.perf_counter()
+        results = pool.convert_many(jobs)
+        elapsed = time.perf_counter() - start
+        self.restarts = pool.restarts
+
+        converted = sum(1 for r in results if r.status == "convertido")
+        print(f"Aplicaciones de Excel cerradas. {converted} archivos en {elapsed:.1f} s "
+              f"({converted / elapsed * 60 if elapsed else 0:.1f} archivos/min), "
+              f"instancias reiniciadas: {pool.restarts}")
+        metrics.record("pool_excel", elapsed, filas=converted, instancias=instances, reinicios=pool.restarts)
+        return results
+
+
+def _convert_python_job(job: Tuple[str, str]) -> ConversionResult:
+    xls_path, xlsx_path = job
+    start = time.perf_counter()
+    try:
+        convert_xls_to_xlsx_python(xls_path, xlsx_path)
+        return ConversionResult(xls_path, "convertido", time.perf_counter() - start)
     except Exception as e:
-        print(f"   ❌ ERROR al procesar {os.path.basename(xls_path)}: {e}")
-        return False
+        return ConversionResult(xls_path, "fallido", time.perf_counter() - start, str(e))
 
-def main():
-    # Establecer el directorio raíz para la BÚSQUEDA de archivos .xls
-    root_directory = TARGET_DIRECTORY
-    
-    # El directorio para GUARDAR los archivos .xlsx es el mismo
-    save_directory = TARGET_DIRECTORY
-    
+
+class PythonBackend:
+    """Conversión en Python puro (xlrd → openpyxl), funciona en Linux. Reparte los archivos en un pool."""
+    name = "python"
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+
+    def convert_many(self, jobs: List[Tuple[str, str]]) -> List[ConversionResult]:
+        if self.workers <= 1:
+            results = [_convert_python_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(_convert_python_job, jobs))
+
+        for result in results:
+            if result.status == "convertido":
+                print(f"   ✅ {os.path.basename(result.xls_path)} convertido ({result.seconds:.2f} s)")
+            else:
+                print(f"   ❌ ERROR al procesar {os.path.basename(result.xls_path)}: {result.error}")
+        return results
+
+
+def get_backend(name: str, workers: Optional[int] = None, timeout: float = COM_TIMEOUT):
+    """
+    Devuelve el motor pedido; 'auto' usa Excel (COM) si está disponible y si no, Python.
+    Sin workers, COM usa COM_WORKERS instancias de Excel y Python un proceso por núcleo.
+    """
+    if name == "auto":
+        try:
+            import win32com.client  # noqa: F401
+            name = "com"
+        except ImportError:
+            name = "python"
+    if name == "com":
+        return ComBackend(workers or COM_WORKERS, timeout)
+    return PythonBackend(workers or os.cpu_count() or 1)
+
+# ====================================================================
+
+def convert_folder(root_directory: str, save_directory: str, backend_name: str = "auto",
+                   workers: Optional[int] = None, force: bool = False,
+                   timeout: float = COM_TIMEOUT, dry_run: bool = False) -> Optional[List[ConversionResult]]:
+    """
+    Convierte los .xls de root_directory (y subcarpetas) a .xlsx en save_directory,
+    salteando los que ya están al día. Devuelve el resultado de cada archivo o None si
+    el directorio no existe o no tiene .xls. Sin workers se usa el valor por defecto de
+    get_backend. Con dry_run sólo informa qué convertiría (no abre Excel ni escribe nada)
+    y devuelve None.
+    """
     # Asegurarse de que el directorio exista
     if not os.path.isdir(root_directory):
         print(f"---")
         print(f"❌ ERROR: El directorio '{root_directory}' no existe.")
-        return
+        return None
 
     print(f"Buscando archivos .xls en: {root_directory} (y subcarpetas)...")
-    xls_files = find_xls_files(root_directory)
-    
+    with metrics.stage("buscar_archivos") as etapa:
+        xls_files = find_xls_files(root_directory)
+        etapa["filas"] = len(xls_files)
+
     if not xls_files:
         print("---")
         print("⚠️ No se encontraron archivos .xls para convertir.")
-        return
+        return None
 
     print(f"Total de archivos .xls encontrados: {len(xls_files)}")
-    print("Iniciando aplicación de Microsoft Excel...")
 
-    # Inicializar la aplicación de Excel
-    excel = win32.Dispatch("Excel.Application")
-    excel.Visible = False 
-    excel.DisplayAlerts = False 
+    # Saltar los archivos cuyo .xlsx ya está actualizado
+    jobs = []
+    skipped = []
+    for xls_file in xls_files:
+        xlsx_file = xlsx_path_for(xls_file, save_directory)
+        if not force and is_up_to_date(xls_file, xlsx_file):
+            skipped.append(ConversionResult(xls_file, "saltado", 0.0))
+        else:
+            jobs.append((xls_file, xlsx_file))
 
-    try:
-        count = 0
-        for xls_file in xls_files:
-            # Pasamos el directorio donde debe GUARDAR el nuevo archivo
-            if convert_xls_to_xlsx(xls_file, excel, save_directory):
-                count += 1
-        
-        print("\n--- RESUMEN ---")
-        print(f"Conversión finalizada. Archivos convertidos con éxito: {count} de {len(xls_files)}")
-        print(f"Los nuevos archivos .xlsx se encuentran en: {save_directory}")
+    if skipped:
+        print(f"   {len(skipped)} archivos ya tienen su .xlsx actualizado (se saltan).")
 
-    finally:
-        # Es crucial cerrar la aplicación de Excel al finalizar
-        excel.Quit()
-        print("Aplicación de Excel cerrada.")
+    if dry_run:
+        print(f"🔎 Prueba (--dry-run): se convertirían {len(jobs)} archivos; no se escribió nada.")
+        for xls_file, _ in jobs[:20]:
+            print(f"   {os.path.relpath(xls_file, root_directory)}")
+        if len(jobs) > 20:
+            print("   ...")
+        return None
+
+    results = []
+    if jobs:
+        backend = get_backend(backend_name, workers, timeout)
+        print(f"Convirtiendo {len(jobs)} archivos con el motor '{backend.name}'...")
+        results = backend.convert_many(jobs)
+        for result in results:
+            metrics.record("convertir", result.seconds, archivo=os.path.basename(result.xls_path),
+                           estado=result.status, motor=backend.name)
+
+    return skipped + results
+
+def print_summary(results: List[ConversionResult], elapsed: float) -> None:
+    """Tiempos por archivo y resumen de convertidos / saltados / fallidos."""
+    converted = [r for r in results if r.status != "saltado"]
+    counts = {status: sum(1 for r in results if r.status == status)
+              for status in ("convertido", "saltado", "fallido")}
+
+    print("\n--- RESUMEN ---")
+    for result in sorted(converted, key=lambda r: r.seconds, reverse=True):
+        print(f"   {result.seconds:7.2f} s  {result.status:<10} {os.path.basename(result.xls_path)}")
+    print(f"Convertidos: {counts['convertido']} | Saltados (al día): {counts['saltado']} | "
+          f"Fallidos: {counts['fallido']} | Total: {len(results)} | Tiempo: {elapsed:.2f} s")
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Devuelve el código de salida: 0 si todo salió bien, 1 si falta la carpeta o falló algún archivo."""
+    parser = argparse.ArgumentParser(prog=prog, description="Convierte los .xls de la campaña a .xlsx.")
+    parser.add_argument("carpeta", nargs="?", default=TARGET_DIRECTORY,
+                        help="Carpeta de la campaña (por defecto PEDIDOS_CARPETA o TARGET_DIRECTORY).")
+    parser.add_argument("--backend", choices=["auto", "com", "python"], default="auto",
+                        help="Motor de conversión: Excel vía COM (Windows) o Python puro (xlrd + openpyxl).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos en paralelo: con el motor Python, procesos de conversión (por defecto "
+                             f"uno por núcleo); con COM, instancias de Excel, una por proceso (por defecto {COM_WORKERS}).")
+    parser.add_argument("--timeout", type=float, default=COM_TIMEOUT,
+                        help=f"Motor COM: segundos máximos por archivo; si se pasa, se reinicia esa instancia "
+                             f"de Excel (por defecto {COM_TIMEOUT}).")
+    parser.add_argument("--force", action="store_true",
+                        help="Convierte aunque el .xlsx ya exista y esté actualizado.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Sólo informa qué archivos convertiría, sin abrir Excel ni escribir nada.")
+    instrumentacion.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentacion.setup(args, "1_xls_xlsx")
+
+    # Establecer el directorio raíz para la BÚSQUEDA de archivos .xls
+    root_directory = args.carpeta
+
+    # El directorio para GUARDAR los archivos .xlsx es el mismo
+    save_directory = args.carpeta
+
+    start = time.perf_counter()
+    results = convert_folder(root_directory, save_directory, args.backend, args.workers, args.force,
+                             args.timeout, args.dry_run)
+    if results is None:
+        # Sin nada para convertir (o --dry-run); sólo es un error si la carpeta no existe
+        return 0 if os.path.isdir(root_directory) else 1
+
+    print_summary(results, time.perf_counter() - start)
+    print(f"Los nuevos archivos .xlsx se encuentran en: {save_directory}")
+    return 1 if any(result.status == "fallido" for result in results) else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
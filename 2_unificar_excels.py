@@ -1,19 +1,40 @@
-import pandas as pd
 import os
 import re
-from typing import Optional
+import io
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import functools
+import contextlib
+import collections
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import instrumentacion
+from archivo_unificado import COLUMNS_ORDER, OUTPUT_FORMATS, UnifiedWriter, extract_campania, write_unified
+from instrumentacion import metrics, peak_memory_mb
+
+# pandas se importa en las funciones que leen los archivos: --help y los errores en los
+# argumentos no pagan su arranque
+if TYPE_CHECKING:
+    import pandas as pd
 
 # === CONFIGURACIÓN ===
-# Carpeta de donde se leerán los archivos Excel
-FOLDER_CAMPAIGN = r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025"
+# Carpeta de donde se leerán los archivos Excel (o como argumento, o en PEDIDOS_CARPETA)
+FOLDER_CAMPAIGN = os.environ.get("PEDIDOS_CARPETA", r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025")
 # Nombre del archivo Excel de salida
 OUTPUT_FILE = f"{FOLDER_CAMPAIGN}_Unificado.xlsx"
+# Carpeta (dentro de la campaña) donde se guarda la caché por archivo de process_file
+CACHE_DIR_NAME = ".cache_unificar"
+CACHE_DIR = os.path.join(FOLDER_CAMPAIGN, CACHE_DIR_NAME)
+# Incrementar si cambia la lógica de process_file, para descartar las cachés viejas
+CACHE_VERSION = 2
 
-# Columnas finales esperadas en el DataFrame unificado (Orden final y nombres exactos)
-COLUMNS_ORDER = [
-    "Nro", "Cliente", "U. Ent.", "Falt.", "U. Ped", "P.V.P.", 
-    "Ofertas", "Extras", "Costo Rev.", "Bonif.", "Lider"
-]
+# Las columnas finales (COLUMNS_ORDER) se definen en archivo_unificado.py, compartido con los scripts de carga
 # Nombres que se asignarán a las primeras 10 columnas del Excel, por POSICIÓN FIJA.
 # CLAVE: Se salta el índice 2 y 3 para corregir el desplazamiento.
 FIXED_COLUMN_NAMES = {
@@ -30,40 +51,122 @@ FIXED_COLUMN_NAMES = {
 }
 
 
-def normalize_string(text: str) -> str:
-    """Limpia el string para buscar referencias robustas."""
+# ====================================================================
+# === DETECCIÓN DEL FORMATO DE LA HOJA ===
+# ====================================================================
+# Ubica la celda 'Líder :' y el encabezado 'N° Cli.' mirando sólo las primeras filas,
+# con una comparación sin acentos ni signos ('Nº' y 'N°' son lo mismo).
+
+# Filas superiores donde se buscan 'Líder :' y el encabezado
+LAYOUT_SCAN_ROWS = 20
+HEADER_KEY = "ncli"     # 'N° Cli.' / 'Nº Cli.' normalizado
+LEADER_KEY = "lider"    # 'Líder :' normalizado
+
+# Signo de grado y ordinal se quitan antes de normalizar (NFKD convierte 'º' en 'o')
+_STRIP_SIGNS = str.maketrans("", "", "°º")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_label(text) -> str:
+    """Texto de una celda en minúsculas, sin acentos y sólo con letras y números ('Nº Cli.' → 'ncli')."""
     if not isinstance(text, str):
         return ""
-    text = str(text).lower().strip()
-    text = text.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-    text = re.sub(r'[.,°\#\/\-\s]', '', text) 
-    return text
+    text = text.translate(_STRIP_SIGNS)
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _NON_ALNUM.sub("", text.lower())
+
+# Las etiquetas del encabezado se repiten en todos los archivos: se normalizan una sola vez
+_cached_label = functools.lru_cache(maxsize=4096)(normalize_label)
+
+
+class SheetLayout(NamedTuple):
+    header_row: int             # Fila de 'N° Cli.'
+    nro_col: int                # Columna de 'N° Cli.' (0 en el formato habitual)
+    leader_row: Optional[int]   # Fila de 'Líder :' (None si el archivo no la tiene)
+
+
+def _leader_value(df_raw: "pd.DataFrame", row: int) -> str:
+    # El número de líder está en la columna B, a la derecha de 'Líder :'
+    return str(df_raw.iat[row, 1]).strip() if df_raw.shape[1] > 1 else ""
+
+def _is_leader_row(df_raw: "pd.DataFrame", row: int) -> bool:
+    return LEADER_KEY in _cached_label(df_raw.iat[row, 0]) and bool(_leader_value(df_raw, row))
+
+def find_leader_row(df_raw: "pd.DataFrame", scan_rows: int = LAYOUT_SCAN_ROWS) -> Optional[int]:
+    """
+    Primera fila con 'Líder' en la columna A y un valor en la columna B.
+    Busca primero en las filas superiores y, sólo si no la encuentra, en el resto de la hoja.
+    """
+    for row in range(min(scan_rows, len(df_raw))):
+        if _is_leader_row(df_raw, row):
+            return row
+    for row in range(scan_rows, len(df_raw)):
+        # Sin caché: las filas de datos son casi todas distintas
+        if LEADER_KEY in normalize_label(df_raw.iat[row, 0]) and _leader_value(df_raw, row):
+            return row
+    return None
 
-def extract_lider_number(df_raw: pd.DataFrame) -> Optional[str]:
+def extract_lider_number(df_raw: "pd.DataFrame") -> Optional[str]:
     """Extrae el número de líder de la Columna B adyacente a 'Líder :'."""
-    try:
-        col_a = df_raw.iloc[:, 0].astype(str).str.upper()
-        # Buscar la fila que contiene 'LÍDER'
-        lider_row_index_list = col_a[col_a.apply(lambda x: 'LÍDER' in x)].index.tolist()
-        
-        if not lider_row_index_list:
-             return None
+    row = find_leader_row(df_raw)
+    return _leader_value(df_raw, row) if row is not None else None
 
-        lider_row_index = lider_row_index_list[0]
 
-        # Obtener el valor de la columna B (índice 1)
-        if df_raw.shape[1] > 1:
-            lider_nro = str(df_raw.iloc[lider_row_index, 1]).strip()
-            return lider_nro if lider_nro else None
-        else:
-            return None
+class LayoutDetector:
+    """
+    Detecta el formato de una hoja de líder (fila de 'Líder :', fila y columna del encabezado).
+    Recuerda los formatos ya vistos: los archivos exportados con la misma plantilla se
+    reconocen comprobando dos celdas, sin volver a recorrer las filas superiores.
+    """
 
-    except Exception as e:
-        print(f"     Error al extraer líder: {e}")
+    def __init__(self, scan_rows: int = LAYOUT_SCAN_ROWS):
+        self.scan_rows = scan_rows
+        self.templates: List[SheetLayout] = []
+        self.hits = 0
+        self.misses = 0
+
+    def _fits(self, df_raw: "pd.DataFrame", layout: SheetLayout) -> bool:
+        n_rows, n_cols = df_raw.shape
+        return (layout.header_row < n_rows and layout.nro_col < n_cols and layout.leader_row < n_rows
+                and _cached_label(df_raw.iat[layout.header_row, layout.nro_col]) == HEADER_KEY
+                and _is_leader_row(df_raw, layout.leader_row))
+
+    def _scan(self, df_raw: "pd.DataFrame") -> Optional[SheetLayout]:
+        top = df_raw.iloc[:self.scan_rows].to_numpy()
+        for row_index, row in enumerate(top):
+            for col_index, cell in enumerate(row):
+                if cell and _cached_label(cell) == HEADER_KEY:
+                    return SheetLayout(row_index, col_index, find_leader_row(df_raw, self.scan_rows))
         return None
 
-def process_file(file_path: str) -> Optional[pd.DataFrame]:
-    """Carga, procesa un archivo Excel forzando los nombres de columna por posición."""
+    def detect(self, df_raw: "pd.DataFrame") -> Optional[SheetLayout]:
+        """Devuelve el formato de la hoja, o None si no tiene el encabezado 'N° Cli.'."""
+        for i, layout in enumerate(self.templates):
+            if self._fits(df_raw, layout):
+                self.hits += 1
+                if i:
+                    # La plantilla más usada queda primera
+                    self.templates.insert(0, self.templates.pop(i))
+                return layout
+
+        self.misses += 1
+        layout = self._scan(df_raw)
+        if layout is not None and layout.leader_row is not None:
+            self.templates.insert(0, layout)
+        return layout
+
+
+# Un detector por proceso (cada proceso del pool arma su propia lista de plantillas)
+LAYOUT_DETECTOR = LayoutDetector()
+
+def process_file(file_path: str) -> Optional["pd.DataFrame"]:
+    """
+    Carga, procesa un archivo Excel forzando los nombres de columna por posición.
+    Acepta tanto el .xls original (leído con xlrd) como el .xlsx convertido.
+    """
+    import pandas as pd
+
     file_name = os.path.basename(file_path)
     print(f"-> Procesando: {file_name}")
 
@@ -74,24 +177,17 @@ def process_file(file_path: str) -> Optional[pd.DataFrame]:
         print(f"   ❌ Error leyendo el archivo: {e}")
         return None
 
-    # --- 1. Extracción del Número de Líder ---
-    lider_nro = extract_lider_number(df_raw)
-    
-    # --- 2. Identificación de la Fila de Encabezado (donde está 'N° Cli.') ---
-    header_row_index = -1
-    
-    for i in range(min(20, len(df_raw))): 
-        row = df_raw.iloc[i].astype(str).str.strip().tolist()
-        # Buscamos la fila que contiene 'Nro'
-        if any(normalize_string(c) in ['ncli', 'ncli'] for c in row):
-            header_row_index = i
-            break
-    
-    if header_row_index == -1:
+    # --- 1 y 2. Formato de la hoja: fila de 'Líder :' y fila de encabezado (donde está 'N° Cli.') ---
+    layout = LAYOUT_DETECTOR.detect(df_raw)
+
+    if layout is None:
         print(f"   Advertencia: No se encontró la fila de encabezado ('N° Cli.' o 'Nº Cli.'). Saltando.")
         return None
 
-    # --- 3. Re-leer el archivo, saltando las dos filas de encabezado ---
+    lider_nro = _leader_value(df_raw, layout.leader_row) if layout.leader_row is not None else None
+    header_row_index = layout.header_row
+
+    # --- 3. Recortar los datos del DataFrame ya cargado, saltando las dos filas de encabezado ---
     # La data real comienza TRES filas después del inicio (header_row_index + 2)
     data_start_row_index = header_row_index + 2 
 
@@ -99,17 +195,17 @@ def process_file(file_path: str) -> Optional[pd.DataFrame]:
         print("   Advertencia: La fila de datos está fuera de los límites del archivo. Saltando.")
         return None
 
-    try:
-        # header=None fuerza a Pandas a usar columnas numeradas (0, 1, 2, ...)
-        df_data = pd.read_excel(file_path, header=None, skiprows=data_start_row_index, dtype=str).fillna("")
-    except Exception as e:
-        print(f"   ❌ Error re-leyendo el archivo con el nuevo desplazamiento: {e}")
-        return None
+    # Se reutiliza la lectura inicial en lugar de volver a parsear el archivo: las columnas
+    # siguen numeradas (0, 1, 2, ...) y el índice se reinicia como lo haría una segunda lectura.
+    df_data = df_raw.iloc[data_start_row_index:].reset_index(drop=True)
     
     # --- 4. Asignación Forzada de Nombres de Columna ---
     # Asignar los nombres fijos a las columnas correctas, ignorando las columnas 2 y 3.
+    # Las posiciones se cuentan desde la columna de 'N° Cli.' (la primera, salvo que la hoja
+    # tenga columnas vacías agregadas a la izquierda).
     renames = {}
     for col_index, new_name in FIXED_COLUMN_NAMES.items():
+        col_index += layout.nro_col
         if col_index < df_data.shape[1]:
             renames[col_index] = new_name
             
@@ -141,58 +237,422 @@ def process_file(file_path: str) -> Optional[pd.DataFrame]:
     return df_final
 
 
-def main():
-    if not os.path.exists(FOLDER_CAMPAIGN):
-        print(f"❌ Error: La carpeta '{FOLDER_CAMPAIGN}' no existe. Créala y coloque los archivos .xlsx dentro.")
-        return
+class UnificationCache:
+    """
+    Caché por archivo de la salida de process_file.
+    Cada resultado se guarda como Parquet en CACHE_DIR; un índice JSON lo asocia a la
+    ruta del archivo con su tamaño, fecha de modificación y hash SHA-1 del contenido.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "indice.json")
+        self.index = self._load_index()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("archivos", {})
+
+    @staticmethod
+    def _sha1(file_path: str) -> str:
+        digest = hashlib.sha1()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load(self, file_path: str) -> Tuple[bool, Optional["pd.DataFrame"]]:
+        """Devuelve (True, resultado) si el archivo no cambió desde que se guardó en caché."""
+        import pandas as pd
+
+        key = os.path.abspath(file_path)
+        entry = self.index.get(key)
+        stat = os.stat(file_path)
+
+        if entry is None or entry["tamano"] != stat.st_size:
+            self.misses += 1
+            return False, None
+        if entry["mtime"] != stat.st_mtime:
+            # Fecha distinta: sólo es válido si el contenido es el mismo (p. ej. se volvió a copiar)
+            if self._sha1(file_path) != entry["sha1"]:
+                self.misses += 1
+                return False, None
+            entry["mtime"] = stat.st_mtime
+
+        start = time.perf_counter()
+        try:
+            df = None
+            if entry["parquet"] is not None:
+                df = pd.read_parquet(os.path.join(self.cache_dir, entry["parquet"]))
+                # Mismo tipo de índice de columnas que produce process_file
+                df.columns = pd.Index(df.columns, dtype=object)
+        except Exception:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        self.seconds_saved += entry["segundos"] - (time.perf_counter() - start)
+        print(f"-> Procesando: {os.path.basename(file_path)} (sin cambios, desde caché)")
+        return True, df
+
+    def store(self, file_path: str, df: Optional["pd.DataFrame"], seconds: float) -> None:
+        """Guarda el resultado de process_file (también si fue None, para no reintentar archivos inválidos)."""
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        parquet_name = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if df is not None:
+            parquet_name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".parquet"
+            df.to_parquet(os.path.join(self.cache_dir, parquet_name))
+        self.index[key] = {
+            "tamano": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha1": self._sha1(file_path),
+            "segundos": seconds,
+            "parquet": parquet_name,
+        }
+
+    def save(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "archivos": self.index}, f, indent=1)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.index = {}
+
+    def report(self) -> None:
+        print(f"   Caché: {self.hits} sin cambios, {self.misses} procesados. "
+              f"Tiempo ahorrado: {max(self.seconds_saved, 0.0):.2f} s")
+
+
+def _process_file_captured(file_path: str) -> Tuple[Optional["pd.DataFrame"], str, float]:
+    """
+    Ejecuta process_file capturando su salida, para que los avisos y errores de cada
+    archivo se impriman juntos (y en orden) aunque se procesen en otro proceso.
+    """
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buffer):
+        try:
+            df = process_file(file_path)
+        except Exception as e:
+            print(f"-> Procesando: {os.path.basename(file_path)}")
+            print(f"   ❌ Error inesperado: {e}")
+            df = None
+    return df, buffer.getvalue(), time.perf_counter() - start
+
+def iter_process_files(file_list: List[str], workers: int = 1,
+                       cache: Optional[UnificationCache] = None) -> Iterator[Tuple[str, Optional["pd.DataFrame"]]]:
+    """
+    Procesa los archivos y entrega (archivo, resultado) de a uno, en el orden de file_list,
+    sin acumular los resultados: con workers > 1 hay a lo sumo 2 * workers archivos en vuelo.
+    Con cache, los archivos sin cambios se cargan de la caché y los demás se guardan en ella.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    limit = 2 * workers if executor else 1
+    in_flight = collections.deque()
+
+    def finish(file_path: str, from_cache: bool, value) -> Optional["pd.DataFrame"]:
+        if from_cache:
+            return value
+        if executor:
+            df, log, seconds = value.result()
+            print(log, end="")
+        else:
+            df, seconds = value
+        # Los tiempos de los procesos del pool se registran acá, en el proceso principal
+        metrics.record("process_file", seconds, archivo=os.path.basename(file_path),
+                       filas=0 if df is None else len(df))
+        if cache is not None:
+            cache.store(file_path, df, seconds)
+        return df
+
+    try:
+        for file_path in file_list:
+            hit, df = False, None
+            if cache is not None:
+                with metrics.stage("leer_cache", archivo=os.path.basename(file_path)) as etapa:
+                    hit, df = cache.load(file_path)
+                    etapa.update(acierto=hit, filas=0 if df is None else len(df))
+
+            if hit:
+                in_flight.append((file_path, True, df))
+            elif executor:
+                in_flight.append((file_path, False, executor.submit(_process_file_captured, file_path)))
+            else:
+                start = time.perf_counter()
+                df = process_file(file_path)
+                in_flight.append((file_path, False, (df, time.perf_counter() - start)))
+
+            while len(in_flight) >= limit:
+                file_done, from_cache, value = in_flight.popleft()
+                yield file_done, finish(file_done, from_cache, value)
+
+        while in_flight:
+            file_done, from_cache, value = in_flight.popleft()
+            yield file_done, finish(file_done, from_cache, value)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.save()
+
+def process_files(file_list: List[str], workers: int = 1,
+                  cache: Optional[UnificationCache] = None) -> List["pd.DataFrame"]:
+    """
+    Procesa los archivos y devuelve los DataFrames válidos en el mismo orden que file_list.
+    Con workers > 1 reparte process_file en un pool de procesos.
+    Con cache, los archivos sin cambios se cargan de la caché y sólo se procesan los demás.
+    """
+    return [df for _, df in iter_process_files(file_list, workers, cache) if df is not None]
+
+
+def find_leader_files(folder: str, source: str = "auto") -> List[str]:
+    """
+    Lista los archivos de líder de la carpeta, ordenados por nombre.
+    source='xls' usa sólo los .xls originales, 'xlsx' sólo los convertidos y 'auto'
+    usa el .xls cuando existe (evita depender de 1_xls_xlsx.py) y el .xlsx para el resto.
+    """
+    by_stem: Dict[str, Dict[str, str]] = {}
+    for f in os.listdir(folder):
+        stem, ext = os.path.splitext(f)
+        ext = ext.lower()
+        if ext in (".xls", ".xlsx") and not f.startswith('~'):
+            by_stem.setdefault(stem, {})[ext] = os.path.join(folder, f)
+
+    file_list = []
+    for stem, paths in by_stem.items():
+        if source == "auto":
+            chosen = paths.get(".xls") or paths.get(".xlsx")
+        else:
+            chosen = paths.get(f".{source}")
+        if chosen:
+            file_list.append(chosen)
+
+    # Orden alfabético para que el resultado sea el mismo en cualquier sistema y con cualquier --workers
+    return sorted(file_list, key=os.path.basename)
+
 
-    file_list = [
-        os.path.join(FOLDER_CAMPAIGN, f) 
-        for f in os.listdir(FOLDER_CAMPAIGN) 
-        if f.lower().endswith(".xlsx") and not f.startswith('~')
-    ]
+def unify_campaign(folder: str, workers: int = 1, use_cache: bool = True,
+                   source: str = "auto") -> Optional["pd.DataFrame"]:
+    """
+    Procesa todos los archivos de líder de la carpeta y devuelve el DataFrame unificado
+    (columnas en el orden de COLUMNS_ORDER), o None si no se pudo extraer información.
+    """
+    import pandas as pd
+
+    if not os.path.exists(folder):
+        print(f"❌ Error: La carpeta '{folder}' no existe. Créala y coloque los archivos .xls/.xlsx dentro.")
+        return None
+
+    cache = UnificationCache(os.path.join(folder, CACHE_DIR_NAME)) if use_cache else None
+    with metrics.stage("buscar_archivos") as etapa:
+        file_list = find_leader_files(folder, source)
+        etapa["filas"] = len(file_list)
 
     if not file_list:
-        print(f"⚠️ No se encontraron archivos .xlsx en la carpeta '{FOLDER_CAMPAIGN}'.")
-        return
+        print(f"⚠️ No se encontraron archivos .xls/.xlsx en la carpeta '{folder}'.")
+        return None
 
     print(f"Se encontraron {len(file_list)} archivos para unificar.")
+    if workers > 1:
+        print(f"Procesando en paralelo con {workers} procesos.")
     
-    all_data = []
-    
-    for file_path in file_list:
-        df = process_file(file_path)
-        if df is not None:
-            all_data.append(df)
+    all_data = process_files(file_list, workers, cache)
+    if cache is not None:
+        cache.report()
             
     if not all_data:
         print("\n❌ Error: No se pudo extraer información de ningún archivo.")
-        return
+        return None
 
     # 1. Concatenar todos los DataFrames
-    df_unified = pd.concat(all_data, ignore_index=True)
+    with metrics.stage("concat") as etapa:
+        df_unified = pd.concat(all_data, ignore_index=True)
+        etapa["filas"] = len(df_unified)
     
     # 2. Filtrar y reordenar el DataFrame final
     existing_cols_in_order = [col for col in COLUMNS_ORDER if col in df_unified.columns]
     
     try:
-        df_unified = df_unified[existing_cols_in_order]
+        return df_unified[existing_cols_in_order]
     except KeyError as e:
         print(f"\n❌ ERROR CRÍTICO al reordenar columnas: Las columnas mapeadas no coinciden. {e}")
-        return
-    
+        return None
+
+
+def compact_frame(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Parte del archivo unificado en modo --stream: todas las columnas de COLUMNS_ORDER (las que
+    falten quedan vacías) y Lider como categoría, que ocupa un código por fila en lugar de un
+    string. El resto sigue como texto: es el contrato del archivo unificado (ver archivo_unificado.py).
+    """
+    df = df.reindex(columns=COLUMNS_ORDER)
+    df["Lider"] = df["Lider"].astype("category")
+    return df
+
+def unify_campaign_streaming(folder: str, output_file: str, formats: List[str], workers: int = 1,
+                             use_cache: bool = True, source: str = "auto") -> Optional[Tuple[int, List[str]]]:
+    """
+    Igual que unify_campaign + write_unified, pero cada archivo procesado se agrega a la salida
+    apenas está listo, sin armar el DataFrame unificado en memoria.
+    Devuelve (registros escritos, rutas guardadas) o None si no se pudo extraer información.
+    """
+    if not os.path.exists(folder):
+        print(f"❌ Error: La carpeta '{folder}' no existe. Créala y coloque los archivos .xls/.xlsx dentro.")
+        return None
+
+    cache = UnificationCache(os.path.join(folder, CACHE_DIR_NAME)) if use_cache else None
+    with metrics.stage("buscar_archivos") as etapa:
+        file_list = find_leader_files(folder, source)
+        etapa["filas"] = len(file_list)
+
+    if not file_list:
+        print(f"⚠️ No se encontraron archivos .xls/.xlsx en la carpeta '{folder}'.")
+        return None
+
+    print(f"Se encontraron {len(file_list)} archivos para unificar (modo streaming).")
+
+    with metrics.stage("escribir_unificado_stream", formatos=formats) as etapa:
+        with UnifiedWriter(output_file, formats) as writer:
+            for _, df in iter_process_files(file_list, workers, cache):
+                if df is not None:
+                    writer.append(compact_frame(df))
+        etapa["filas"] = writer.rows
+
+    if cache is not None:
+        cache.report()
+
+    if writer.rows == 0:
+        print("\n❌ Error: No se pudo extraer información de ningún archivo.")
+        return None
+    return writer.rows, writer.written
+
+
+def print_dry_run(folder: str, df: "pd.DataFrame", source: str = "auto") -> bool:
+    """
+    Resumen de --dry-run: código de campaña, archivos, filas por líder y columnas, sin escribir
+    la salida. Devuelve False si la carpeta no tiene código de campaña o si falta Nro, Cliente o
+    Lider (sin ellas no se puede cargar nada).
+    """
+    import pandas as pd
+
+    campania = extract_campania(os.path.normpath(folder))
+    n_files = len(find_leader_files(folder, source))
+    por_lider = df.groupby("Lider", sort=False).size() if "Lider" in df.columns else pd.Series(dtype=int)
+    faltantes = [col for col in COLUMNS_ORDER if col not in df.columns]
+    repetidos = int(df["Nro"].astype(str).str.strip().duplicated().sum()) if "Nro" in df.columns else 0
+
+    print("\n=============================================")
+    print("🔎 PRUEBA (--dry-run): no se escribió el archivo unificado")
+    if campania:
+        print(f"✅ Campaña: {campania}")
+    else:
+        print(f"❌ El nombre de la carpeta no tiene el código de campaña CmmAA (ej. C1025): {os.path.basename(os.path.normpath(folder))}")
+    print(f"Archivos: {n_files}, con datos de {len(por_lider)} líderes")
+    print(f"Total de registros de clientes: {len(df)}")
+    if len(por_lider):
+        print(f"Filas por líder: mínimo {por_lider.min()} ({por_lider.idxmin()}), máximo {por_lider.max()} ({por_lider.idxmax()})")
+    if faltantes:
+        print(f"⚠️ Columnas que no se encontraron: {faltantes}")
+    if repetidos:
+        print(f"⚠️ Filas con un Nro repetido: {repetidos} (ver --dedup en los scripts de carga)")
+    print("=============================================")
+    return bool(campania) and not {"Nro", "Cliente", "Lider"} & set(faltantes)
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Devuelve el código de salida: 0 si todo salió bien, 1 si no se pudo unificar o verificar."""
+    parser = argparse.ArgumentParser(prog=prog, description="Unifica los archivos de los líderes de una campaña.")
+    parser.add_argument("carpeta", nargs="?", default=FOLDER_CAMPAIGN,
+                        help="Carpeta de la campaña (por defecto PEDIDOS_CARPETA o FOLDER_CAMPAIGN). "
+                             "El archivo unificado se guarda junto a ella como <carpeta>_Unificado.xlsx.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Cantidad de procesos para leer los archivos en paralelo (por defecto 1).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Procesa todos los archivos sin usar ni actualizar la caché.")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Borra la caché de la campaña y termina.")
+    parser.add_argument("--source", choices=["auto", "xls", "xlsx"], default="auto",
+                        help="Archivos a leer: .xls originales, .xlsx convertidos o 'auto' (el .xls si existe).")
+    parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=["xlsx"],
+                        help="Formatos del archivo unificado (ej. --formats xlsx parquet). Los scripts de carga "
+                             "prefieren el Parquet o CSV si existe.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Escribe cada archivo procesado directamente en la salida, sin juntar toda la "
+                             "campaña en memoria (para carpetas muy grandes).")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Lee los archivos y verifica el formato, el código de campaña y las filas por líder "
+                             "sin escribir el archivo unificado.")
+    instrumentacion.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentacion.setup(args, "2_unificar_excels")
+    if args.dry_run and args.stream:
+        parser.error("--dry-run no se puede usar junto con --stream")
+
+    folder = os.path.normpath(args.carpeta)
+    output_file = f"{folder}_Unificado.xlsx"
+    if args.clear_cache:
+        cache_dir = os.path.join(folder, CACHE_DIR_NAME)
+        UnificationCache(cache_dir).clear()
+        print(f"✅ Caché eliminada: {cache_dir}")
+        return 0
+
+    print(f"   Pico de memoria (RSS) al inicio: {peak_memory_mb()} MB")
+
+    if args.stream:
+        try:
+            result = unify_campaign_streaming(folder, output_file, args.formats, args.workers,
+                                              not args.no_cache, args.source)
+        except Exception as e:
+            print(f"\n❌ Error al guardar el archivo '{output_file}': {e}")
+            return 1
+        if result is None:
+            return 1
+        total_rows, written = result
+        print("\n=============================================")
+        print(f"✅ UNIFICACIÓN EXITOSA (streaming)")
+        print(f"Total de registros de clientes: {total_rows}")
+        for path in written:
+            print(f"Archivo guardado en: {os.path.abspath(path)}")
+        print(f"Pico de memoria (RSS): {peak_memory_mb()} MB")
+        print("=============================================")
+        return 0
+
+    df_unified = unify_campaign(folder, args.workers, not args.no_cache, args.source)
+    if df_unified is None:
+        return 1
+    if args.dry_run:
+        return 0 if print_dry_run(folder, df_unified, args.source) else 1
+    existing_cols_in_order = list(df_unified.columns)
+
     # --- Guardar el archivo unificado ---
     try:
-        df_unified.to_excel(OUTPUT_FILE, index=False)
+        with metrics.stage("escribir_unificado", filas=len(df_unified), formatos=args.formats):
+            written = write_unified(df_unified, output_file, args.formats)
         print("\n=============================================")
         print(f"✅ UNIFICACIÓN EXITOSA")
         print(f"Columnas finales: {existing_cols_in_order}")
         print(f"Total de registros de clientes: {len(df_unified)}")
-        print(f"Archivo guardado en: {os.path.abspath(OUTPUT_FILE)}")
+        for path in written:
+            print(f"Archivo guardado en: {os.path.abspath(path)}")
+        print(f"Pico de memoria (RSS): {peak_memory_mb()} MB")
         print("=============================================")
     except Exception as e:
-        print(f"\n❌ Error al guardar el archivo '{OUTPUT_FILE}': {e}")
+        print(f"\n❌ Error al guardar el archivo '{output_file}': {e}")
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,123 +1,269 @@
-import pandas as pd
-import mysql.connector
 import os
-import getpass # Importar getpass para una entrada de contraseña segura
+import sys
+import argparse
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import deduplicar
+import instrumentacion
+from archivo_unificado import find_unified, read_unified
+from carga_masiva import ENGINES
+from directorio_clientes import (SNAPSHOT_FILE, SQL_CREATE_CLIENTES, ClientDirectory,
+                                 get_client_directory, refresh_snapshot)
+from instrumentacion import metrics
+
+# mysql.connector, conexion_mysql y los motores de carga masiva se importan recién al
+# conectarse: la ayuda y --dry-run no cargan el driver de MySQL. pandas, recién al leer el
+# archivo unificado: la ayuda y los errores en los argumentos tampoco lo cargan
+if TYPE_CHECKING:
+    import pandas as pd
+    from conexion_mysql import BatchRetrier
 
 # ====================================================================
 # === CONFIGURACIÓN ÚNICA A MODIFICAR ===
 # ====================================================================
 
-# 🚨 ÚNICO CAMPO A CAMBIAR: Nombre del archivo unificado (debe estar en la misma carpeta)
-archivo_entrada = r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025_Unificado.xlsx" 
+# 🚨 ÚNICO CAMPO A CAMBIAR: Nombre del archivo unificado (o como argumento, o en PEDIDOS_UNIFICADO)
+archivo_entrada = os.environ.get("PEDIDOS_UNIFICADO", r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025_Unificado.xlsx")
+
+# Cantidad de clientes nuevos enviados por cada INSERT masivo (executemany)
+CHUNK_SIZE = 1000
+
+# Un Nro que ya existe (otro proceso, o un lote repetido después de reconectar) no se toca
+SQL_INSERT_CLIENTE = "INSERT INTO clientes (Nro, Cliente, Lider) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE Nro = Nro"
 
 # ====================================================================
-# === SOLICITAR CREDENCIALES AL USUARIO ===
+# === CARGA DE CLIENTES ===
 # ====================================================================
 
-print("--- Credenciales de MySQL ---")
-# Solicitar HOST y DATABASE (que suelen ser fijos)
-# db_host = input("Ingrese el Host de la base de datos (ej. localhost): ").strip()
-# db_name = input("Ingrese el nombre de la base de datos (ej. gerencia): ").strip()
-db_host = 'localhost'
-db_name = 'gerencia'
-
-# Solicitar usuario y contraseña
-db_user = input("Ingrese el Usuario de MySQL: ").strip()
-# getpass oculta la entrada del usuario para la contraseña
-db_password = getpass.getpass("Ingrese la Contraseña de MySQL: ") 
-print("-----------------------------\n")
-
-# Configuración de la base de datos dinámica
-DB_CONFIG = {
-    "host": db_host,
-    "user": db_user,
-    "password": db_password,
-    "database": db_name
-}
+def select_new_clientes(df_out: "pd.DataFrame", directory: ClientDirectory) -> Tuple[List[tuple], int]:
+    """
+    Clientes del archivo que no están en el directorio, como tuplas (Nro, Cliente, Lider).
+    Un Nro repetido en el archivo se cuenta como saltado. El directorio no se modifica:
+    los clientes se agregan recién cuando su INSERT está confirmado (ver load_clientes),
+    así un lote que falla no deja en el directorio clientes que no están en la tabla.
+    Devuelve (clientes_nuevos, saltados).
+    """
+    clientes_nuevos = []
+    clientes_saltados = 0
+    vistos = set()
+
+    for nro, cliente, lider in zip(df_out["Nro"], df_out["Cliente"], df_out["Lider"]):
+        # Limpieza y conversión de datos
+        nro = str(nro).strip()
+        # Si el Nro es vacío, saltamos la fila (puede ser ruido)
+        if not nro.isdigit() or len(nro) < 4:
+            continue
+
+        # LÓGICA DE RESTRICCIÓN: el Nro ya existe (en la base o antes en este mismo archivo)
+        if nro in directory or nro in vistos:
+            clientes_saltados += 1
+            continue
+
+        vistos.add(nro)
+        nro_lider = str(lider).strip() if lider else None
+        clientes_nuevos.append((nro, str(cliente).strip(), nro_lider))
+
+    return clientes_nuevos, clientes_saltados
+
+def send_clientes(cursor, clientes_nuevos: List[tuple], chunk_size: int = CHUNK_SIZE,
+                  engine: str = "executemany", retrier: Optional["BatchRetrier"] = None) -> None:
+    """
+    Envía los clientes nuevos en lotes de `chunk_size` (con engine="infile", todos juntos
+    con LOAD DATA LOCAL INFILE; con engine="prepared", con un INSERT preparado; ver
+    carga_masiva.py). Con retrier, los lotes se repiten ante un error transitorio y el
+    COMMIT lo hace quien llama con retrier.commit(); engine="prepared" lo necesita (usa su conexión).
+    """
+    from carga_masiva import BulkUpserter, PreparedInsert
+
+    def run(send) -> None:
+        if retrier:
+            retrier.send(send)
+        else:
+            send()
+
+    with metrics.stage("insert", tabla="clientes", filas=len(clientes_nuevos)) as etapa:
+        if engine == "infile":
+            # Un solo LOAD DATA; los Nro que ya existan (p. ej. cargados por otro proceso) no se tocan
+            loader = BulkUpserter(cursor, "clientes", ["Nro", "Cliente", "Lider"], [], SQL_INSERT_CLIENTE)
+            engine = etapa["motor"] = loader.engine
+            if engine == "infile":
+                run(lambda: loader.send(clientes_nuevos))
+                return
+
+        etapa["motor"] = engine
+        if engine == "prepared":
+            if retrier is None:
+                raise ValueError("engine='prepared' necesita la conexión: pasar retrier=BatchRetrier(conn)")
+            prepared = PreparedInsert(retrier.conn, SQL_INSERT_CLIENTE)
+            retrier.on_reconnect.append(prepared.reset)
+            send_chunk = prepared.send
+        else:
+            send_chunk = lambda chunk: cursor.executemany(SQL_INSERT_CLIENTE, chunk)
+        for i in range(0, len(clientes_nuevos), chunk_size):
+            chunk = clientes_nuevos[i:i + chunk_size]
+            run(lambda chunk=chunk: send_chunk(chunk))
+        if engine == "prepared":
+            retrier.on_reconnect.remove(prepared.reset)
+            prepared.close()
+
+def upload_clientes(cursor, df_out: "pd.DataFrame", chunk_size: int = CHUNK_SIZE,
+                    engine: str = "executemany",
+                    directory: Optional[ClientDirectory] = None,
+                    retrier: Optional["BatchRetrier"] = None) -> Tuple[int, int]:
+    """
+    Inserta en 'clientes' los Nro que todavía no existen (Lógica: Evitar si Nro ya existe).
+
+    En lugar de un SELECT por fila, consulta el directorio de clientes (toda la tabla
+    leída en una sola consulta si no se pasa uno ya cargado), calcula la diferencia en
+    memoria y envía los nuevos con send_clientes. No hace el COMMIT ni modifica el
+    directorio (ver load_clientes). Devuelve (insertados, saltados).
+    """
+    if directory is None:
+        with metrics.stage("select_existentes", tabla="clientes") as etapa:
+            directory = ClientDirectory.load(cursor)
+            etapa["filas"] = len(directory)
+
+    clientes_nuevos, clientes_saltados = select_new_clientes(df_out, directory)
+    send_clientes(cursor, clientes_nuevos, chunk_size, engine, retrier)
+    return len(clientes_nuevos), clientes_saltados
+
+def load_clientes(conn, df_out: "pd.DataFrame", chunk_size: int = CHUNK_SIZE,
+                  engine: str = "executemany", directory: Optional[ClientDirectory] = None,
+                  snapshot_path: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Paso completo de carga de clientes sobre una conexión abierta: asegura la tabla,
+    sube los clientes nuevos y confirma la transacción; ante una desconexión o un deadlock
+    se reconecta y se repiten los lotes (ver conexion_mysql.BatchRetrier).
+    Devuelve (insertados, saltados).
+    Con snapshot_path, el directorio de clientes se toma del snapshot local si sigue
+    vigente y se vuelve a guardar después del COMMIT (ver directorio_clientes.py).
+    Los errores de MySQL se propagan para que quien llama haga el rollback.
+    """
+    from conexion_mysql import BatchRetrier, ensure_table
+
+    cursor = conn.cursor()
+    try:
+        if directory is None:
+            with metrics.stage("directorio_clientes") as etapa:
+                directory = get_client_directory(cursor, snapshot_path)
+                etapa.update(filas=len(directory), origen=directory.source)
+        else:
+            ensure_table(cursor, SQL_CREATE_CLIENTES)
+
+        # Carga masiva: existencia contra el directorio + INSERTs por lotes
+        retrier = BatchRetrier(conn)
+        clientes_nuevos, clientes_saltados = select_new_clientes(df_out, directory)
+        send_clientes(cursor, clientes_nuevos, chunk_size, engine, retrier)
+
+        with metrics.stage("commit", tabla="clientes") as etapa:
+            retrier.commit()
+            etapa["reintentos"] = retrier.retries
+        # Recién confirmados: si un lote o el COMMIT fallan, el directorio queda como estaba
+        directory.add_many(clientes_nuevos)
+        insertados_clientes = len(clientes_nuevos)
+        if insertados_clientes:
+            refresh_snapshot(cursor, directory, snapshot_path)
+    finally:
+        cursor.close()
+
+    print("\n--- Carga de Clientes Terminada ---")
+    print(f"   Directorio de clientes: {len(directory) - insertados_clientes} existentes (leídos de {directory.source})")
+    print(f"   Clientes insertados (Nro nuevo): {insertados_clientes}")
+    print(f"   Clientes saltados (Nro preexistente): {clientes_saltados}")
+    print("-----------------------------------")
+    return insertados_clientes, clientes_saltados
+
+def print_dry_run(df_out: "pd.DataFrame") -> None:
+    """Resumen de --dry-run: clientes que se revisarían, sin conectarse a MySQL."""
+    nro = df_out["Nro"].astype(str).str.strip()
+    validos = nro.str.isdigit() & (nro.str.len() >= 4)
+    print("\n--- Prueba (--dry-run): no se conectó a MySQL ---")
+    print(f"   Clientes con Nro válido: {int(validos.sum())} ({nro[validos].nunique()} Nro distintos)")
+    print(f"   Filas sin Nro válido (se saltan): {int((~validos).sum())}")
+    print(f"   Líderes: {df_out['Lider'].nunique()}")
+    print("   Los Nro que ya estén en la tabla clientes se saltarán al cargar.")
+    print("-----------------------------------")
 
 # ====================================================================
 # === INICIO DEL SCRIPT ===
 # ====================================================================
 
-# Comprobar si el archivo existe
-if not os.path.exists(archivo_entrada):
-    print(f"❌ Error: No se encontró el archivo de entrada: {archivo_entrada}")
-    exit()
-
-print(f"✅ Leyendo archivo: {archivo_entrada}")
-
-# === PASO 1: Leer el archivo Excel unificado ===
-try:
-    # Leer el DataFrame unificado (asumimos que ya tiene las columnas correctas)
-    df_out = pd.read_excel(archivo_entrada, dtype=str).fillna("")
-    print(f"   Filas detectadas en el Excel: {len(df_out)}")
-    
-    # Asegurarse de tener las columnas clave para el proceso
-    if 'Nro' not in df_out.columns or 'Cliente' not in df_out.columns or 'Lider' not in df_out.columns:
-        print("❌ Error: El Excel no contiene las columnas 'Nro', 'Cliente' o 'Lider'.")
-        exit()
-
-except Exception as e:
-    print(f"❌ Error al leer o procesar el archivo Excel: {e}")
-    exit()
-
-
-# === PASO 2: Subir SOLAMENTE a la tabla MySQL 'clientes' (Lógica: Evitar si Nro ya existe) ===
-if len(df_out) == 0:
-    print("⚠️ No se detectaron registros de clientes.")
-else:
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Devuelve el código de salida: 0 si la carga (o la verificación) salió bien, 1 si no."""
+    parser = argparse.ArgumentParser(prog=prog, description="Carga los clientes del archivo unificado en MySQL.")
+    parser.add_argument("archivo", nargs="?", default=archivo_entrada,
+                        help="Archivo unificado (por defecto PEDIDOS_UNIFICADO o archivo_entrada); se prefiere "
+                             "el .parquet o .csv con el mismo nombre si está al día.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Clientes nuevos por INSERT masivo (por defecto {CHUNK_SIZE}).")
+    parser.add_argument("--engine", choices=ENGINES, default="executemany",
+                        help="executemany (por defecto), infile: LOAD DATA LOCAL INFILE a una tabla de staging "
+                             "(si el servidor no lo permite se usa executemany) o prepared: INSERT multi-fila "
+                             "preparado en el servidor.")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE, default=None, metavar="ARCHIVO",
+                        help="Guarda el directorio de clientes en un snapshot local y lo reutiliza mientras "
+                             f"la tabla no cambie (por defecto {SNAPSHOT_FILE}).")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Lee y verifica el archivo (columnas, Nro repetidos, clientes válidos) sin conectarse a MySQL.")
+    deduplicar.add_arguments(parser)
+    instrumentacion.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentacion.setup(args, "3_subir_clientes")
+
+    if not args.dry_run:
+        import mysql.connector
+        from conexion_mysql import ask_db_config, connect
+
+        DB_CONFIG = ask_db_config()
+        if args.engine == "infile":
+            DB_CONFIG["allow_local_infile"] = True
+
+    # Comprobar si el archivo existe (se prefiere el Parquet/CSV unificado si está al día)
+    ruta_unificado = find_unified(args.archivo)
+    if ruta_unificado is None:
+        print(f"❌ Error: No se encontró el archivo de entrada: {args.archivo}")
+        return 1
+
+    print(f"✅ Leyendo archivo: {ruta_unificado}")
+
+    # === PASO 1: Leer el archivo unificado ===
+    try:
+        # Leer el DataFrame unificado (asumimos que ya tiene las columnas correctas)
+        with metrics.stage("leer_unificado", archivo=os.path.basename(ruta_unificado)) as etapa:
+            df_out = read_unified(ruta_unificado)
+            etapa["filas"] = len(df_out)
+        print(f"   Filas detectadas en el Excel: {len(df_out)}")
+        
+        # Asegurarse de tener las columnas clave para el proceso
+        if 'Nro' not in df_out.columns or 'Cliente' not in df_out.columns or 'Lider' not in df_out.columns:
+            print("❌ Error: El Excel no contiene las columnas 'Nro', 'Cliente' o 'Lider'.")
+            return 1
+
+    except Exception as e:
+        print(f"❌ Error al leer o procesar el archivo Excel: {e}")
+        return 1
+
+
+    # Un Nro repetido (en dos líderes o dos veces en un archivo) se junta antes de cargar
+    df_out = deduplicar.apply_dedup(df_out, args.dedup, args.conflictos)
+
+    # === PASO 2: Subir SOLAMENTE a la tabla MySQL 'clientes' (Lógica: Evitar si Nro ya existe) ===
+    if len(df_out) == 0:
+        print("⚠️ No se detectaron registros de clientes.")
+        return 0
+    if args.dry_run:
+        print_dry_run(df_out)
+        return 0
+
     conn = None # Inicializar conexión a None
     try:
         # Intento de conexión con las credenciales ingresadas
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor()
+        with metrics.stage("conexion_mysql"):
+            conn = connect(DB_CONFIG)
         print("✅ Conexión a MySQL establecida con éxito.")
 
-        # 1. Crear/Asegurar tabla clientes (Nro es crucial que sea UNIQUE)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS clientes (
-            idCliente INT AUTO_INCREMENT PRIMARY KEY,
-            Nro VARCHAR(6) UNIQUE COMMENT 'Nº Cliente',  -- Nro debe ser UNIQUE
-            Cliente VARCHAR(255) COMMENT 'Nombre de Cliente',
-            Lider VARCHAR(20) COMMENT 'Nº Líder'
-        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
-        """)
-        
-        # 2. Sentencias SQL para la lógica de Clientes
-        sql_select_nro = "SELECT Nro FROM clientes WHERE Nro = %s"
-        sql_insert_cliente = "INSERT INTO clientes (Nro, Cliente, Lider) VALUES (%s, %s, %s)"
-
-        insertados_clientes = 0
-        clientes_saltados = 0
-
-        for _, row in df_out.iterrows():
-            # Limpieza y conversión de datos
-            nro = str(row["Nro"]).strip()
-            cliente = str(row["Cliente"]).strip()
-            # Si el Nro es vacío, saltamos la fila (puede ser ruido)
-            if not nro.isdigit() or len(nro) < 4:
-                continue 
-                
-            nro_lider = str(row["Lider"]).strip() if row["Lider"] else None 
-
-            # LÓGICA DE RESTRICCIÓN: Buscar si el Nro ya existe
-            cursor.execute(sql_select_nro, (nro,))
-            result = cursor.fetchone()
-            
-            if result:
-                # El Nro existe en la base de datos -> SALTAR ESTE REGISTRO
-                clientes_saltados += 1
-                continue 
-            else:
-                # El Nro no existe -> Insertar nuevo registro
-                cursor.execute(sql_insert_cliente, (nro, cliente, nro_lider))
-                insertados_clientes += 1
-
-        conn.commit()
-        print("\n--- Carga de Clientes Terminada ---")
-        print(f"   Clientes insertados (Nro nuevo): {insertados_clientes}")
-        print(f"   Clientes saltados (Nro preexistente): {clientes_saltados}")
-        print("-----------------------------------")
+        load_clientes(conn, df_out, args.chunk_size, args.engine, snapshot_path=args.snapshot)
+        return 0
 
     except mysql.connector.Error as err:
         # Captura errores de conexión (p. ej., credenciales incorrectas)
@@ -127,8 +273,10 @@ else:
     except Exception as e:
         print(f"\n❌ Error inesperado: {e}")
     finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
         if conn and conn.is_connected():
             conn.close()
-            print("Conexión a MySQL cerrada.")
\ No newline at end of file
+            print("Conexión a MySQL cerrada.")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
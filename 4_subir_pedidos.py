@@ -1,41 +1,42 @@
-import pandas as pd
-import mysql.connector
 import os
-import re
-import getpass # Importar getpass para una entrada de contraseña segura
-from typing import Optional, Tuple
+import sys
+import glob
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import deduplicar
+import instrumentacion
+from archivo_unificado import extract_campania, find_unified, read_unified
+from carga_masiva import ENGINES
+from directorio_clientes import SNAPSHOT_FILE, ClientDirectory, get_client_directory
+from instrumentacion import metrics
+from resumenes import ensure_rollup_tables, rebuild_rollups, refresh_rollups
+
+# mysql.connector, conexion_mysql y los motores de carga masiva se importan recién al
+# conectarse: la ayuda y --dry-run no cargan el driver de MySQL. pandas, recién al leer el
+# archivo unificado: la ayuda y los errores en los argumentos tampoco lo cargan
+if TYPE_CHECKING:
+    import pandas as pd
+    from conexion_mysql import BatchRetrier
 
 # ====================================================================
 # === CONFIGURACIÓN ÚNICA A MODIFICAR ===
 # ====================================================================
 
-# 🚨 CAMPO MODIFICADO: Ahora contiene la ruta COMPLETA del archivo unificado
-archivo_entrada = r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025_Unificado.xlsx" 
+# 🚨 CAMPO MODIFICADO: Ahora contiene la ruta COMPLETA del archivo unificado (o como argumento, o en PEDIDOS_UNIFICADO)
+archivo_entrada = os.environ.get("PEDIDOS_UNIFICADO", r"C:\PerlaNegra\11 NACHO ADMINISTRATIVO\Minipedido\C1025_Unificado.xlsx")
 
-# ====================================================================
-# === SOLICITAR CREDENCIALES AL USUARIO ===
-# ====================================================================
+# Carga por lotes (--chunk-size): filas por executemany y lotes por COMMIT
+CHUNK_SIZE = 1000
+COMMIT_EVERY = 10
+
+# --batch --parallel: mysql.connector no admite pools de más de 32 conexiones (CNX_POOL_MAXSIZE)
+MAX_PARALLEL = 32
 
-print("--- Credenciales de MySQL ---")
-# Solicitar HOST y DATABASE (que suelen ser fijos)
-# db_host = input("Ingrese el Host de la base de datos (ej. localhost): ").strip()
-# db_name = input("Ingrese el nombre de la base de datos (ej. gerencia): ").strip()
-db_host = 'localhost'
-db_name = 'gerencia'
-
-# Solicitar usuario y contraseña
-db_user = input("Ingrese el Usuario de MySQL: ").strip()
-# getpass oculta la entrada del usuario para la contraseña
-db_password = getpass.getpass("Ingrese la Contraseña de MySQL: ") 
-print("-----------------------------\n")
-
-# Configuración de la base de datos dinámica
-DB_CONFIG = {
-    "host": db_host,
-    "user": db_user,
-    "password": db_password,
-    "database": db_name
-}
 # ====================================================================
 
 # Columnas del Excel de origen que se mapearán a la tabla 'pedidos'
@@ -52,29 +53,55 @@ MYSQL_PEDIDOS_COLUMNS = [
     "Campaña", "Nro", "Unidades", "Faltantes", "PVP", "Costo_Rev"
 ]
 
+# SQL para INSERT O UPDATE (si ya existe la Campaña y el Nro)
+SQL_PEDIDOS = f"""
+INSERT INTO pedidos ({', '.join(MYSQL_PEDIDOS_COLUMNS)})
+VALUES (%s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    Unidades = VALUES(Unidades),
+    Faltantes = VALUES(Faltantes),
+    PVP = VALUES(PVP),
+    Costo_Rev = VALUES(Costo_Rev)
+"""
+
+# Modo diferencial (--diff): estado actual de la campaña y borrado de clientes que ya no están
+SQL_SNAPSHOT_PEDIDOS = "SELECT Nro, Unidades, Faltantes, PVP, Costo_Rev FROM pedidos WHERE Campaña = %s"
+SQL_DELETE_PEDIDOS = "DELETE FROM pedidos WHERE Campaña = %s AND Nro IN ({marcadores})"
+
+# Crear/Asegurar tabla pedidos
+SQL_CREATE_PEDIDOS = """
+CREATE TABLE IF NOT EXISTS pedidos (
+    idPedidos INT AUTO_INCREMENT PRIMARY KEY,
+    Campaña VARCHAR(5) NOT NULL,
+    Nro VARCHAR(6) NOT NULL,
+    Unidades INT NULL,
+    Faltantes INT NULL,
+    PVP DECIMAL(10,2) NULL,
+    Costo_Rev DECIMAL(10,2) NULL,
+    UNIQUE KEY uk_campana_nro (Campaña, Nro)  -- Clave única para UPDATE
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+# Esquema particionado (--particionar): una partición por hash de Campaña, así las consultas
+# de una campaña leen sólo su partición y no hay que crear particiones para cada campaña nueva.
+# MySQL exige que toda clave única incluya la columna de partición: la clave primaria pasa a
+# ser (idPedidos, Campaña). idx_nro acelera el historial de un cliente en todas las campañas.
+PEDIDOS_PARTITIONS = 16
+SQL_PARTICIONAR_PEDIDOS = f"""
+ALTER TABLE pedidos
+    DROP PRIMARY KEY, ADD PRIMARY KEY (idPedidos, Campaña),
+    ADD KEY idx_nro (Nro)
+PARTITION BY KEY (Campaña) PARTITIONS {PEDIDOS_PARTITIONS}
+"""
+SQL_PARTICIONES_PEDIDOS = """
+SELECT COUNT(*) FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'pedidos' AND PARTITION_NAME IS NOT NULL
+"""
+
 # ====================================================================
 # === FUNCIONES AUXILIARES ===
 # ====================================================================
 
-def extract_campania(file_path: str) -> Optional[str]:
-    """
-    Extrae la Campaña (CmmAA) del nombre del archivo (ej. C1025) a partir de la ruta completa.
-    Busca 'C' seguido de 4 dígitos dentro del nombre del archivo.
-    """
-    if not isinstance(file_path, str):
-        return None
-        
-    # 1. Obtener el nombre del archivo (ej. C1025_Unificado.xlsx)
-    file_name = os.path.basename(file_path)
-    
-    # 2. Buscar 'C' seguido de 4 dígitos en el nombre del archivo
-    match = re.search(r"(C\d{4})", file_name, re.IGNORECASE)
-    
-    if match:
-        return match.group(1).upper()
-        
-    return None
-
 def clean_monetary_value(value: str) -> Optional[float]:
     """Limpia valores monetarios (quita $, espacios, comas) y los convierte a float."""
     if not isinstance(value, str):
@@ -88,114 +115,835 @@ def clean_monetary_value(value: str) -> Optional[float]:
     except ValueError:
         return None
 
+def clean_monetary_series(values: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    """
+    Versión vectorizada de clean_monetary_value para una columna completa.
+    Devuelve (valores float con NaN donde no hay dato, máscara de celdas inválidas).
+    Una celda vacía no es inválida: se carga como NULL, igual que antes.
+    """
+    import pandas as pd
+
+    clean = (
+        values.astype(str)
+        .str.replace('$', '', regex=False)
+        .str.replace(' ', '', regex=False)
+        .str.replace('.', '', regex=False)
+        .str.replace(',', '.', regex=False)
+        .str.strip()
+    )
+    parsed = pd.to_numeric(clean, errors="coerce")
+    return parsed, parsed.isna() & (clean != "")
+
+def clean_integer_series(values: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    """
+    Convierte una columna de unidades a enteros (vacío = 0, como int(x or 0)).
+    Devuelve (valores Int64 con <NA> en las celdas inválidas, máscara de celdas inválidas).
+    """
+    import pandas as pd
+
+    clean = values.astype(str).str.strip()
+    is_int = clean.str.fullmatch(r"[+-]?\d+")
+    parsed = pd.to_numeric(clean.where(is_int), errors="coerce").astype("Int64")
+    parsed = parsed.mask(clean == "", 0)
+    return parsed, ~is_int & (clean != "")
+
+def _to_python_list(values: "pd.Series") -> list:
+    """Pasa una columna a lista de objetos Python, con None en lugar de NaN/<NA> (NULL en MySQL)."""
+    return values.astype(object).where(values.notna(), None).tolist()
+
+def prepare_pedidos(df_out: "pd.DataFrame", campania: str) -> Tuple[List[tuple], Dict[str, int]]:
+    """
+    Arma las tuplas para la tabla 'pedidos' operando por columnas en lugar de fila a fila.
+    Las celdas que no se pueden convertir se cargan como NULL y se cuentan por columna
+    en lugar de abortar toda la carga.
+    Devuelve (pedidos_a_insertar, celdas_invalidas_por_columna).
+    """
+    # Saltamos filas sin Nro de cliente válido
+    nro = df_out["Nro"].astype(str).str.strip()
+    df_valid = df_out[nro.str.isdigit() & (nro.str.len() >= 4)]
+    nro = nro[df_valid.index]
+
+    unidades, bad_unidades = clean_integer_series(df_valid["U. Ped"])
+    faltantes, bad_faltantes = clean_integer_series(df_valid["Falt."])
+    pvp, bad_pvp = clean_monetary_series(df_valid["P.V.P."])
+    costo_rev, bad_costo_rev = clean_monetary_series(df_valid["Costo Rev."])
+
+    celdas_invalidas = {
+        "U. Ped": int(bad_unidades.sum()),
+        "Falt.": int(bad_faltantes.sum()),
+        "P.V.P.": int(bad_pvp.sum()),
+        "Costo Rev.": int(bad_costo_rev.sum()),
+    }
+
+    # El orden de la tupla DEBE coincidir con MYSQL_PEDIDOS_COLUMNS
+    pedidos_a_insertar = list(zip(
+        [campania] * len(df_valid),
+        nro.tolist(),
+        _to_python_list(unidades),
+        _to_python_list(faltantes),
+        _to_python_list(pvp),
+        _to_python_list(costo_rev),
+    ))
+    return pedidos_a_insertar, celdas_invalidas
+
+def find_orphans(pedidos: List[tuple], directory: ClientDirectory,
+                 skip: bool = False, nros_nuevos: Iterable[str] = ()) -> Tuple[List[tuple], List[str]]:
+    """
+    Pedidos cuyo Nro no está en la tabla clientes (la tabla pedidos no tiene clave foránea)
+    ni entre `nros_nuevos`, los clientes que se cargan en la misma corrida.
+    Devuelve (pedidos, nros_huerfanos); con skip=True los pedidos huérfanos se quitan.
+    """
+    huerfanos = sorted(directory.missing({row[1] for row in pedidos}) - set(nros_nuevos))
+    if skip and huerfanos:
+        excluir = set(huerfanos)
+        pedidos = [row for row in pedidos if row[1] not in excluir]
+    return pedidos, huerfanos
+
+# ====================================================================
+# === CARGA POR LOTES ===
+# ====================================================================
+
+def partition_pedidos(cursor) -> bool:
+    """Pasa la tabla pedidos al esquema particionado. Devuelve False si ya lo estaba."""
+    from conexion_mysql import ensure_table
+
+    ensure_table(cursor, SQL_CREATE_PEDIDOS)
+    cursor.execute(SQL_PARTICIONES_PEDIDOS)
+    if cursor.fetchone()[0]:
+        return False
+    cursor.execute(SQL_PARTICIONAR_PEDIDOS)
+    return True
+
+def iter_chunks(rows: Iterable[tuple], chunk_size: int) -> Iterator[List[tuple]]:
+    """Entrega las filas en lotes de `chunk_size` sin copiar la lista completa."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _resume_file(file_path: str) -> str:
+    return f"{file_path}.reanudar.json"
+
+def _resume_key(file_path: str, campania: str, chunk_size: int, total_rows: int) -> dict:
+    # Un punto de reanudación sólo vale para el mismo archivo (sin modificar) y los mismos lotes
+    return {
+        "campania": campania,
+        "archivo_mtime": os.path.getmtime(file_path),
+        "chunk_size": chunk_size,
+        "total_filas": total_rows,
+    }
+
+def load_resume_point(file_path: str, campania: str, chunk_size: int, total_rows: int) -> int:
+    """Devuelve cuántos lotes ya se confirmaron en una ejecución anterior (0 si no hay punto válido)."""
+    try:
+        with open(_resume_file(file_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if state.get("clave") != _resume_key(file_path, campania, chunk_size, total_rows):
+        print("⚠️ El punto de reanudación no corresponde a este archivo o tamaño de lote. Se carga desde el inicio.")
+        return 0
+    return int(state.get("lotes_confirmados", 0))
+
+def save_resume_point(file_path: str, campania: str, chunk_size: int, total_rows: int, chunks_done: int) -> None:
+    state = {
+        "clave": _resume_key(file_path, campania, chunk_size, total_rows),
+        "lotes_confirmados": chunks_done,
+    }
+    with open(_resume_file(file_path), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+def clear_resume_point(file_path: str) -> None:
+    if os.path.exists(_resume_file(file_path)):
+        os.remove(_resume_file(file_path))
+
+def upload_pedidos(conn, cursor, pedidos: List[tuple], campania: str,
+                   chunk_size: int, commit_every: int = COMMIT_EVERY, start_chunk: int = 0,
+                   on_commit: Optional[Callable[[int], None]] = None, verbose: bool = True,
+                   nros_existentes: Optional[set] = None, engine: str = "executemany",
+                   retrier: Optional["BatchRetrier"] = None,
+                   finish: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """
+    Envía los pedidos en lotes de `chunk_size` con COMMIT cada `commit_every` lotes.
+    Con engine="infile" cada lote va por LOAD DATA LOCAL INFILE y con engine="prepared" por
+    un INSERT preparado en el servidor (ver carga_masiva.py).
+    Saltea los primeros `start_chunk` lotes (ya confirmados) y llama a on_commit(lotes_confirmados)
+    después de cada COMMIT para registrar el punto de reanudación.
+    Ante una desconexión o un deadlock se repiten los lotes desde el último COMMIT (el upsert
+    es idempotente; ver conexion_mysql.BatchRetrier). Se puede pasar un retrier con envíos
+    previos de la misma transacción (p. ej. los DELETE de --diff --delete).
+    finish se envía en la transacción del último lote, antes de su COMMIT (p. ej. el
+    recálculo de los resúmenes); si no queda ningún lote por enviar, va solo con un COMMIT.
+
+    Como cursor.rowcount mezcla inserciones y actualizaciones, se consulta una vez qué Nro
+    ya tienen pedido en la campaña y se cuentan por separado (salvo que se pasen en nros_existentes).
+    """
+    from carga_masiva import BulkUpserter, PreparedInsert
+    from conexion_mysql import BatchRetrier
+
+    if nros_existentes is None:
+        with metrics.stage("select_existentes", tabla="pedidos", campania=campania) as etapa:
+            cursor.execute("SELECT Nro FROM pedidos WHERE Campaña = %s", (campania,))
+            nros_existentes = {str(nro) for (nro,) in cursor.fetchall()}
+            etapa["filas"] = len(nros_existentes)
+    else:
+        nros_existentes = set(nros_existentes)
+
+    if retrier is None:
+        retrier = BatchRetrier(conn)
+    retries_before = retrier.retries
+
+    loader = None
+    if engine == "infile" and pedidos:
+        loader = BulkUpserter(cursor, "pedidos", MYSQL_PEDIDOS_COLUMNS,
+                              ["Unidades", "Faltantes", "PVP", "Costo_Rev"], SQL_PEDIDOS)
+    elif engine == "prepared" and pedidos:
+        loader = PreparedInsert(conn, SQL_PEDIDOS)
+        retrier.on_reconnect.append(loader.reset)
+
+    total_chunks = (len(pedidos) + chunk_size - 1) // chunk_size
+    stats = {"insertados": 0, "actualizados": 0, "filas": 0, "segundos": 0.0}
+    pending_commit = 0
+
+    start = time.perf_counter()
+    for chunk_index, chunk in enumerate(iter_chunks(pedidos, chunk_size)):
+        if chunk_index < start_chunk:
+            continue
+
+        chunk_start = time.perf_counter()
+        with metrics.stage("insert", tabla="pedidos", campania=campania, lote=chunk_index + 1,
+                           filas=len(chunk), motor=loader.engine if loader else "executemany"):
+            if loader:
+                retrier.send(lambda chunk=chunk: loader.send(chunk))
+            else:
+                retrier.send(lambda chunk=chunk: cursor.executemany(SQL_PEDIDOS, chunk))
+
+        nros_chunk = {row[1] for row in chunk}
+        nuevos = nros_chunk - nros_existentes
+        nros_existentes |= nuevos
+        stats["insertados"] += len(nuevos)
+        stats["actualizados"] += len(chunk) - len(nuevos)
+        stats["filas"] += len(chunk)
+
+        pending_commit += 1
+        if chunk_index == total_chunks - 1 and finish:
+            retrier.send(finish)
+            finish = None
+        if pending_commit == commit_every or chunk_index == total_chunks - 1:
+            with metrics.stage("commit", tabla="pedidos", campania=campania):
+                retrier.commit()
+            pending_commit = 0
+            if on_commit:
+                on_commit(chunk_index + 1)
+
+        if verbose and total_chunks > 1:
+            print(f"   Lote {chunk_index + 1}/{total_chunks}: {len(chunk)} filas en {time.perf_counter() - chunk_start:.3f} s")
+
+    if finish:
+        retrier.send(finish)
+        with metrics.stage("commit", tabla="pedidos", campania=campania):
+            retrier.commit()
+
+    if isinstance(loader, PreparedInsert):
+        retrier.on_reconnect.remove(loader.reset)
+        loader.close()
+    stats["reintentos"] = retrier.retries - retries_before
+    stats["segundos"] = time.perf_counter() - start
+    return stats
+
+# ====================================================================
+# === MODO DIFERENCIAL (--diff) ===
+# ====================================================================
+
+def _comparable_values(unidades, faltantes, pvp, costo_rev) -> tuple:
+    """
+    Normaliza los valores de un pedido para comparar el archivo con lo que ya está en MySQL:
+    los montos se redondean a 2 decimales como en DECIMAL(10,2) y NULL queda como None.
+    """
+    def money(value):
+        return None if value is None else round(float(value), 2)
+    def units(value):
+        return None if value is None else int(value)
+    return units(unidades), units(faltantes), money(pvp), money(costo_rev)
+
+def fetch_pedidos_snapshot(cursor, campania: str) -> Dict[str, tuple]:
+    """Estado actual de la campaña en una sola consulta: Nro → (Unidades, Faltantes, PVP, Costo_Rev)."""
+    with metrics.stage("snapshot", tabla="pedidos", campania=campania) as etapa:
+        cursor.execute(SQL_SNAPSHOT_PEDIDOS, (campania,))
+        snapshot = {str(nro): _comparable_values(*values) for nro, *values in cursor.fetchall()}
+        etapa["filas"] = len(snapshot)
+    return snapshot
+
+def diff_pedidos(pedidos: List[tuple], snapshot: Dict[str, tuple]) -> Tuple[List[tuple], List[tuple], int, List[str]]:
+    """
+    Compara los pedidos del archivo con el estado actual de la campaña.
+    Devuelve (nuevos, cambiados, cantidad sin cambios, Nro que ya no están en el archivo).
+    Si un Nro se repite en el archivo vale la última fila, igual que con el upsert completo.
+    """
+    ultimos = {row[1]: row for row in pedidos}
+
+    nuevos, cambiados, sin_cambios = [], [], 0
+    for nro, row in ultimos.items():
+        if nro not in snapshot:
+            nuevos.append(row)
+        elif snapshot[nro] != _comparable_values(*row[2:]):
+            cambiados.append(row)
+        else:
+            sin_cambios += 1
+
+    ausentes = sorted(set(snapshot) - set(ultimos))
+    return nuevos, cambiados, sin_cambios, ausentes
+
+def delete_pedidos(cursor, campania: str, nros: List[str], chunk_size: int = CHUNK_SIZE) -> int:
+    """Borra los pedidos de la campaña para los Nro indicados (en lotes de chunk_size). No hace COMMIT."""
+    borrados = 0
+    for chunk in iter_chunks(nros, chunk_size):
+        sql = SQL_DELETE_PEDIDOS.format(marcadores=", ".join(["%s"] * len(chunk)))
+        with metrics.stage("delete", tabla="pedidos", campania=campania, filas=len(chunk)):
+            cursor.execute(sql, (campania, *chunk))
+        borrados += len(chunk)
+    return borrados
+
+def upload_pedidos_diff(conn, cursor, pedidos: List[tuple], campania: str, chunk_size: int,
+                        commit_every: int = COMMIT_EVERY, delete_missing: bool = False,
+                        verbose: bool = True, engine: str = "executemany",
+                        finish: Optional[Callable[[], None]] = None,
+                        omitidos: Iterable[str] = ()) -> Dict[str, float]:
+    """
+    Carga diferencial: lee el estado de la campaña una vez, compara en memoria y sólo envía
+    los pedidos nuevos o con cambios (opcionalmente borra los clientes que ya no están).
+    `omitidos` son Nro que están en el archivo pero no se envían (huérfanos con --skip-orphans):
+    no se borran aunque falten en `pedidos`.
+    Los cambiados también van por SQL_PEDIDOS: executemany lo reescribe en un único INSERT
+    multi-fila, mientras que un UPDATE por fila sería un viaje al servidor por pedido.
+    """
+    from conexion_mysql import BatchRetrier
+
+    start = time.perf_counter()
+    snapshot = fetch_pedidos_snapshot(cursor, campania)
+    nuevos, cambiados, sin_cambios, ausentes = diff_pedidos(pedidos, snapshot)
+    if omitidos:
+        omitidos = set(omitidos)
+        ausentes = [nro for nro in ausentes if nro not in omitidos]
+
+    # Los DELETE van por el mismo retrier: si se corta la conexión antes del primer COMMIT se repiten
+    retrier = BatchRetrier(conn)
+    eliminados = 0
+    if delete_missing and ausentes:
+        retrier.send(lambda: delete_pedidos(cursor, campania, ausentes))
+        eliminados = len(ausentes)
+
+    a_enviar = nuevos + cambiados
+    stats = upload_pedidos(conn, cursor, a_enviar, campania, chunk_size or max(len(a_enviar), 1),
+                           commit_every, verbose=verbose, nros_existentes=set(snapshot), engine=engine,
+                           retrier=retrier, finish=finish)
+    with metrics.stage("commit", tabla="pedidos", campania=campania):
+        retrier.commit()  # Confirma los DELETE aunque no haya filas para enviar
+
+    stats.update({"sin_cambios": sin_cambios, "eliminados": eliminados, "ausentes": len(ausentes),
+                  "segundos": time.perf_counter() - start})
+    return stats
+
+def load_pedidos(conn, df_out: "pd.DataFrame", campania: str, chunk_size: Optional[int] = None,
+                 commit_every: int = COMMIT_EVERY, resume_file: Optional[str] = None,
+                 resume: bool = False, verbose: bool = True, diff: bool = False,
+                 delete_missing: bool = False, engine: str = "executemany",
+                 directory: Optional[ClientDirectory] = None,
+                 skip_orphans: bool = False, rollups: bool = True) -> Optional[Dict[str, float]]:
+    """
+    Paso completo de carga de pedidos sobre una conexión abierta: prepara las filas,
+    asegura la tabla y las sube (en lotes si se indica chunk_size).
+    Con resume_file, registra el punto de reanudación de cada COMMIT junto a ese archivo.
+    Con diff=True sólo se envían los pedidos nuevos o modificados (ver upload_pedidos_diff);
+    no hace falta punto de reanudación porque volver a correrlo sólo envía lo que falta.
+    engine="infile" usa LOAD DATA LOCAL INFILE (la conexión debe abrirse con allow_local_infile=True).
+    Con directory (ver directorio_clientes.py) se marcan los pedidos de clientes que no están
+    en la tabla clientes y, con skip_orphans=True, no se cargan.
+    Con rollups=True se recalculan los resúmenes de la campaña en la misma transacción que el
+    último lote (ver resumenes.py).
+    Devuelve las estadísticas de upload_pedidos (más 'celdas_invalidas' y 'huerfanos'), o None si no hay
+    pedidos válidos. Los errores de MySQL se propagan para que quien llama haga el rollback.
+    Con verbose=False no imprime nada (carga de varias campañas en paralelo).
+    """
+    from conexion_mysql import ensure_table
+
+    # Preparación de datos para la base de datos (por columnas)
+    with metrics.stage("preparar_pedidos", campania=campania) as etapa:
+        pedidos_a_insertar, celdas_invalidas = prepare_pedidos(df_out, campania)
+        etapa["filas"] = len(pedidos_a_insertar)
+
+    if verbose and any(celdas_invalidas.values()):
+        detalle = ", ".join(f"'{col}': {n}" for col, n in celdas_invalidas.items() if n)
+        print(f"⚠️ Celdas con formato inválido (se cargan como NULL): {detalle}")
+
+    huerfanos: List[str] = []
+    if directory is not None:
+        with metrics.stage("huerfanos", campania=campania) as etapa:
+            pedidos_a_insertar, huerfanos = find_orphans(pedidos_a_insertar, directory, skip_orphans)
+            etapa["filas"] = len(huerfanos)
+        if verbose and huerfanos:
+            muestra = ", ".join(huerfanos[:10]) + (", ..." if len(huerfanos) > 10 else "")
+            accion = "no se cargan" if skip_orphans else "se cargan igual; usar --skip-orphans para omitirlos"
+            print(f"⚠️ Pedidos de clientes que no están en la tabla clientes: {len(huerfanos)} ({accion})")
+            print(f"   Nro: {muestra}")
+
+    if not pedidos_a_insertar:
+        if verbose:
+            print("⚠️ No se encontraron registros de pedidos válidos para insertar.")
+        return None
+        
+    if verbose:
+        print(f"   Pedidos válidos para cargar: {len(pedidos_a_insertar)}")
+
+    if diff:
+        cursor = conn.cursor()
+        try:
+            ensure_table(cursor, SQL_CREATE_PEDIDOS)
+            finish = prepare_rollups(cursor, campania) if rollups else None
+            # Los huérfanos que no se cargan siguen en el archivo: --delete no borra lo que ya tenían
+            stats = upload_pedidos_diff(conn, cursor, pedidos_a_insertar, campania, chunk_size,
+                                        commit_every, delete_missing, verbose, engine, finish,
+                                        omitidos=huerfanos if skip_orphans else ())
+        finally:
+            cursor.close()
+        stats["celdas_invalidas"] = sum(celdas_invalidas.values())
+        stats["huerfanos"] = len(huerfanos)
+        if verbose:
+            print_diff_summary(stats, delete_missing)
+        return stats
+
+    total_rows = len(pedidos_a_insertar)
+    track_resume = bool(chunk_size and resume_file)
+    if not chunk_size:
+        # Sin lotes: todo en un solo executemany y una sola transacción
+        chunk_size, commit_every = total_rows, 1
+
+    start_chunk = 0
+    if track_resume and resume:
+        start_chunk = load_resume_point(resume_file, campania, chunk_size, total_rows)
+        if verbose and start_chunk:
+            print(f"   Reanudando: se saltean {start_chunk} lotes ya confirmados.")
+
+    # Punto de reanudación registrado después de cada COMMIT
+    def on_commit(chunks_done: int) -> None:
+        save_resume_point(resume_file, campania, chunk_size, total_rows, chunks_done)
+
+    cursor = conn.cursor()
+    try:
+        ensure_table(cursor, SQL_CREATE_PEDIDOS)
+        finish = prepare_rollups(cursor, campania) if rollups else None
+
+        # Ejecución masiva (en lotes si se indicó chunk_size)
+        stats = upload_pedidos(conn, cursor, pedidos_a_insertar, campania,
+                               chunk_size, commit_every, start_chunk,
+                               on_commit if track_resume else None, verbose,
+                               engine=engine, finish=finish)
+    finally:
+        cursor.close()
+
+    if track_resume:
+        clear_resume_point(resume_file)
+
+    stats["celdas_invalidas"] = sum(celdas_invalidas.values())
+    stats["huerfanos"] = len(huerfanos)
+    if not verbose:
+        return stats
+
+    print("\n--- Carga de Pedidos Terminada ---")
+    print(f"   Pedidos insertados (nuevos): {stats['insertados']}")
+    print(f"   Pedidos actualizados (ya existían): {stats['actualizados']}")
+    if stats["segundos"] > 0:
+        print(f"   Velocidad: {stats['filas'] / stats['segundos']:.0f} filas/s ({stats['segundos']:.2f} s)")
+    print("----------------------------------")
+    return stats
+
+def prepare_rollups(cursor, campania: str) -> Callable[[], None]:
+    """
+    Crea las tablas de resúmenes antes de la carga (el CREATE TABLE confirma la transacción
+    en curso) y devuelve el recálculo de la campaña, que upload_pedidos envía junto con el
+    último lote, antes de su COMMIT.
+    """
+    ensure_rollup_tables(cursor)
+    return lambda: refresh_rollups(cursor, campania)
+
+def print_diff_summary(stats: Dict[str, float], delete_missing: bool) -> None:
+    print("\n--- Carga Diferencial de Pedidos Terminada ---")
+    print(f"   Pedidos nuevos: {stats['insertados']}")
+    print(f"   Pedidos con cambios (actualizados): {stats['actualizados']}")
+    print(f"   Pedidos sin cambios (no se envían): {stats['sin_cambios']}")
+    if delete_missing:
+        print(f"   Pedidos eliminados (el cliente ya no está en el archivo): {stats['eliminados']}")
+    elif stats["ausentes"]:
+        print(f"   ⚠️ Pedidos en MySQL que ya no están en el archivo: {stats['ausentes']} (se conservan; usar --delete para borrarlos)")
+    print(f"   Tiempo: {stats['segundos']:.2f} s")
+    print("----------------------------------------------")
+
+# ====================================================================
+# === CARGA DE VARIAS CAMPAÑAS (--batch) ===
+# ====================================================================
+
+def _campaign_sort_key(campania: str) -> Tuple[str, str]:
+    # CmmAA: se ordena por año y luego por número de campaña
+    return campania[3:5], campania[1:3]
+
+def discover_campaign_files(pattern: str) -> List[Tuple[str, str]]:
+    """
+    Busca los archivos *_Unificado de una carpeta (o que coincidan con un patrón glob) y
+    devuelve (campaña, ruta) ordenados cronológicamente. Si una campaña tiene varios
+    formatos se elige con find_unified (Parquet/CSV al día antes que el Excel).
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*_Unificado.*")
+
+    stems = set()
+    for path in glob.glob(pattern):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() in (".xlsx", ".parquet", ".csv") and not os.path.basename(path).startswith('~'):
+            stems.add(stem)
+
+    campaigns = {}
+    for stem in stems:
+        campania = extract_campania(stem)
+        path = find_unified(stem + ".xlsx")
+        if not campania or path is None:
+            print(f"⚠️ Se ignora '{os.path.basename(stem)}': no se pudo determinar la Campaña (CmmAA).")
+            continue
+        if campania in campaigns:
+            print(f"⚠️ La campaña {campania} aparece en más de un archivo; se usa {os.path.basename(campaigns[campania])}.")
+            continue
+        campaigns[campania] = path
+
+    return sorted(campaigns.items(), key=lambda item: _campaign_sort_key(item[0]))
+
+def load_campaign_file(pool, campania: str, path: str, diff: bool = False,
+                       delete_missing: bool = False, engine: str = "executemany",
+                       directory: Optional[ClientDirectory] = None,
+                       skip_orphans: bool = False, rollups: bool = True,
+                       dedup: str = "ultimo", chunk_size: Optional[int] = None,
+                       commit_every: int = COMMIT_EVERY, resume: bool = False) -> Dict[str, object]:
+    """
+    Carga una campaña en su propia conexión del pool y su propia transacción (o en lotes
+    con chunk_size, con el punto de reanudación junto al archivo de la campaña).
+    El directorio de clientes se comparte (sólo lectura) entre todas las campañas.
+    """
+    result = {"campania": campania, "archivo": os.path.basename(path), "filas": 0,
+              "insertados": 0, "actualizados": 0, "sin_cambios": 0, "eliminados": 0,
+              "celdas_invalidas": 0, "huerfanos": 0, "repetidos": 0, "segundos": 0.0, "error": None}
+    start = time.perf_counter()
+    conn = None
+    try:
+        with metrics.stage("leer_unificado", archivo=os.path.basename(path), campania=campania) as etapa:
+            df_out = read_unified(path)
+            etapa["filas"] = len(df_out)
+        missing_cols = [col for col in EXCEL_COLUMNS_TO_EXTRACT if col not in df_out.columns]
+        if missing_cols:
+            raise ValueError(f"faltan columnas {missing_cols}")
+        with metrics.stage("deduplicar", politica=dedup, campania=campania) as etapa:
+            df_out, _, dedup_stats = deduplicar.dedupe_clientes(df_out, dedup)
+            result["repetidos"] = dedup_stats["filas_juntadas"]
+            etapa["filas"] = len(df_out)
+
+        conn = pool.get_connection()
+        stats = load_pedidos(conn, df_out, campania, chunk_size, commit_every,
+                             resume_file=path, resume=resume, verbose=False, diff=diff,
+                             delete_missing=delete_missing, engine=engine,
+                             directory=directory, skip_orphans=skip_orphans, rollups=rollups)
+        if stats:
+            for key in ("filas", "insertados", "actualizados", "sin_cambios", "eliminados",
+                        "celdas_invalidas", "huerfanos"):
+                result[key] = int(stats.get(key, 0))
+    except Exception as e:
+        result["error"] = str(e)
+        if conn and conn.is_connected():
+            conn.rollback()
+    finally:
+        if conn:
+            conn.close()  # Devuelve la conexión al pool
+    result["segundos"] = time.perf_counter() - start
+    return result
+
+def print_batch_summary(results: List[Dict[str, object]], elapsed: float) -> None:
+    print("\n--- Resumen por Campaña ---")
+    print(f"   {'Campaña':<8} {'Filas':>8} {'Nuevos':>8} {'Actual.':>8} {'Sin camb.':>9} {'Elim.':>6} "
+          f"{'Inválid.':>8} {'Huérf.':>7} {'Repet.':>7} {'Seg.':>7} {'Filas/s':>9}  Archivo")
+    for r in results:
+        if r["error"]:
+            print(f"   {r['campania']:<8} ❌ {r['error']}  ({r['archivo']})")
+            continue
+        rate = r["filas"] / r["segundos"] if r["segundos"] else 0
+        print(f"   {r['campania']:<8} {r['filas']:>8} {r['insertados']:>8} {r['actualizados']:>8} "
+              f"{r['sin_cambios']:>9} {r['eliminados']:>6} {r['celdas_invalidas']:>8} {r['huerfanos']:>7} "
+              f"{r['repetidos']:>7} {r['segundos']:>7.2f} {rate:>9.0f}  {r['archivo']}")
+    total_rows = sum(r["filas"] for r in results)
+    failed = sum(1 for r in results if r["error"])
+    print(f"   Total: {len(results) - failed} campañas cargadas, {failed} con error, {total_rows} filas "
+          f"en {elapsed:.2f} s ({total_rows / elapsed if elapsed else 0:.0f} filas/s)")
+    print("---------------------------")
+
+def load_directory(conn, snapshot_path: Optional[str] = None) -> ClientDirectory:
+    """Directorio de clientes para marcar los pedidos huérfanos (una lectura de la tabla clientes)."""
+    cursor = conn.cursor()
+    try:
+        with metrics.stage("directorio_clientes") as etapa:
+            directory = get_client_directory(cursor, snapshot_path)
+            etapa.update(filas=len(directory), origen=directory.source)
+    finally:
+        cursor.close()
+    print(f"✅ Directorio de clientes: {len(directory)} clientes (leídos de {directory.source}).")
+    return directory
+
+def run_batch(db_config: dict, pattern: str, parallel: int, diff: bool = False,
+              delete_missing: bool = False, engine: str = "executemany",
+              check_clients: bool = True, skip_orphans: bool = False,
+              snapshot_path: Optional[str] = None, rollups: bool = True,
+              dedup: str = "ultimo", chunk_size: Optional[int] = None,
+              commit_every: int = COMMIT_EVERY, resume: bool = False) -> List[Dict[str, object]]:
+    """
+    Carga cada campaña de --batch en su propia transacción. Devuelve el resultado de cada una.
+    Los errores de conexión (credenciales, servidor caído) se propagan: no se cargó ninguna.
+    """
+    from conexion_mysql import create_pool
+
+    campaigns = discover_campaign_files(pattern)
+    if not campaigns:
+        print(f"⚠️ No se encontraron archivos *_Unificado en '{pattern}'.")
+        return []
+
+    print(f"✅ Campañas encontradas: {', '.join(c for c, _ in campaigns)}")
+    parallel = max(1, min(parallel, len(campaigns)))
+    pool = create_pool(db_config, parallel)
+    print(f"✅ Pool de {parallel} conexiones a MySQL establecido.")
+
+    directory = None
+    if check_clients:
+        conn = pool.get_connection()
+        try:
+            directory = load_directory(conn, snapshot_path)
+        finally:
+            conn.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        results = list(executor.map(lambda item: load_campaign_file(pool, *item, diff, delete_missing, engine,
+                                                                    directory, skip_orphans, rollups, dedup,
+                                                                    chunk_size, commit_every, resume),
+                                    campaigns))
+    print_batch_summary(results, time.perf_counter() - start)
+    return results
+
+def dry_run_batch(pattern: str, dedup: str = "ultimo") -> bool:
+    """
+    --batch --dry-run: la misma verificación que para un solo archivo (columnas, filas válidas,
+    celdas inválidas) en cada campaña, sin conectarse a MySQL. Devuelve False si alguna falla.
+    """
+    campaigns = discover_campaign_files(pattern)
+    if not campaigns:
+        print(f"⚠️ No se encontraron archivos *_Unificado en '{pattern}'.")
+        return True
+
+    print(f"🔎 Prueba (--dry-run): {len(campaigns)} campañas para cargar con --batch")
+    failed = []
+    for campania, path in campaigns:
+        print(f"\n-> {campania}: {path}")
+        try:
+            with metrics.stage("leer_unificado", archivo=os.path.basename(path), campania=campania) as etapa:
+                df_out = read_unified(path)
+                etapa["filas"] = len(df_out)
+        except Exception as e:
+            print(f"❌ Error al leer el archivo: {e}")
+            failed.append(campania)
+            continue
+        missing_cols = [col for col in EXCEL_COLUMNS_TO_EXTRACT if col not in df_out.columns]
+        if missing_cols:
+            print(f"❌ El archivo NO contiene las siguientes columnas: {missing_cols}")
+            failed.append(campania)
+            continue
+        print_dry_run(deduplicar.apply_dedup(df_out, dedup), campania)
+
+    if failed:
+        print(f"\n❌ Campañas con error: {', '.join(failed)}")
+    return not failed
+
+def prepare_schema(db_config: dict, partition: bool, rebuild: bool) -> None:
+    """--particionar y --rebuild-rollups: cambios de esquema que se hacen una sola vez."""
+    from conexion_mysql import connect
+
+    conn = connect(db_config)
+    cursor = conn.cursor()
+    try:
+        if partition:
+            print("Particionando la tabla pedidos por Campaña (puede demorar si ya tiene muchas filas)...")
+            with metrics.stage("particionar", tabla="pedidos"):
+                changed = partition_pedidos(cursor)
+            print("✅ Tabla pedidos particionada." if changed else "   La tabla pedidos ya estaba particionada.")
+        if rebuild:
+            campanias = rebuild_rollups(cursor)
+            conn.commit()
+            print(f"✅ Resúmenes recalculados para {len(campanias)} campañas.")
+    finally:
+        cursor.close()
+        conn.close()
+
+def print_dry_run(df_out: "pd.DataFrame", campania: str) -> None:
+    """Resumen de --dry-run: pedidos que se enviarían y celdas inválidas, sin conectarse a MySQL."""
+    with metrics.stage("preparar_pedidos", campania=campania) as etapa:
+        pedidos, celdas_invalidas = prepare_pedidos(df_out, campania)
+        etapa["filas"] = len(pedidos)
+    print("\n--- Prueba (--dry-run): no se conectó a MySQL ---")
+    print(f"   Campaña: {campania}")
+    print(f"   Pedidos válidos para cargar: {len(pedidos)} (de {len(df_out)} filas)")
+    if any(celdas_invalidas.values()):
+        detalle = ", ".join(f"'{col}': {n}" for col, n in celdas_invalidas.items() if n)
+        print(f"⚠️ Celdas con formato inválido (se cargarían como NULL): {detalle}")
+    print("----------------------------------")
+
 # ====================================================================
 # === FUNCIÓN PRINCIPAL ===
 # ====================================================================
 
-def main():
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Devuelve el código de salida: 0 si la carga (o la verificación) salió bien, 1 si no."""
+    parser = argparse.ArgumentParser(prog=prog, description="Carga los pedidos de la campaña del archivo unificado en MySQL.")
+    parser.add_argument("archivo", nargs="?", default=archivo_entrada,
+                        help="Archivo unificado CmmAA_Unificado (por defecto PEDIDOS_UNIFICADO o archivo_entrada); "
+                             "se prefiere el .parquet o .csv con el mismo nombre si está al día.")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help=f"Activa la carga por lotes con N filas por lote (sugerido {CHUNK_SIZE}). "
+                             "Sin esta opción se envía todo en un solo lote y una sola transacción.")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY,
+                        help=f"Lotes por COMMIT en la carga por lotes (por defecto {COMMIT_EVERY}).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continúa una carga por lotes interrumpida desde el último COMMIT registrado.")
+    parser.add_argument("--batch", metavar="CARPETA_O_PATRON",
+                        help="Carga todas las campañas *_Unificado de una carpeta o patrón glob "
+                             "(ej. 'C:\\...\\Minipedido\\C*25_Unificado.*'), cada una en su propia transacción.")
+    parser.add_argument("--parallel", type=int, default=4,
+                        help=f"Campañas cargadas en paralelo con --batch (por defecto 4, hasta {MAX_PARALLEL}).")
+    parser.add_argument("--diff", action="store_true",
+                        help="Compara con lo que ya está cargado en la campaña y sólo envía los pedidos nuevos o modificados.")
+    parser.add_argument("--delete", action="store_true",
+                        help="Con --diff, borra los pedidos de clientes que ya no están en el archivo.")
+    parser.add_argument("--engine", choices=ENGINES, default="executemany",
+                        help="executemany (por defecto), infile: LOAD DATA LOCAL INFILE a una tabla de staging "
+                             "+ INSERT ... SELECT (si el servidor no lo permite se usa executemany) o prepared: "
+                             "INSERT multi-fila preparado en el servidor.")
+    parser.add_argument("--no-check-clients", action="store_true",
+                        help="No verifica que el Nro de cada pedido exista en la tabla clientes.")
+    parser.add_argument("--skip-orphans", action="store_true",
+                        help="No carga los pedidos de clientes que no están en la tabla clientes (por defecto sólo se avisa).")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE, default=None, metavar="ARCHIVO",
+                        help="Guarda el directorio de clientes en un snapshot local y lo reutiliza mientras "
+                             f"la tabla no cambie (por defecto {SNAPSHOT_FILE}).")
+    parser.add_argument("--no-rollups", action="store_true",
+                        help="No actualiza los resúmenes pedidos_lider y pedidos_campania de la campaña cargada.")
+    parser.add_argument("--rebuild-rollups", action="store_true",
+                        help="Recalcula los resúmenes de todas las campañas ya cargadas antes de la carga.")
+    parser.add_argument("--particionar", action="store_true",
+                        help=f"Pasa la tabla pedidos al esquema particionado por Campaña ({PEDIDOS_PARTITIONS} "
+                             "particiones) con índice por Nro. Se hace una sola vez.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Verifica el código de campaña, las columnas y las filas válidas del archivo (o las "
+                             "campañas de --batch) sin conectarse a MySQL.")
+    deduplicar.add_arguments(parser)
+    instrumentacion.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentacion.setup(args, "4_subir_pedidos")
+    if args.skip_orphans and args.no_check_clients:
+        parser.error("--skip-orphans no se puede usar junto con --no-check-clients")
+    if args.delete and not args.diff:
+        parser.error("--delete sólo se puede usar junto con --diff")
+    if args.conflictos and args.batch:
+        parser.error("--conflictos no se puede usar junto con --batch (un archivo por campaña)")
+    if not 1 <= args.parallel <= MAX_PARALLEL:
+        parser.error(f"--parallel tiene que estar entre 1 y {MAX_PARALLEL}")
+    if args.dry_run and (args.particionar or args.rebuild_rollups):
+        parser.error("--dry-run no se puede usar junto con --particionar ni --rebuild-rollups")
+
+    if args.dry_run and args.batch:
+        return 0 if dry_run_batch(args.batch, args.dedup) else 1
+
+    if args.dry_run:
+        DB_CONFIG = None
+    else:
+        import mysql.connector
+        from conexion_mysql import ask_db_config, connect
+
+        DB_CONFIG = ask_db_config()
+    if DB_CONFIG and args.engine == "infile":
+        DB_CONFIG["allow_local_infile"] = True
+
+    if args.particionar or args.rebuild_rollups:
+        try:
+            prepare_schema(DB_CONFIG, args.particionar, args.rebuild_rollups)
+        except mysql.connector.Error as err:
+            print(f"\n❌ Error al modificar el esquema: {err}")
+            return 1
+
+    if args.batch:
+        try:
+            results = run_batch(DB_CONFIG, args.batch, args.parallel, args.diff, args.delete, args.engine,
+                                not args.no_check_clients, args.skip_orphans, args.snapshot, not args.no_rollups,
+                                args.dedup, args.chunk_size, args.commit_every, args.resume)
+        except mysql.connector.Error as err:
+            print(f"\n❌ Error de base de datos o conexión: {err}")
+            return 1
+        return 1 if any(r["error"] for r in results) else 0
+
     # 1. Obtener Campaña y verificar archivo
-    campania = extract_campania(archivo_entrada)
+    campania = extract_campania(args.archivo)
     if not campania:
-        print(f"❌ Error: No se pudo determinar la Campaña (CmmAA) del nombre del archivo '{os.path.basename(archivo_entrada)}'.")
+        print(f"❌ Error: No se pudo determinar la Campaña (CmmAA) del nombre del archivo '{os.path.basename(args.archivo)}'.")
         print("   Asegúrate de que el nombre del archivo contenga el patrón CmmAA (ej. C1025).")
-        return
+        return 1
         
-    if not os.path.exists(archivo_entrada):
-        print(f"❌ Error: No se encontró el archivo de entrada en la ruta: {archivo_entrada}")
-        return
+    # Se prefiere el Parquet/CSV unificado si existe y está al día
+    ruta_unificado = find_unified(args.archivo)
+    if ruta_unificado is None:
+        print(f"❌ Error: No se encontró el archivo de entrada en la ruta: {args.archivo}")
+        return 1
 
-    print(f"✅ Leyendo archivo: {archivo_entrada}")
+    print(f"✅ Leyendo archivo: {ruta_unificado}")
     print(f"   Campaña detectada: {campania}")
 
-    # 2. Leer el archivo Excel unificado
+    # 2. Leer el archivo unificado
     try:
-        df_out = pd.read_excel(archivo_entrada, dtype=str).fillna("")
+        with metrics.stage("leer_unificado", archivo=os.path.basename(ruta_unificado)) as etapa:
+            df_out = read_unified(ruta_unificado)
+            etapa["filas"] = len(df_out)
         
         # Validar que las columnas necesarias existan
         missing_cols = [col for col in EXCEL_COLUMNS_TO_EXTRACT if col not in df_out.columns]
         if missing_cols:
             print(f"❌ Error: El Excel unificado NO contiene las siguientes columnas: {missing_cols}")
             print("   Revisa el script de unificación y la estructura de tu Excel.")
-            return
+            return 1
 
     except Exception as e:
         print(f"❌ Error al leer o procesar el archivo Excel: {e}")
-        return
+        return 1
 
-    # 3. Preparación de datos para la base de datos
-    pedidos_a_insertar = []
-    
-    for _, row in df_out.iterrows():
-        # Extracción y limpieza
-        nro = str(row["Nro"]).strip()
-        
-        # Saltamos filas sin Nro de cliente válido
-        if not nro.isdigit() or len(nro) < 4:
-            continue
-            
-        unidades = int(str(row["U. Ped"]).strip() or 0)
-        faltantes = int(str(row["Falt."]).strip() or 0)
-        
-        # Limpieza de valores monetarios
-        pvp = clean_monetary_value(row["P.V.P."])
-        costo_rev = clean_monetary_value(row["Costo Rev."])
-        
-        # El orden de la tupla DEBE coincidir con MYSQL_PEDIDOS_COLUMNS
-        pedidos_a_insertar.append((
-            campania,
-            nro,
-            unidades,
-            faltantes,
-            pvp,
-            costo_rev
-        ))
+    # Un Nro repetido iría dos veces a la misma clave (Campaña, Nro): se junta antes de cargar
+    df_out = deduplicar.apply_dedup(df_out, args.dedup, args.conflictos)
+    if args.dry_run:
+        print_dry_run(df_out, campania)
+        return 0
 
-    if not pedidos_a_insertar:
-        print("⚠️ No se encontraron registros de pedidos válidos para insertar.")
-        return
-        
-    print(f"   Pedidos válidos para cargar: {len(pedidos_a_insertar)}")
-
-    # 4. Conexión y Carga a MySQL
+    # 3. Conexión y Carga a MySQL
     conn = None
     try:
         # Intento de conexión con las credenciales ingresadas
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor()
+        with metrics.stage("conexion_mysql"):
+            conn = connect(DB_CONFIG)
         print("✅ Conexión a MySQL establecida con éxito.")
 
-        # Crear/Asegurar tabla pedidos
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pedidos (
-            idPedidos INT AUTO_INCREMENT PRIMARY KEY,
-            Campaña VARCHAR(5) NOT NULL,
-            Nro VARCHAR(6) NOT NULL,
-            Unidades INT NULL,
-            Faltantes INT NULL,
-            PVP DECIMAL(10,2) NULL,
-            Costo_Rev DECIMAL(10,2) NULL,
-            UNIQUE KEY uk_campana_nro (Campaña, Nro)  -- Clave única para UPDATE
-        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
-        """)
-        
-        # SQL para INSERT O UPDATE (si ya existe la Campaña y el Nro)
-        sql_pedidos = f"""
-        INSERT INTO pedidos ({', '.join(MYSQL_PEDIDOS_COLUMNS)})
-        VALUES (%s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            Unidades = VALUES(Unidades),
-            Faltantes = VALUES(Faltantes),
-            PVP = VALUES(PVP),
-            Costo_Rev = VALUES(Costo_Rev)
-        """
-
-        # Ejecución masiva
-        cursor.executemany(sql_pedidos, pedidos_a_insertar)
-        conn.commit()
-
-        print("\n--- Carga de Pedidos Terminada ---")
-        print(f"   Registros insertados/actualizados en 'pedidos': {cursor.rowcount}")
-        print("----------------------------------")
+        directory = None if args.no_check_clients else load_directory(conn, args.snapshot)
+        load_pedidos(conn, df_out, campania, args.chunk_size, args.commit_every,
+                     resume_file=ruta_unificado, resume=args.resume,
+                     diff=args.diff, delete_missing=args.delete, engine=args.engine,
+                     directory=directory, skip_orphans=args.skip_orphans, rollups=not args.no_rollups)
+        return 0
 
     except mysql.connector.Error as err:
         print(f"\n❌ Error de base de datos o conexión: {err}")
@@ -204,11 +952,10 @@ def main():
     except Exception as e:
         print(f"\n❌ Error inesperado: {e}")
     finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
         if conn and conn.is_connected():
             conn.close()
             print("Conexión a MySQL cerrada.")
+    return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,181 @@
+import os
+import re
+from typing import TYPE_CHECKING, List, Optional
+
+# pandas se importa al leer o escribir (los scripts lo importan recién cuando lo necesitan)
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ====================================================================
+# === ESQUEMA DEL ARCHIVO UNIFICADO ===
+# ====================================================================
+# Lo escribe 2_unificar_excels.py y lo leen 3_subir_clientes.py y 4_subir_pedidos.py.
+
+# Columnas finales esperadas en el DataFrame unificado (Orden final y nombres exactos)
+COLUMNS_ORDER = [
+    "Nro", "Cliente", "U. Ent.", "Falt.", "U. Ped", "P.V.P.",
+    "Ofertas", "Extras", "Costo Rev.", "Bonif.", "Lider"
+]
+
+# Tipo de cada columna en el Parquet. Se guardan como texto, igual que en el Excel:
+# la limpieza (montos con formato argentino, unidades) y el conteo de celdas inválidas
+# se hacen en los scripts de carga.
+COLUMN_TYPES = {col: "string" for col in COLUMNS_ORDER}
+
+# Formatos de salida soportados; los columnares se prefieren al leer
+OUTPUT_FORMATS = ["xlsx", "parquet", "csv"]
+COLUMNAR_FORMATS = ["parquet", "csv"]
+
+
+def extract_campania(file_path: str) -> Optional[str]:
+    """
+    Extrae la Campaña (CmmAA) del nombre del archivo (ej. C1025) a partir de la ruta completa.
+    Busca 'C' seguido de 4 dígitos dentro del nombre del archivo.
+    """
+    if not isinstance(file_path, str):
+        return None
+        
+    # 1. Obtener el nombre del archivo (ej. C1025_Unificado.xlsx)
+    file_name = os.path.basename(file_path)
+    
+    # 2. Buscar 'C' seguido de 4 dígitos en el nombre del archivo
+    match = re.search(r"(C\d{4})", file_name, re.IGNORECASE)
+    
+    if match:
+        return match.group(1).upper()
+        
+    return None
+
+def unified_path(xlsx_path: str, fmt: str) -> str:
+    """Ruta del archivo unificado en el formato pedido (mismo nombre, otra extensión)."""
+    return f"{os.path.splitext(xlsx_path)[0]}.{fmt}"
+
+def _parquet_schema(columns: List[str]):
+    import pyarrow as pa
+    return pa.schema([(col, getattr(pa, COLUMN_TYPES.get(col, "string"))()) for col in columns])
+
+def write_unified(df: "pd.DataFrame", xlsx_path: str, formats: List[str]) -> List[str]:
+    """Guarda el DataFrame unificado en cada formato pedido. Devuelve las rutas escritas."""
+    written = []
+    for fmt in formats:
+        path = unified_path(xlsx_path, fmt)
+        if fmt == "xlsx":
+            df.to_excel(path, index=False)
+        elif fmt == "parquet":
+            df.to_parquet(path, index=False, schema=_parquet_schema(list(df.columns)))
+        elif fmt == "csv":
+            df.to_csv(path, index=False, encoding="utf-8")
+        else:
+            raise ValueError(f"Formato de salida desconocido: {fmt}")
+        written.append(path)
+    return written
+
+class UnifiedWriter:
+    """
+    Escribe el archivo unificado de a partes (un DataFrame por archivo de líder) sin
+    juntarlas en memoria: CSV agregando filas al archivo abierto, Parquet con un
+    ParquetWriter (un row group por parte) y XLSX con openpyxl en modo write-only.
+    Cada formato se escribe en un archivo '.parcial' que reemplaza al definitivo sólo si
+    la escritura termina bien. Se usa como context manager.
+    """
+
+    def __init__(self, xlsx_path: str, formats: List[str]):
+        unknown = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+        if unknown:
+            raise ValueError(f"Formato de salida desconocido: {unknown[0]}")
+        self.paths = {fmt: unified_path(xlsx_path, fmt) for fmt in formats}
+        self.columns: Optional[List[str]] = None
+        self.rows = 0
+        self.written: List[str] = []
+        self._writers = {}
+
+    def __enter__(self) -> "UnifiedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(success=exc_type is None)
+
+    @staticmethod
+    def _partial(path: str) -> str:
+        return path + ".parcial"
+
+    def _open(self, columns: List[str]) -> None:
+        self.columns = columns
+        for fmt, path in self.paths.items():
+            if fmt == "csv":
+                self._writers[fmt] = open(self._partial(path), "w", encoding="utf-8", newline="")
+            elif fmt == "parquet":
+                import pyarrow.parquet as pq
+                self._writers[fmt] = pq.ParquetWriter(self._partial(path), _parquet_schema(columns))
+            elif fmt == "xlsx":
+                import openpyxl
+                workbook = openpyxl.Workbook(write_only=True)
+                sheet = workbook.create_sheet("Sheet1")  # Mismo nombre de hoja que to_excel
+                sheet.append(columns)
+                self._writers[fmt] = (workbook, sheet)
+
+    def append(self, df: "pd.DataFrame") -> None:
+        """Agrega las filas de df (con las mismas columnas que la primera parte)."""
+        import pandas as pd
+
+        if self.columns is None:
+            self._open(list(df.columns))
+        elif list(df.columns) != self.columns:
+            raise ValueError(f"Columnas distintas a las de la primera parte: {list(df.columns)}")
+
+        for fmt, writer in self._writers.items():
+            if fmt == "csv":
+                df.to_csv(writer, header=self.rows == 0, index=False)
+            elif fmt == "parquet":
+                import pyarrow as pa
+                # Las columnas categóricas se guardan como texto, igual que en write_unified
+                table = pa.Table.from_pandas(df.astype(object), schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+            elif fmt == "xlsx":
+                _, sheet = writer
+                for row in df.astype(object).itertuples(index=False, name=None):
+                    sheet.append([None if pd.isna(value) else value for value in row])
+        self.rows += len(df)
+
+    def close(self, success: bool = True) -> List[str]:
+        """Cierra los archivos. Si success, reemplaza los definitivos; si no, borra los parciales."""
+        written = []
+        for fmt, writer in self._writers.items():
+            path = self.paths[fmt]
+            if fmt == "xlsx":
+                if success:
+                    writer[0].save(self._partial(path))
+            else:
+                writer.close()
+            if success:
+                os.replace(self._partial(path), path)
+                written.append(path)
+            elif os.path.exists(self._partial(path)):
+                os.remove(self._partial(path))
+        self._writers = {}
+        self.written = written
+        return written
+
+def find_unified(xlsx_path: str) -> Optional[str]:
+    """
+    Elige qué archivo unificado leer: el Parquet o CSV si existe y no es más viejo que el
+    Excel (si el Excel se regeneró después, el columnar quedó desactualizado); si no, el Excel.
+    """
+    xlsx_mtime = os.path.getmtime(xlsx_path) if os.path.exists(xlsx_path) else None
+    for fmt in COLUMNAR_FORMATS:
+        path = unified_path(xlsx_path, fmt)
+        if os.path.exists(path) and (xlsx_mtime is None or os.path.getmtime(path) >= xlsx_mtime):
+            return path
+    return xlsx_path if xlsx_mtime is not None else None
+
+def read_unified(path: str) -> "pd.DataFrame":
+    """Lee el archivo unificado como texto (igual que read_excel con dtype=str) con "" en las celdas vacías."""
+    import pandas as pd
+
+    if path.lower().endswith(".parquet"):
+        df = pd.read_parquet(path)
+    elif path.lower().endswith(".csv"):
+        df = pd.read_csv(path, dtype=str, encoding="utf-8")
+    else:
+        df = pd.read_excel(path, dtype=str)
+    return df.fillna("")
@@ -0,0 +1,75 @@
+"""
+Benchmark del tiempo de arranque en frío: scripts numerados contra pedidos.py.
+
+Cada caso se ejecuta en un proceso nuevo (como desde la consola) y se toma la mediana de
+--repeticiones corridas. Compara la ayuda de cada script con la de pedidos.py, que importa
+el script del subcomando recién cuando se usa (ninguno de los dos importa pandas ni
+mysql.connector para la ayuda). Mide también las verificaciones --dry-run sobre una
+campaña sintética (conversión, unificación y carga de pedidos, sin MySQL).
+
+Uso: python benchmarks/bench_arranque.py --repeticiones 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generar_campania import generate_campaign
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMPANIA = "C1025"
+
+
+def cold_start(args: List[str], repetitions: int) -> float:
+    """Mediana del tiempo de `python args...` en un proceso nuevo."""
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        assert result.returncode == 0, f"{' '.join(args)} terminó con error:\n{result.stderr}"
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--lideres", type=int, default=10)
+    parser.add_argument("--clientes", type=int, default=200)
+    args = parser.parse_args()
+    n = args.repeticiones
+
+    print("Ayuda (--help):")
+    for name, script in (("convert", "1_xls_xlsx.py"), ("unify", "2_unificar_excels.py"),
+                         ("load-clients", "3_subir_clientes.py"), ("load-orders", "4_subir_pedidos.py")):
+        before = cold_start([script, "--help"], n)
+        after = cold_start(["pedidos.py", name, "--help"], n)
+        print(f"   {script:<22} {before:6.2f} s   pedidos.py {name:<13} {after:6.2f} s")
+    general = cold_start(["pedidos.py", "--help"], n)
+    print(f"   {'pedidos.py --help':<22} {general:6.2f} s   (lista de subcomandos, sin importar ningún script)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, CAMPANIA)
+        generate_campaign(folder, args.lideres, args.clientes, extension=".xls")
+        subprocess.run([sys.executable, "pedidos.py", "unify", folder, "--formats", "parquet", "--no-metrics"],
+                       cwd=ROOT, capture_output=True, check=True)
+        unified = f"{folder}_Unificado.xlsx"
+
+        print(f"\nVerificación sin MySQL (--dry-run), {args.lideres} líderes de {args.clientes} clientes:")
+        for label, command in (
+            ("convert", ["pedidos.py", "convert", folder, "--dry-run", "--no-metrics"]),
+            ("unify (con caché)", ["pedidos.py", "unify", folder, "--dry-run", "--no-metrics"]),
+            ("unify (sin caché)", ["pedidos.py", "unify", folder, "--dry-run", "--no-cache", "--no-metrics"]),
+            ("load-orders", ["pedidos.py", "load-orders", unified, "--dry-run", "--no-metrics"]),
+        ):
+            print(f"   {label:<22} {cold_start(command, n):6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
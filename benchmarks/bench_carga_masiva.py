@@ -0,0 +1,126 @@
+"""
+Benchmark de los motores de carga de 3_subir_clientes y 4_subir_pedidos.
+
+Compara executemany (INSERT multi-fila por lotes) contra infile (LOAD DATA LOCAL INFILE a
+una tabla de staging + INSERT ... SELECT ... ON DUPLICATE KEY UPDATE) y prepared (INSERT
+multi-fila preparado en el servidor) a 100k y 1M filas.
+Necesita un MySQL/MariaDB local con local_infile=ON: LOAD DATA no se puede emular sobre
+el sustituto SQLite. Usa una base propia (por defecto bench_pedidos) que se vacía en cada corrida.
+
+Uso: python benchmarks/bench_carga_masiva.py --user root --filas 100000 1000000
+"""
+import os
+import sys
+import time
+import random
+import getpass
+import argparse
+import importlib
+
+import mysql.connector
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+from carga_masiva import ENGINES
+from conexion_mysql import BatchRetrier
+
+CAMPANIA = "C0125"
+
+
+def build_clientes(n_rows: int) -> pd.DataFrame:
+    # Nro de 6 dígitos como en la tabla (VARCHAR(6)); alcanza hasta 1M de clientes
+    return pd.DataFrame({
+        "Nro": [f"{i:06d}" for i in range(n_rows)],
+        "Cliente": [f"CLIENTE {i}\tÑANDÚ" if i % 97 == 0 else f"CLIENTE {i}" for i in range(n_rows)],
+        "Lider": [str(500100 + i % 40) for i in range(n_rows)],
+    })
+
+
+def build_pedidos(n_rows: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        pvp = round(rng.uniform(0, 250000), 2)
+        rows.append((CAMPANIA, f"{i:06d}", rng.randint(0, 40), rng.randint(0, 3) if i % 7 else None,
+                     pvp, round(pvp * 0.7, 2) if i % 11 else None))
+    return rows
+
+
+def reset_tables(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS clientes")
+    cursor.execute("DROP TABLE IF EXISTS pedidos")
+    cursor.execute(subir_clientes.SQL_CREATE_CLIENTES)
+    cursor.execute(subir_pedidos.SQL_CREATE_PEDIDOS)
+    conn.commit()
+    cursor.close()
+
+
+def checksum(conn) -> tuple:
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), SUM(Unidades), SUM(COALESCE(Faltantes, 0)), SUM(PVP), SUM(Costo_Rev) FROM pedidos")
+    pedidos = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*), SUM(CHAR_LENGTH(Cliente)) FROM clientes")
+    clientes = cursor.fetchone()
+    cursor.close()
+    return pedidos + clientes
+
+
+def run(conn, engine: str, df_clientes: pd.DataFrame, pedidos: list, chunk_size: int) -> tuple:
+    reset_tables(conn)
+    cursor = conn.cursor()
+
+    start = time.perf_counter()
+    retrier = BatchRetrier(conn)
+    subir_clientes.upload_clientes(cursor, df_clientes, engine=engine, retrier=retrier)
+    retrier.commit()
+    clientes_s = time.perf_counter() - start
+
+    # Primera carga (todo nuevo) y recarga (todo actualizado): los dos caminos del upsert
+    stats = subir_pedidos.upload_pedidos(conn, cursor, pedidos, CAMPANIA, chunk_size, engine=engine, verbose=False)
+    updated = [(c, n, u + 1, f, p, r) for c, n, u, f, p, r in pedidos]
+    stats_update = subir_pedidos.upload_pedidos(conn, cursor, updated, CAMPANIA, chunk_size, engine=engine, verbose=False)
+    cursor.close()
+
+    n = len(pedidos)
+    print(f"   {engine:<12} clientes {clientes_s:7.2f} s ({n / clientes_s:>8.0f}/s)  "
+          f"pedidos nuevos {stats['segundos']:7.2f} s ({n / stats['segundos']:>8.0f}/s)  "
+          f"actualizados {stats_update['segundos']:7.2f} s ({n / stats_update['segundos']:>8.0f}/s)")
+    return checksum(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=os.environ.get("MYSQL_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MYSQL_PORT", 3306)))
+    parser.add_argument("--user", default=os.environ.get("MYSQL_USER", "root"))
+    parser.add_argument("--database", default="bench_pedidos")
+    parser.add_argument("--filas", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Filas por lote (por defecto todo en un lote, como 4_subir_pedidos sin --chunk-size).")
+    args = parser.parse_args()
+
+    password = os.environ.get("MYSQL_PWD") or getpass.getpass(f"Contraseña MySQL para {args.user}: ")
+    server = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=password)
+    server.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {args.database}")
+    server.close()
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=password,
+                                   database=args.database, allow_local_infile=True)
+
+    for n_rows in args.filas:
+        print(f"\nFilas: {n_rows}")
+        df_clientes = build_clientes(n_rows)
+        pedidos = build_pedidos(n_rows)
+        checksums = {engine: run(conn, engine, df_clientes, pedidos, args.chunk_size or n_rows)
+                     for engine in ENGINES}
+        same = len(set(checksums.values())) == 1
+        print(f"   Mismo contenido final en las tablas: {'sí' if same else 'NO'}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
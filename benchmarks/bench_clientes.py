@@ -0,0 +1,88 @@
+"""
+Benchmark de la carga de clientes (3_subir_clientes.upload_clientes).
+
+Compara la lógica anterior (un SELECT por fila + un INSERT por cliente nuevo) contra
+la carga masiva (un SELECT de todos los Nro + executemany por lotes), sobre un
+sustituto SQLite con latencia de red simulada por viaje al servidor.
+
+Uso: python benchmarks/bench_clientes.py --clientes 50000 --latencia-ms 0.2
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+subir_clientes = importlib.import_module("3_subir_clientes")
+from sqlite_mysql import SQLiteStandIn, create_clientes_table
+
+
+def upload_clientes_per_row(cursor, df_out):
+    """Réplica de la lógica anterior: un SELECT por fila y un INSERT por cliente nuevo."""
+    insertados = saltados = 0
+    for _, row in df_out.iterrows():
+        nro = str(row["Nro"]).strip()
+        if not nro.isdigit() or len(nro) < 4:
+            continue
+        cursor.execute("SELECT Nro FROM clientes WHERE Nro = %s", (nro,))
+        if cursor.fetchone():
+            saltados += 1
+            continue
+        cursor.execute("INSERT INTO clientes (Nro, Cliente, Lider) VALUES (%s, %s, %s)",
+                       (nro, str(row["Cliente"]).strip(), str(row["Lider"]).strip() or None))
+        insertados += 1
+    return insertados, saltados
+
+
+def build_frame(n_clients: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Nro": [str(100000 + i) for i in range(n_clients)],
+        "Cliente": [f"CLIENTE {i}" for i in range(n_clients)],
+        "Lider": [str(500100 + i % 40) for i in range(n_clients)],
+    })
+
+
+def run(label, upload, df, preexisting, latency_ms):
+    conn = SQLiteStandIn(latency_ms=latency_ms)
+    create_clientes_table(conn)
+    # La mitad de los clientes ya existe en la base
+    conn.raw.executemany("INSERT INTO clientes (Nro, Cliente, Lider) VALUES (?, ?, ?)",
+                         df.iloc[:preexisting].itertuples(index=False))
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    insertados, saltados = upload(cursor, df)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<28} {elapsed:8.3f} s  {conn.round_trips:>8} viajes  "
+          f"insertados={insertados} saltados={saltados}")
+    conn.close()
+    return insertados, saltados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=50000)
+    parser.add_argument("--latencia-ms", type=float, default=0.2,
+                        help="Latencia simulada por viaje al servidor (0 = SQLite puro).")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    df = build_frame(args.clientes)
+    preexisting = args.clientes // 2
+    print(f"Clientes: {args.clientes} ({preexisting} preexistentes), latencia {args.latencia_ms} ms/viaje")
+
+    expected = run("por fila (anterior)", upload_clientes_per_row, df, preexisting, args.latencia_ms)
+    for chunk in args.chunks:
+        result = run(f"masivo chunk={chunk}",
+                     lambda cur, d: subir_clientes.upload_clientes(cur, d, chunk),
+                     df, preexisting, args.latencia_ms)
+        assert result == expected, f"Conteos distintos: {result} != {expected}"
+
+
+if __name__ == "__main__":
+    main()
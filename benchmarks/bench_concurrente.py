@@ -0,0 +1,170 @@
+"""
+Benchmark de la carga concurrente de clientes y pedidos (carga_concurrente.py).
+
+Compara la carga secuencial (load_clientes y después load_pedidos en una conexión)
+contra load_concurrent con 1, 2, 4 y 8 conexiones, sobre el sustituto SQLite con una
+base en archivo compartida por las conexiones y latencia simulada por viaje al servidor
+(la latencia de las distintas conexiones se superpone como con un servidor real; la
+escritura en SQLite en sí queda serializada).
+
+Verifica que las tablas queden iguales en todos los casos y que ningún lote de pedidos
+de un cliente nuevo empiece antes de que se confirmen todos los lotes de clientes.
+
+Uso: python benchmarks/bench_concurrente.py --clientes 20000 --nuevos 0.3 --latencia-ms 30
+"""
+import io
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import importlib
+import threading
+import contextlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import carga_concurrente
+from generar_campania import format_money
+from sqlite_mysql import RoundTripCursor, SQLiteStandIn, create_clientes_table, create_pedidos_table
+
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+CAMPANIA = "C1025"
+
+
+class EventLog:
+    """Momento en que empieza cada executemany y en que se confirma cada lote de clientes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client_commits = []
+        self.pedido_starts = []  # (momento, Nro del lote)
+
+
+class LoggingCursor(RoundTripCursor):
+    def executemany(self, sql, seq_params):
+        rows = list(seq_params)
+        self._conn.table = "clientes" if "INTO clientes" in sql else "pedidos"
+        if self._conn.table == "pedidos":
+            with self._conn.log.lock:
+                self._conn.log.pedido_starts.append((time.perf_counter(), {row[1] for row in rows}))
+        super().executemany(sql, rows)
+
+
+class FileConnection(SQLiteStandIn):
+    """Conexión a la base SQLite en archivo (una por lote, como las del pool)."""
+
+    def __init__(self, path: str, latency_ms: float, log: EventLog):
+        super().__init__(":memory:", latency_ms)
+        self.raw.close()
+        self.raw = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.log = log
+        self.table = None
+
+    def cursor(self):
+        return LoggingCursor(self)
+
+    def commit(self):
+        super().commit()
+        if self.table == "clientes":
+            with self.log.lock:
+                self.log.client_commits.append(time.perf_counter())
+
+
+class Pool:
+    def __init__(self, path: str, latency_ms: float):
+        self.path, self.latency_ms, self.log = path, latency_ms, EventLog()
+
+    def get_connection(self):
+        return FileConnection(self.path, self.latency_ms, self.log)
+
+
+def build_frame(n_clients: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Nro": [str(100000 + i) for i in range(n_clients)],
+        "Cliente": [f"CLIENTE {i}" for i in range(n_clients)],
+        "Lider": [str(500100 + i % 40) for i in range(n_clients)],
+        "U. Ped": [str(1 + i % 9) for i in range(n_clients)],
+        "Falt.": ["" if i % 5 else "1" for i in range(n_clients)],
+        "P.V.P.": [format_money(1000 + i % 700) for i in range(n_clients)],
+        "Costo Rev.": [format_money(500 + i % 300) for i in range(n_clients)],
+    })
+
+
+def new_database(path: str, df: pd.DataFrame, existing: int) -> None:
+    """Base con los primeros `existing` clientes ya cargados."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = SQLiteStandIn(path)
+    create_clientes_table(conn)
+    create_pedidos_table(conn)
+    conn.raw.executemany("INSERT INTO clientes (Nro, Cliente, Lider) VALUES (?, ?, ?)",
+                         df[["Nro", "Cliente", "Lider"]].iloc[:existing].itertuples(index=False))
+    conn.commit()
+    conn.close()
+
+
+def table_contents(path: str):
+    conn = sqlite3.connect(path)
+    clientes = conn.execute("SELECT Nro, Cliente, Lider FROM clientes ORDER BY Nro").fetchall()
+    pedidos = conn.execute("SELECT Campaña, Nro, Unidades, Faltantes, PVP, Costo_Rev "
+                           "FROM pedidos ORDER BY Nro").fetchall()
+    conn.close()
+    return clientes, pedidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=20000)
+    parser.add_argument("--nuevos", type=float, default=0.3, help="Fracción de clientes que no están en la base.")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--latencia-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    df = build_frame(args.clientes)
+    existing = int(args.clientes * (1 - args.nuevos))
+    print(f"Clientes: {args.clientes} ({args.clientes - existing} nuevos), lotes de {args.chunk_size}, "
+          f"latencia {args.latencia_ms} ms/viaje")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pedidos.sqlite")
+
+        new_database(path, df, existing)
+        pool = Pool(path, args.latencia_ms)
+        conn = pool.get_connection()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            subir_clientes.load_clientes(conn, df, args.chunk_size)
+            subir_pedidos.load_pedidos(conn, df, CAMPANIA, args.chunk_size, commit_every=1)
+        sequential = time.perf_counter() - start
+        conn.close()
+        expected = table_contents(path)
+        print(f"   {'secuencial':<16} {sequential:8.2f} s")
+
+        nuevos = set(df["Nro"].iloc[existing:])
+        for workers in (1, 2, 4, 8):
+            new_database(path, df, existing)
+            pool = Pool(path, args.latencia_ms)
+            start = time.perf_counter()
+            stats = carga_concurrente.load_concurrent(pool, df, CAMPANIA, workers, chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - start
+            assert not stats["errores"], stats["errores"]
+            assert table_contents(path) == expected, "La carga concurrente no dejó las mismas tablas"
+
+            last_client_commit = max(pool.log.client_commits, default=0)
+            early = sum(1 for moment, nros in pool.log.pedido_starts
+                        if moment < last_client_commit and nros & nuevos)
+            assert early == 0, f"{early} lotes de pedidos de clientes nuevos empezaron antes de confirmar los clientes"
+            print(f"   {f'concurrente x{workers}':<16} {elapsed:8.2f} s  ({sequential / elapsed:4.1f}x)  "
+                  f"{stats['lotes']} lotes, máximo en vuelo {stats['max_en_vuelo']}")
+        print("   Mismas tablas en todos los casos y pedidos de clientes nuevos después de sus clientes ✅")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de la etapa de clientes repetidos (deduplicar.py) sobre un unificado de 1M filas.
+
+Arma un DataFrame unificado con una fracción de Nro repetidos (en otro líder o en el mismo,
+algunos con otro nombre o líder) y mide dedupe_clientes con las políticas 'ultimo' y 'sumar'
+contra un bucle con un dict por fila. Mide también cuántas filas y cuánto tiempo se ahorran
+en la preparación de clientes y pedidos, y verifica que:
+  - 'ultimo' deje los mismos pedidos que la carga sin deduplicar (el upsert de MySQL se queda
+    con la última fila de cada clave) y el mismo resultado que el bucle;
+  - 'sumar' conserve el total de unidades y de montos.
+
+Uso: python benchmarks/bench_dedup.py --filas 1000000 --repetidos 0.1
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import importlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from deduplicar import dedupe_clientes
+from directorio_clientes import ClientDirectory
+from generar_campania import NOMBRES, format_money
+
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+CAMPANIA = "C1025"
+
+
+def build_frame(n_rows: int, share: float, seed: int = 0) -> pd.DataFrame:
+    """Unificado con n_rows filas; `share` de ellas repiten un Nro anterior."""
+    rng = random.Random(seed)
+    n_unique = int(n_rows * (1 - share))
+    nros = [str(100000 + i) for i in range(n_unique)]
+    names = [f"{NOMBRES[i % len(NOMBRES)]} {i}" for i in range(n_unique)]
+    leaders = [str(500100 + i // 250) for i in range(n_unique)]
+    for _ in range(n_rows - n_unique):
+        i = rng.randrange(n_unique)
+        conflict = rng.random() < 0.2
+        nros.append(nros[i])
+        names.append(names[i] + (" B" if conflict and rng.random() < 0.5 else ""))
+        leaders.append(str(500100 + rng.randrange(n_unique // 250 + 1)) if conflict else leaders[i])
+    order = list(range(n_rows))
+    rng.shuffle(order)
+    pvp = [rng.uniform(1000, 250000) for _ in range(n_rows)]
+    return pd.DataFrame({
+        "Nro": [nros[i] for i in order],
+        "Cliente": [names[i] for i in order],
+        "U. Ent.": [str(rng.randint(0, 40)) for _ in range(n_rows)],
+        "Falt.": [str(rng.randint(0, 3)) if i % 7 else "" for i in range(n_rows)],
+        "U. Ped": [str(rng.randint(1, 40)) for _ in range(n_rows)],
+        "P.V.P.": [format_money(v) for v in pvp],
+        "Ofertas": [""] * n_rows,
+        "Extras": [""] * n_rows,
+        "Costo Rev.": [format_money(v * 0.7) if i % 11 else "" for i, v in enumerate(pvp)],
+        "Bonif.": [""] * n_rows,
+        "Lider": [leaders[i] for i in order],
+    })
+
+
+def dedupe_per_row(df: pd.DataFrame) -> dict:
+    """Referencia: un dict Nro → última fila, recorriendo fila por fila."""
+    last = {}
+    for row in df.itertuples(index=False):
+        last[str(row.Nro).strip()] = row
+    return last
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def totals(pedidos) -> tuple:
+    return (sum(row[2] or 0 for row in pedidos), sum(row[3] or 0 for row in pedidos),
+            round(sum(row[4] or 0 for row in pedidos), 2), round(sum(row[5] or 0 for row in pedidos), 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=1000000)
+    parser.add_argument("--repetidos", type=float, default=0.1, help="Fracción de filas con un Nro repetido.")
+    args = parser.parse_args()
+
+    df = build_frame(args.filas, args.repetidos)
+    print(f"Unificado: {len(df)} filas, {df['Nro'].nunique()} Nro distintos")
+
+    reference, t_loop = timed(dedupe_per_row, df)
+    (ultimo, conflicts, stats), t_ultimo = timed(dedupe_clientes, df, "ultimo")
+    (sumar, _, _), t_sumar = timed(dedupe_clientes, df, "sumar")
+    print(f"   {'dict fila por fila':<24} {t_loop:7.2f} s")
+    print(f"   {'dedupe ultimo':<24} {t_ultimo:7.2f} s  ({t_loop / t_ultimo:5.1f}x)  "
+          f"{stats['filas_juntadas']} filas juntadas, {stats['conflictos']} conflictos")
+    print(f"   {'dedupe sumar':<24} {t_sumar:7.2f} s  ({t_loop / t_sumar:5.1f}x)")
+    assert {str(row.Nro).strip(): row for row in ultimo.itertuples(index=False)} == reference, \
+        "'ultimo' no coincide con el dict fila por fila"
+
+    # --- Lo que ahorran las cargas ---
+    (pedidos_all, _), t_prep_all = timed(subir_pedidos.prepare_pedidos, df, CAMPANIA)
+    (pedidos_ultimo, _), t_prep_ultimo = timed(subir_pedidos.prepare_pedidos, ultimo, CAMPANIA)
+    (pedidos_sumar, _), _ = timed(subir_pedidos.prepare_pedidos, sumar, CAMPANIA)
+    (clientes_all, _), t_cli_all = timed(subir_clientes.select_new_clientes, df, ClientDirectory())
+    (clientes_ultimo, _), t_cli_ultimo = timed(subir_clientes.select_new_clientes, ultimo, ClientDirectory())
+    print(f"   pedidos a enviar: {len(pedidos_all)} → {len(pedidos_ultimo)} "
+          f"(preparación {t_prep_all:.2f} s → {t_prep_ultimo:.2f} s)")
+    print(f"   clientes revisados: {len(df)} → {len(ultimo)} "
+          f"(selección {t_cli_all:.2f} s → {t_cli_ultimo:.2f} s), nuevos {len(clientes_all)} y {len(clientes_ultimo)}")
+
+    # Sin deduplicar, MySQL se queda con la última fila de cada (Campaña, Nro)
+    assert {row[1]: row for row in pedidos_all} == {row[1]: row for row in pedidos_ultimo}, \
+        "'ultimo' no deja los mismos pedidos que el upsert"
+    assert totals(pedidos_sumar) == totals(pedidos_all), "'sumar' no conserva los totales"
+    print("   'ultimo' deja los mismos pedidos que el upsert y 'sumar' conserva los totales ✅")
+
+
+if __name__ == "__main__":
+    main()
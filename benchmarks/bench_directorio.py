@@ -0,0 +1,72 @@
+"""
+Benchmark del directorio de clientes (directorio_clientes.py).
+
+Compara la verificación de clientes de los pedidos con un SELECT por Nro contra el
+directorio cargado con un solo SELECT, y la lectura de la tabla completa contra el
+snapshot local vigente (COUNT/MAX + lectura del JSON), sobre el sustituto SQLite con
+latencia de red simulada por viaje al servidor.
+
+Uso: python benchmarks/bench_directorio.py --clientes 200000 --pedidos 20000 --latencia-ms 0.2
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from directorio_clientes import ClientDirectory, get_client_directory
+from sqlite_mysql import SQLiteStandIn, create_clientes_table
+
+
+def orphans_per_row(cursor, nros):
+    """Verificación sin directorio: un SELECT por Nro de pedido."""
+    huerfanos = set()
+    for nro in nros:
+        cursor.execute("SELECT 1 FROM clientes WHERE Nro = %s", (nro,))
+        if cursor.fetchone() is None:
+            huerfanos.add(nro)
+    return huerfanos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=200000)
+    parser.add_argument("--pedidos", type=int, default=20000)
+    parser.add_argument("--latencia-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    conn = SQLiteStandIn(latency_ms=args.latencia_ms)
+    create_clientes_table(conn)
+    conn.raw.executemany("INSERT INTO clientes (Nro, Cliente, Lider) VALUES (?, ?, ?)",
+                         ((str(100000 + i), f"CLIENTE {i}", str(500100 + i % 40)) for i in range(args.clientes)))
+    cursor = conn.cursor()
+    # Un 1% de los pedidos son de clientes que no están en la tabla
+    nros = [str(100000 + (i * 7919) % args.clientes) if i % 100 else str(900000 + i) for i in range(args.pedidos)]
+    print(f"Clientes: {args.clientes}, pedidos: {args.pedidos}, latencia {args.latencia_ms} ms/viaje")
+
+    def measure(label, func):
+        conn.round_trips = 0
+        start = time.perf_counter()
+        result = func()
+        print(f"   {label:<32} {time.perf_counter() - start:8.3f} s  {conn.round_trips:>7} viajes")
+        return result
+
+    per_row = measure("SELECT por pedido", lambda: orphans_per_row(cursor, nros))
+    directory = measure("directorio (1 SELECT)", lambda: ClientDirectory.load(cursor))
+    by_directory = measure("   + huérfanos en memoria", lambda: directory.missing(nros))
+    assert per_row == by_directory, "El directorio no encuentra los mismos huérfanos"
+    print(f"   Mismos huérfanos ({len(by_directory)}) ✅")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "clientes.json")
+        measure("snapshot: lectura + guardado", lambda: get_client_directory(cursor, snapshot))
+        cached = measure("snapshot vigente", lambda: get_client_directory(cursor, snapshot))
+        assert cached.source == "snapshot" and cached.entries == directory.entries
+        print(f"   Snapshot: {os.path.getsize(snapshot) / 2**20:.1f} MB, mismo contenido que la tabla ✅")
+
+
+if __name__ == "__main__":
+    main()
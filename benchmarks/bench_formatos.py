@@ -0,0 +1,56 @@
+"""
+Costo del traspaso 2 → 3 → 4 según el formato del archivo unificado.
+
+Escribe un DataFrame unificado sintético en .xlsx, .parquet y .csv con
+archivo_unificado.write_unified, lo vuelve a leer con read_unified (como hacen los
+scripts de carga) y verifica que los tres formatos devuelvan el mismo DataFrame.
+
+Uso: python benchmarks/bench_formatos.py --filas 50000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from archivo_unificado import COLUMNS_ORDER, OUTPUT_FORMATS, read_unified, unified_path, write_unified
+from bench_pedidos_prep import build_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=50000)
+    args = parser.parse_args()
+
+    df = build_frame(args.filas)
+    for col in COLUMNS_ORDER:
+        if col not in df.columns:
+            df[col] = [f"{col} {i}" for i in range(args.filas)]
+    df = df[COLUMNS_ORDER]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = os.path.join(tmp, "C1025_Unificado.xlsx")
+        reference = None
+        print(f"Filas: {args.filas}")
+        for fmt in OUTPUT_FORMATS:
+            start = time.perf_counter()
+            write_unified(df, xlsx_path, [fmt])
+            t_write = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = read_unified(unified_path(xlsx_path, fmt))
+            t_read = time.perf_counter() - start
+
+            if reference is None:
+                reference = result
+            pd.testing.assert_frame_equal(reference, result)
+            print(f"   {fmt:<8} escribir {t_write:7.3f} s | leer {t_read:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Micro-benchmark de la detección del formato de hoja de 2_unificar_excels.
+
+Compara la búsqueda anterior (columna A completa con astype(str).str.upper() + apply, y
+normalize_string celda por celda en las 20 primeras filas) contra LayoutDetector, con y
+sin plantillas ya vistas, sobre hojas sintéticas con encabezados 'N° Cli.' y 'Nº Cli.'.
+Verifica que ambos encuentren la misma fila de encabezado y el mismo líder cuando la
+búsqueda anterior reconoce el encabezado, y cuenta las hojas que sólo reconoce la nueva.
+
+Uso: python benchmarks/bench_layout.py --hojas 200 --clientes 500
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import importlib
+from typing import Optional, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+unificar = importlib.import_module("2_unificar_excels")
+from generar_campania import leader_rows
+
+
+def normalize_string(text: str) -> str:
+    """Normalización anterior del encabezado (2_unificar_excels usa normalize_label)."""
+    if not isinstance(text, str):
+        return ""
+    text = str(text).lower().strip()
+    text = text.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
+    text = re.sub(r'[.,°\#\/\-\s]', '', text)
+    return text
+
+
+def detect_legacy(df_raw: pd.DataFrame) -> Tuple[Optional[int], Optional[str]]:
+    """Réplica de la detección anterior: (fila de encabezado, número de líder)."""
+    col_a = df_raw.iloc[:, 0].astype(str).str.upper()
+    rows = col_a[col_a.apply(lambda x: 'LÍDER' in x)].index.tolist()
+    lider = None
+    if rows and df_raw.shape[1] > 1:
+        lider = str(df_raw.iloc[rows[0], 1]).strip() or None
+
+    for i in range(min(20, len(df_raw))):
+        row = df_raw.iloc[i].astype(str).str.strip().tolist()
+        if any(normalize_string(c) in ['ncli', 'ncli'] for c in row):
+            return i, lider
+    return None, lider
+
+
+def detect_new(detector, df_raw: pd.DataFrame) -> Tuple[Optional[int], Optional[str]]:
+    layout = detector.detect(df_raw)
+    if layout is None:
+        return None, None
+    lider = unificar._leader_value(df_raw, layout.leader_row) if layout.leader_row is not None else None
+    return layout.header_row, lider
+
+
+def build_sheets(n_sheets: int, n_clients: int):
+    """Hojas como las deja read_excel(header=None, dtype=str).fillna('')."""
+    sheets = []
+    for i in range(n_sheets):
+        rows = leader_rows(str(500100 + i), n_clients, seed=i, header_variants=True)
+        width = max(len(r) for r in rows)
+        df = pd.DataFrame([[("" if v is None else str(v)) for v in r] + [""] * (width - len(r)) for r in rows])
+        sheets.append(df)
+    return sheets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hojas", type=int, default=200)
+    parser.add_argument("--clientes", type=int, default=500)
+    args = parser.parse_args()
+
+    sheets = build_sheets(args.hojas, args.clientes)
+    print(f"Hojas: {args.hojas} de {args.clientes} clientes ('N° Cli.' y 'Nº Cli.' mezclados)")
+
+    start = time.perf_counter()
+    legacy = [detect_legacy(df) for df in sheets]
+    legacy_s = time.perf_counter() - start
+
+    cold = unificar.LayoutDetector()
+    start = time.perf_counter()
+    new = []
+    for df in sheets:
+        cold.templates.clear()  # Sin plantillas: cada hoja se recorre
+        new.append(detect_new(cold, df))
+    cold_s = time.perf_counter() - start
+
+    warm = unificar.LayoutDetector()
+    start = time.perf_counter()
+    new_warm = [detect_new(warm, df) for df in sheets]
+    warm_s = time.perf_counter() - start
+
+    print(f"   anterior                : {legacy_s:8.3f} s")
+    print(f"   detector sin plantillas : {cold_s:8.3f} s  ({legacy_s / cold_s:6.1f}x)")
+    print(f"   detector con plantillas : {warm_s:8.3f} s  ({legacy_s / warm_s:6.1f}x, "
+          f"{warm.hits} aciertos / {warm.misses} detecciones)")
+
+    assert new == new_warm, "El resultado con plantillas difiere del de la detección completa"
+    recognized = [(a, b) for a, b in zip(legacy, new) if a[0] is not None]
+    assert all(a == b for a, b in recognized), "La detección nueva difiere de la anterior"
+    only_new = sum(1 for a, b in zip(legacy, new) if a[0] is None and b[0] is not None)
+    print(f"   Mismo resultado en las {len(recognized)} hojas que reconoce la búsqueda anterior ✅")
+    print(f"   Hojas con 'Nº Cli.' que sólo reconoce el detector: {only_new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark de la preparación de filas de 4_subir_pedidos.
+
+Compara el bucle anterior (iterrows + clean_monetary_value por celda) contra
+prepare_pedidos (operaciones por columna) a 10k, 100k y 1M filas y verifica que
+ambos produzcan las mismas tuplas.
+
+Uso: python benchmarks/bench_pedidos_prep.py --filas 10000 100000 1000000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import importlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+from generar_campania import format_money
+
+
+def prepare_pedidos_iterrows(df_out, campania):
+    """Réplica del bucle anterior de main()."""
+    pedidos = []
+    for _, row in df_out.iterrows():
+        nro = str(row["Nro"]).strip()
+        if not nro.isdigit() or len(nro) < 4:
+            continue
+        unidades = int(str(row["U. Ped"]).strip() or 0)
+        faltantes = int(str(row["Falt."]).strip() or 0)
+        pvp = subir_pedidos.clean_monetary_value(row["P.V.P."])
+        costo_rev = subir_pedidos.clean_monetary_value(row["Costo Rev."])
+        pedidos.append((campania, nro, unidades, faltantes, pvp, costo_rev))
+    return pedidos
+
+
+def build_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    pvp = [rng.uniform(0, 250000) for _ in range(n_rows)]
+    return pd.DataFrame({
+        "Nro": [str(100000 + i) if i % 50 else "Subtotal" for i in range(n_rows)],
+        "U. Ped": [str(rng.randint(0, 40)) for _ in range(n_rows)],
+        "Falt.": [str(rng.randint(0, 3)) if i % 7 else "" for i in range(n_rows)],
+        "P.V.P.": [format_money(v) for v in pvp],
+        "Costo Rev.": [format_money(v * 0.7) if i % 11 else "" for i, v in enumerate(pvp)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    for n_rows in args.filas:
+        df = build_frame(n_rows)
+
+        start = time.perf_counter()
+        expected = prepare_pedidos_iterrows(df, "C1025")
+        t_old = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result, bad = subir_pedidos.prepare_pedidos(df, "C1025")
+        t_new = time.perf_counter() - start
+
+        assert result == expected, "Las tuplas vectorizadas no coinciden con el bucle anterior"
+        assert not any(bad.values())
+        print(f"   {n_rows:>9} filas: iterrows {t_old:8.3f} s | vectorizado {t_new:7.3f} s "
+              f"| {t_old / t_new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
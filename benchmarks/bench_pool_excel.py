@@ -0,0 +1,83 @@
+"""
+Benchmark del pool de instancias de Excel de 1_xls_xlsx (motor COM).
+
+Excel no está disponible fuera de Windows, así que cada proceso del pool simula una
+instancia: convierte con el motor Python y espera --demora segundos por archivo (el
+tiempo que Excel trabaja en su propio proceso). Entre los archivos hay uno que cuelga
+la instancia y otro que la hace terminar, para verificar el tiempo máximo por archivo
+y el reinicio de los procesos.
+
+Uso: python benchmarks/bench_pool_excel.py --archivos 24 --demora 0.5 --timeout 3
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+import functools
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+conversor = importlib.import_module("1_xls_xlsx")
+from generar_campania import generate_campaign
+
+
+def _simulated_worker_main(delay: float, worker_id: str, tasks, results) -> None:
+    """Proceso del pool con una "instancia de Excel" simulada."""
+    def convert(xls_path: str, xlsx_path: str) -> None:
+        name = os.path.basename(xls_path)
+        if "colgado" in name:
+            time.sleep(3600)  # Excel no responde
+        if "roto" in name:
+            os._exit(1)  # Excel se cierra con el libro abierto
+        time.sleep(delay)
+        conversor.convert_xls_to_xlsx_python(xls_path, xlsx_path)
+
+    conversor._serve_jobs(worker_id, tasks, results, convert, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archivos", type=int, default=24)
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--demora", type=float, default=0.5, help="Segundos de trabajo de Excel por archivo.")
+    parser.add_argument("--timeout", type=float, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "C1025")
+        generate_campaign(folder, args.archivos - 2, args.clientes, extension=".xls")
+        files = sorted(os.path.join(folder, f) for f in os.listdir(folder))
+        for name in ("libro colgado.xls", "libro roto.xls"):
+            os.link(files[0], os.path.join(folder, name))
+        files = sorted(os.path.join(folder, f) for f in os.listdir(folder))
+        print(f"Archivos: {len(files)} (uno cuelga Excel y otro lo cierra), {args.demora} s por archivo, "
+              f"tiempo máximo {args.timeout} s")
+
+        for workers in (1, 2, 4):
+            out = os.path.join(tmp, f"salida_{workers}")
+            os.makedirs(out)
+            jobs = [(path, conversor.xlsx_path_for(path, out)) for path in files]
+            pool = conversor.ExcelWorkerPool(workers, args.timeout,
+                                             functools.partial(_simulated_worker_main, args.demora))
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = pool.convert_many(jobs)
+            elapsed = time.perf_counter() - start
+
+            converted = [r for r in results if r.status == "convertido"]
+            failed = {os.path.basename(r.xls_path) for r in results if r.status == "fallido"}
+            assert len(results) == len(files), "Faltan resultados"
+            assert failed == {"libro colgado.xls", "libro roto.xls"}, f"Fallidos inesperados: {failed}"
+            assert all(os.path.exists(conversor.xlsx_path_for(r.xls_path, out)) for r in converted)
+            print(f"   {workers} instancias: {elapsed:6.2f} s  {len(converted) / elapsed * 60:6.1f} archivos/min  "
+                  f"reiniciadas: {pool.restarts}")
+        print("   Todos los archivos convertidos salvo el colgado y el roto, que se informan como fallidos ✅")
+
+
+if __name__ == "__main__":
+    main()
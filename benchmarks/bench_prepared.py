@@ -0,0 +1,164 @@
+"""
+Benchmark de sentencias preparadas en el servidor (cursor(prepared=True)) contra SQL de texto.
+
+Mide la latencia por sentencia de las consultas que repiten las cargas:
+  - SELECT de un cliente por Nro y upsert de un pedido, fila por fila (texto vs preparada);
+  - lotes de pedidos: executemany de texto (un INSERT multi-fila que el servidor analiza en
+    cada lote) contra el INSERT multi-fila preparado de --engine prepared (ver carga_masiva.py).
+Verifica que la tabla pedidos quede igual con los dos caminos. Necesita un MySQL/MariaDB
+local: el sustituto SQLite no tiene protocolo de sentencias preparadas. Usa una base propia
+(por defecto bench_pedidos) que se vacía en cada corrida.
+
+Uso: python benchmarks/bench_prepared.py --user root --filas 100000 --consultas 5000
+"""
+import os
+import sys
+import time
+import random
+import getpass
+import argparse
+import importlib
+import statistics
+from typing import Callable, List
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+from carga_masiva import PREPARED_ROWS, PreparedInsert
+
+CAMPANIA = "C0125"
+
+SQL_SELECT_CLIENTE = "SELECT Nro, Cliente, Lider FROM clientes WHERE Nro = %s"
+
+
+def build_pedidos(n_rows: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        pvp = round(rng.uniform(0, 250000), 2)
+        rows.append((CAMPANIA, f"{i:06d}", rng.randint(0, 40), rng.randint(0, 3) if i % 7 else None,
+                     pvp, round(pvp * 0.7, 2) if i % 11 else None))
+    return rows
+
+
+def reset_tables(conn, n_clientes: int) -> None:
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS clientes")
+    cursor.execute("DROP TABLE IF EXISTS pedidos")
+    cursor.execute(subir_clientes.SQL_CREATE_CLIENTES)
+    cursor.execute(subir_pedidos.SQL_CREATE_PEDIDOS)
+    clientes = [(f"{i:06d}", f"CLIENTE {i}", str(500100 + i % 40)) for i in range(n_clientes)]
+    for chunk in subir_pedidos.iter_chunks(clientes, 10000):
+        cursor.executemany(subir_clientes.SQL_INSERT_CLIENTE, chunk)
+    conn.commit()
+    cursor.close()
+
+
+def checksum(conn) -> tuple:
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), SUM(Unidades), SUM(COALESCE(Faltantes, 0)), SUM(PVP), SUM(Costo_Rev) FROM pedidos")
+    result = cursor.fetchone()
+    cursor.close()
+    return result
+
+
+def per_statement(func: Callable[[tuple], None], params: List[tuple]) -> List[float]:
+    """Latencia de cada sentencia, en microsegundos."""
+    times = []
+    for param in params:
+        start = time.perf_counter()
+        func(param)
+        times.append((time.perf_counter() - start) * 1e6)
+    return times
+
+
+def report(label: str, text: List[float], prepared: List[float]) -> None:
+    t, p = statistics.median(text), statistics.median(prepared)
+    print(f"   {label:<22} texto {t:8.0f} µs  preparada {p:8.0f} µs  ({t / p:4.2f}x)  "
+          f"p95 {sorted(text)[int(len(text) * 0.95)]:6.0f} / {sorted(prepared)[int(len(prepared) * 0.95)]:6.0f} µs")
+
+
+def run_single(conn, n_queries: int) -> None:
+    """Una fila por sentencia: SELECT de cliente y upsert de pedido."""
+    rng = random.Random(1)
+    nros = [(f"{rng.randrange(n_queries):06d}",) for _ in range(n_queries)]
+    text, prepared = conn.cursor(), conn.cursor(prepared=True)
+
+    def select(cursor):
+        def run(param):
+            cursor.execute(SQL_SELECT_CLIENTE, param)
+            cursor.fetchall()
+        return run
+    report("SELECT por Nro", per_statement(select(text), nros), per_statement(select(prepared), nros))
+
+    # Mitades distintas: los dos caminos insertan pedidos nuevos
+    pedidos = build_pedidos(2 * n_queries, seed=2)
+    text_times = per_statement(lambda row: text.execute(subir_pedidos.SQL_PEDIDOS, row), pedidos[:n_queries])
+    conn.commit()
+    prepared_times = per_statement(lambda row: prepared.execute(subir_pedidos.SQL_PEDIDOS, row),
+                                   pedidos[n_queries:])
+    conn.commit()
+    report("upsert de un pedido", text_times, prepared_times)
+    text.close()
+    prepared.close()
+
+
+def run_chunks(conn, pedidos: list, chunk_size: int, engine: str) -> tuple:
+    """Lotes de pedidos por executemany de texto o por PreparedInsert. Devuelve (segundos, checksum)."""
+    reset_tables(conn, 0)
+    cursor = conn.cursor()
+    loader = PreparedInsert(conn, subir_pedidos.SQL_PEDIDOS) if engine == "prepared" else None
+    start = time.perf_counter()
+    for chunk in subir_pedidos.iter_chunks(pedidos, chunk_size):
+        if loader:
+            loader.send(chunk)
+        else:
+            cursor.executemany(subir_pedidos.SQL_PEDIDOS, chunk)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    if loader:
+        loader.close()
+    cursor.close()
+    return elapsed, checksum(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=os.environ.get("MYSQL_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MYSQL_PORT", 3306)))
+    parser.add_argument("--user", default=os.environ.get("MYSQL_USER", "root"))
+    parser.add_argument("--database", default="bench_pedidos")
+    parser.add_argument("--filas", type=int, default=100000, help="Pedidos enviados en lotes.")
+    parser.add_argument("--consultas", type=int, default=5000, help="Sentencias de una fila por caso.")
+    parser.add_argument("--chunk-size", type=int, default=subir_pedidos.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    password = os.environ.get("MYSQL_PWD") or getpass.getpass(f"Contraseña MySQL para {args.user}: ")
+    server = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=password)
+    server.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {args.database}")
+    server.close()
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=password,
+                                   database=args.database)
+    print(f"Servidor: {conn.get_server_info()}")
+
+    print(f"\nUna fila por sentencia ({args.consultas} sentencias, mediana):")
+    reset_tables(conn, args.consultas)
+    run_single(conn, args.consultas)
+
+    print(f"\nLotes de {args.chunk_size} pedidos ({args.filas} filas; preparada de {PREPARED_ROWS} filas):")
+    pedidos = build_pedidos(args.filas)
+    text_s, text_sum = run_chunks(conn, pedidos, args.chunk_size, "executemany")
+    prepared_s, prepared_sum = run_chunks(conn, pedidos, args.chunk_size, "prepared")
+    print(f"   {'executemany (texto)':<22} {text_s:7.2f} s ({args.filas / text_s:>8.0f}/s)")
+    print(f"   {'INSERT preparado':<22} {prepared_s:7.2f} s ({args.filas / prepared_s:>8.0f}/s)  "
+          f"({text_s / prepared_s:4.2f}x)")
+    print(f"   Mismo contenido final en la tabla: {'sí' if text_sum == prepared_sum else 'NO'}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark de las consultas de informes con y sin los resúmenes de resumenes.py.
+
+Carga varios años de campañas sintéticas (18 campañas por año) y compara, consultando
+pedidos unido a clientes contra las tablas pedidos_lider y pedidos_campania:
+totales por líder de una campaña, totales de cada campaña del historial y evolución
+de un líder en todas las campañas. Mide también lo que cuesta recalcular los
+resúmenes de una campaña en cada carga y verifica que ambos caminos den lo mismo.
+
+Con --mysql usa un MySQL/MariaDB local y repite las consultas sobre pedidos con el
+esquema particionado (4_subir_pedidos.py --particionar).
+
+Uso: python benchmarks/bench_resumenes.py --anios 5 --clientes 10000 --lideres 200
+"""
+import os
+import sys
+import time
+import random
+import getpass
+import argparse
+import importlib
+import statistics
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resumenes
+from conexion_mysql import reset_schema_cache
+from directorio_clientes import SQL_CREATE_CLIENTES
+from sqlite_mysql import SQLiteStandIn, create_clientes_table, create_pedidos_table
+
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+CAMPAIGNS_PER_YEAR = 18
+TABLES = ("pedidos_lider", "pedidos_campania", "pedidos", "clientes")
+
+QUERIES = {
+    "por_lider_campania": (
+        """SELECT COALESCE(c.Lider, ''), COUNT(*), SUM(p.Unidades), SUM(p.Faltantes), SUM(p.PVP), SUM(p.Costo_Rev)
+           FROM pedidos p LEFT JOIN clientes c ON c.Nro = p.Nro
+           WHERE p.Campaña = %s GROUP BY COALESCE(c.Lider, '') ORDER BY 1""",
+        """SELECT Lider, Clientes, Unidades, Faltantes, PVP, Costo_Rev
+           FROM pedidos_lider WHERE Campaña = %s ORDER BY 1""",
+        "campania",
+    ),
+    "historial_campanias": (
+        """SELECT Campaña, COUNT(*), SUM(Unidades), SUM(Faltantes), SUM(PVP), SUM(Costo_Rev)
+           FROM pedidos GROUP BY Campaña ORDER BY 1""",
+        """SELECT Campaña, Clientes, Unidades, Faltantes, PVP, Costo_Rev
+           FROM pedidos_campania ORDER BY 1""",
+        None,
+    ),
+    "evolucion_lider": (
+        """SELECT p.Campaña, COUNT(*), SUM(p.Unidades), SUM(p.Faltantes), SUM(p.PVP), SUM(p.Costo_Rev)
+           FROM pedidos p JOIN clientes c ON c.Nro = p.Nro
+           WHERE c.Lider = %s GROUP BY p.Campaña ORDER BY 1""",
+        """SELECT Campaña, Clientes, Unidades, Faltantes, PVP, Costo_Rev
+           FROM pedidos_lider WHERE Lider = %s ORDER BY 1""",
+        "lider",
+    ),
+}
+
+
+def campaign_names(years: int) -> List[str]:
+    return [f"C{c:02d}{y:02d}" for y in range(26 - years, 26) for c in range(1, CAMPAIGNS_PER_YEAR + 1)]
+
+
+def sqlite_connection():
+    conn = SQLiteStandIn()
+    create_clientes_table(conn)
+    create_pedidos_table(conn)
+    return conn
+
+
+def mysql_connection(args):
+    import mysql.connector
+
+    password = os.environ.get("MYSQL_PWD") or getpass.getpass(f"Contraseña MySQL para {args.user}: ")
+    server = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=password)
+    server.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {args.database}")
+    server.close()
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                   password=password, database=args.database)
+    cursor = conn.cursor()
+    for table in TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    reset_schema_cache()
+    cursor.execute(SQL_CREATE_CLIENTES)
+    cursor.execute(subir_pedidos.SQL_CREATE_PEDIDOS)
+    resumenes.ensure_rollup_tables(cursor)
+    conn.commit()
+    cursor.close()
+    return conn
+
+
+def load_history(conn, campaigns: List[str], n_clients: int, n_leaders: int, seed: int) -> int:
+    """Clientes con su líder y, en cada campaña, pedidos de un 60-90% de ellos."""
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    clientes = [(str(100000 + i), f"CLIENTE {i}", str(500100 + i % n_leaders)) for i in range(n_clients)]
+    cursor.executemany("INSERT INTO clientes (Nro, Cliente, Lider) VALUES (%s, %s, %s)", clientes)
+    rows = 0
+    for campania in campaigns:
+        share = rng.uniform(0.6, 0.9)
+        pedidos = [(campania, nro, rng.randint(1, 40), rng.randint(0, 3),
+                    round(rng.uniform(1000, 250000), 2), round(rng.uniform(500, 120000), 2))
+                   for nro, _, _ in clientes if rng.random() < share]
+        for chunk in subir_pedidos.iter_chunks(pedidos, 10000):
+            cursor.executemany(subir_pedidos.SQL_PEDIDOS, chunk)
+        rows += len(pedidos)
+    conn.commit()
+    cursor.close()
+    return rows
+
+
+def measure(func: Callable, repetitions: int) -> float:
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def normalize(rows) -> list:
+    return [tuple(round(float(v), 2) if isinstance(v, (int, float)) or hasattr(v, "as_tuple") else v
+                  for v in row) for row in rows]
+
+
+def run_queries(conn, params: dict, repetitions: int, label: str) -> None:
+    cursor = conn.cursor()
+
+    def fetch(sql, param):
+        cursor.execute(sql, (params[param],) if param else ())
+        return cursor.fetchall()
+
+    for name, (raw_sql, rollup_sql, param) in QUERIES.items():
+        raw = measure(lambda: fetch(raw_sql, param), repetitions)
+        rollup = measure(lambda: fetch(rollup_sql, param), repetitions)
+        assert normalize(fetch(raw_sql, param)) == normalize(fetch(rollup_sql, param)), f"{name}: resultados distintos"
+        print(f"   {label:<12} {name:<22} pedidos+clientes {raw * 1000:9.1f} ms   "
+              f"resumen {rollup * 1000:7.2f} ms   ({raw / rollup:7.0f}x)")
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--anios", type=int, default=5)
+    parser.add_argument("--clientes", type=int, default=10000)
+    parser.add_argument("--lideres", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--mysql", action="store_true", help="Usa un MySQL/MariaDB local en lugar de SQLite.")
+    parser.add_argument("--host", default=os.environ.get("MYSQL_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MYSQL_PORT", 3306)))
+    parser.add_argument("--user", default=os.environ.get("MYSQL_USER", "root"))
+    parser.add_argument("--database", default="bench_pedidos")
+    args = parser.parse_args()
+
+    campaigns = campaign_names(args.anios)
+    conn = mysql_connection(args) if args.mysql else sqlite_connection()
+    start = time.perf_counter()
+    rows = load_history(conn, campaigns, args.clientes, args.lideres, args.semilla)
+    print(f"Historial: {len(campaigns)} campañas ({args.anios} años), {rows} pedidos, "
+          f"{args.lideres} líderes ({time.perf_counter() - start:.1f} s para cargarlo)")
+
+    cursor = conn.cursor()
+    refresh = []
+    for campania in campaigns:
+        start = time.perf_counter()
+        resumenes.refresh_rollups(cursor, campania)
+        conn.commit()
+        refresh.append(time.perf_counter() - start)
+    cursor.close()
+    print(f"   Recalcular los resúmenes de una campaña: {statistics.median(refresh) * 1000:.1f} ms (mediana)")
+
+    params = {"campania": campaigns[len(campaigns) // 2], "lider": "500117"}
+    run_queries(conn, params, args.repeticiones, "sin particiones" if args.mysql else "sqlite")
+
+    if args.mysql:
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        subir_pedidos.partition_pedidos(cursor)
+        cursor.close()
+        print(f"   Particionado de pedidos: {time.perf_counter() - start:.1f} s")
+        run_queries(conn, params, args.repeticiones, "particionada")
+    conn.close()
+    print("   Mismos resultados con y sin resúmenes ✅")
+
+
+if __name__ == "__main__":
+    main()
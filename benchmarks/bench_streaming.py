@@ -0,0 +1,85 @@
+"""
+Benchmark de la unificación en memoria contra el modo --stream de 2_unificar_excels.
+
+Cada modo corre en su propio proceso para medir su pico de memoria (RSS) por separado.
+Verifica que los archivos unificados de ambos modos tengan el mismo contenido.
+
+Uso: python benchmarks/bench_streaming.py --lideres 40 --clientes 2000 --formats csv parquet
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import importlib
+import subprocess
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generar_campania import generate_campaign
+
+
+def run_mode(mode: str, folder: str, output: str, formats: list) -> None:
+    """Se ejecuta en un proceso aparte e imprime un JSON con el tiempo y el pico de memoria."""
+    import io
+    import contextlib
+    from archivo_unificado import write_unified
+    from instrumentacion import peak_memory_mb
+
+    unificar = importlib.import_module("2_unificar_excels")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "stream":
+            rows, _ = unificar.unify_campaign_streaming(folder, output, formats, use_cache=False)
+        else:
+            df = unificar.unify_campaign(folder, use_cache=False)
+            write_unified(df, output, formats)
+            rows = len(df)
+    print(json.dumps({"filas": rows, "segundos": time.perf_counter() - start, "pico_mb": peak_memory_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lideres", type=int, default=40)
+    parser.add_argument("--clientes", type=int, default=2000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "parquet"])
+    parser.add_argument("--modo", choices=["memoria", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--carpeta", help=argparse.SUPPRESS)
+    parser.add_argument("--salida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        run_mode(args.modo, args.carpeta, args.salida, args.formats)
+        return
+
+    from archivo_unificado import read_unified, unified_path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "C1025")
+        generate_campaign(folder, args.lideres, args.clientes, extension=".xls")
+        print(f"Campaña: {args.lideres} líderes x {args.clientes} clientes, formatos {args.formats}")
+
+        outputs = {}
+        for mode in ("memoria", "stream"):
+            output = os.path.join(tmp, f"{mode}_Unificado.xlsx")
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--modo", mode,
+                                   "--carpeta", folder, "--salida", output, "--formats", *args.formats],
+                                  capture_output=True, text=True, check=True)
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"   {mode:<8} {result['segundos']:7.2f} s   pico RSS {result['pico_mb']:8.1f} MB   "
+                  f"{result['filas']} filas")
+            outputs[mode] = output
+
+        for fmt in args.formats:
+            a = read_unified(unified_path(outputs["memoria"], fmt))
+            b = read_unified(unified_path(outputs["stream"], fmt))
+            pd.testing.assert_frame_equal(a, b)
+        print("   Mismo contenido en ambos modos ✅")
+
+
+if __name__ == "__main__":
+    main()
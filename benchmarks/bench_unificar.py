@@ -0,0 +1,160 @@
+"""
+Benchmark de 2_unificar_excels.process_file.
+
+Compara la lectura en dos pasadas (versión anterior: read_excel para ubicar el
+encabezado + read_excel con skiprows) contra la lectura única actual, sobre una
+carpeta de archivos de líder sintéticos, y verifica que la salida sea idéntica.
+La réplica usa también la búsqueda anterior del líder y del encabezado; las hojas que
+sólo reconoce LayoutDetector (título con 'Líder', 'Lider' sin acento, tabla corrida una
+columna) se verifican aparte como cambios esperados.
+
+Uso: python benchmarks/bench_unificar.py --lideres 20 --clientes 300
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+import contextlib
+from typing import Optional
+
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+unificar = importlib.import_module("2_unificar_excels")
+from generar_campania import generate_campaign, leader_rows
+from bench_layout import normalize_string
+
+
+def extract_lider_number_legacy(df_raw: pd.DataFrame) -> Optional[str]:
+    """Réplica de la búsqueda anterior del líder: primera fila con 'LÍDER' en la columna A."""
+    col_a = df_raw.iloc[:, 0].astype(str).str.upper()
+    rows = col_a[col_a.apply(lambda x: 'LÍDER' in x)].index.tolist()
+    if not rows or df_raw.shape[1] <= 1:
+        return None
+    lider_nro = str(df_raw.iloc[rows[0], 1]).strip()
+    return lider_nro if lider_nro else None
+
+
+def process_file_two_pass(file_path: str) -> Optional[pd.DataFrame]:
+    """Réplica de la versión anterior de process_file (lee el libro dos veces)."""
+    df_raw = pd.read_excel(file_path, header=None, dtype=str).fillna("")
+    lider_nro = extract_lider_number_legacy(df_raw)
+
+    header_row_index = -1
+    for i in range(min(20, len(df_raw))):
+        row = df_raw.iloc[i].astype(str).str.strip().tolist()
+        if any(normalize_string(c) in ['ncli', 'ncli'] for c in row):
+            header_row_index = i
+            break
+    if header_row_index == -1:
+        return None
+
+    data_start_row_index = header_row_index + 2
+    if data_start_row_index >= len(df_raw):
+        return None
+
+    df_data = pd.read_excel(file_path, header=None, skiprows=data_start_row_index, dtype=str).fillna("")
+    renames = {k: v for k, v in unificar.FIXED_COLUMN_NAMES.items() if k < df_data.shape[1]}
+    df_data.rename(columns=renames, inplace=True)
+
+    df_clean = df_data[
+        df_data['Nro'].astype(str).str.strip().str.isdigit() &
+        (df_data['Nro'].astype(str).str.strip().str.len() >= 4)
+    ].copy()
+    if df_clean.empty:
+        return None
+    df_clean['Lider'] = lider_nro
+    return df_clean[[c for c in unificar.COLUMNS_ORDER if c in df_clean.columns]]
+
+
+def write_rows(path: str, rows) -> str:
+    wb = openpyxl.Workbook()
+    for row in rows:
+        wb.active.append(row)
+    wb.save(path)
+    return path
+
+
+def variant_files(folder: str, n_clients: int):
+    """
+    Hojas en las que la versión anterior y la actual difieren a propósito:
+    (nombre, archivo, cambio esperado). 'lider': antes sin líder, ahora con el de la hoja;
+    'filas': antes sin filas, ahora con todos los clientes.
+    """
+    lider = "500900"
+    base = leader_rows(lider, n_clients, seed=99)
+    header_row = next(i for i, row in enumerate(base) if row and row[0] == "N° Cli.")
+
+    titulo = [list(row) for row in base]
+    titulo[0] = ["Reporte de Pedidos por Líder"]  # 'Líder' sin valor en la columna B
+    sin_acento = [["Lider :", lider] if row and row[0] == "Líder :" else row for row in base]
+    # Columna vacía agregada a la izquierda de la tabla (el encabezado queda en la columna 1)
+    corrida = base[:header_row] + [[None] + list(row) for row in base[header_row:]]
+
+    return lider, [
+        ("título con 'Líder'", write_rows(os.path.join(folder, "titulo.xlsx"), titulo), "lider"),
+        ("'Lider' sin acento", write_rows(os.path.join(folder, "sin_acento.xlsx"), sin_acento), "lider"),
+        ("encabezado en columna 1", write_rows(os.path.join(folder, "corrida.xlsx"), corrida), "filas"),
+    ]
+
+
+def check_expected_changes(folder: str, n_clients: int) -> None:
+    lider, variants = variant_files(folder, n_clients)
+    for name, path, change in variants:
+        with contextlib.redirect_stdout(io.StringIO()):
+            old, new = process_file_two_pass(path), unificar.process_file(path)
+        assert new is not None and len(new) == n_clients and (new["Lider"] == lider).all(), name
+        if change == "lider":
+            assert old["Lider"].isna().all(), name
+            pd.testing.assert_frame_equal(old.drop(columns="Lider"), new.drop(columns="Lider"))
+        else:
+            assert old is None, name
+        print(f"   {name:<24}: antes {'sin líder' if change == 'lider' else 'sin filas'}, "
+              f"ahora {len(new)} filas del líder {lider} ✅")
+
+
+def time_run(func, files):
+    results = []
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for f in files:
+            results.append(func(f))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lideres", type=int, default=20)
+    parser.add_argument("--clientes", type=int, default=300)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = sorted(generate_campaign(os.path.join(tmp, "C1025"), args.lideres, args.clientes))
+        print(f"Archivos sintéticos: {len(files)} líderes x {args.clientes} clientes")
+
+        best_old = best_new = float("inf")
+        for _ in range(args.repeticiones):
+            t_old, old = time_run(process_file_two_pass, files)
+            t_new, new = time_run(unificar.process_file, files)
+            best_old, best_new = min(best_old, t_old), min(best_new, t_new)
+
+        for a, b in zip(old, new):
+            pd.testing.assert_frame_equal(a, b)
+
+        print(f"   Dos pasadas : {best_old:8.3f} s")
+        print(f"   Una pasada  : {best_new:8.3f} s")
+        print(f"   Aceleración : {best_old / best_new:8.2f}x  (salidas idénticas ✅)")
+
+        print("Cambios esperados respecto de la versión anterior:")
+        check_expected_changes(tmp, args.clientes)
+
+
+if __name__ == "__main__":
+    main()
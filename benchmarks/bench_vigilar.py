@@ -0,0 +1,124 @@
+"""
+Benchmark de vigilar_campania.py: tiempo para cargar un archivo de líder que llega a la
+carpeta contra volver a correr los pasos 2 a 4 sobre toda la campaña.
+
+Sobre una campaña sintética ya cargada, agrega un archivo de líder nuevo y reemplaza
+otro con datos distintos. Mide cuánto tarda la revisión de la carpeta que procesa cada
+archivo (sin contar --debounce ni --intervalo, que se suman a la latencia real) y una
+corrida completa (unificación sin caché, archivo unificado .xlsx, carga de clientes y
+de pedidos) sobre el sustituto SQLite. Verifica que al final las tablas y el archivo
+unificado sean los mismos en los dos casos.
+
+Uso: python benchmarks/bench_vigilar.py --lideres 40 --clientes 500
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import vigilar_campania
+from archivo_unificado import read_unified, unified_path, write_unified
+from deduplicar import apply_dedup
+from generar_campania import generate_campaign, generate_leader_workbook
+from sqlite_mysql import SQLiteStandIn, create_clientes_table, create_pedidos_table
+
+unificar = importlib.import_module("2_unificar_excels")
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+CAMPANIA = "C1025"
+
+
+def new_database(latency_ms: float) -> SQLiteStandIn:
+    conn = SQLiteStandIn(latency_ms=latency_ms)
+    create_clientes_table(conn)
+    create_pedidos_table(conn)
+    return conn
+
+
+def full_run(folder: str, output: str, conn) -> None:
+    """Lo que se hace hoy cuando llega un archivo: pasos 2 a 4 sobre toda la campaña."""
+    df = unificar.unify_campaign(folder, 1, use_cache=False)
+    write_unified(df, output, ["xlsx"])
+    df = apply_dedup(df.fillna(""))
+    subir_clientes.load_clientes(conn, df)
+    subir_pedidos.load_pedidos(conn, df, CAMPANIA)
+
+
+def tables(conn):
+    return [conn.raw.execute(sql).fetchall() for sql in (
+        "SELECT Nro, Cliente, Lider FROM clientes ORDER BY Nro",
+        "SELECT Campaña, Nro, Unidades, Faltantes, PVP, Costo_Rev FROM pedidos ORDER BY Nro",
+        "SELECT Campaña, Lider, Clientes, Unidades, Faltantes, PVP, Costo_Rev FROM pedidos_lider ORDER BY Lider",
+    )]
+
+
+def watch_once(watcher) -> float:
+    """Una revisión que encuentra el archivo y otra que lo procesa (debounce 0)."""
+    start = time.perf_counter()
+    watcher.poll()
+    processed = watcher.poll()
+    assert processed == 1, f"Se esperaba 1 archivo procesado, hubo {processed}"
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lideres", type=int, default=40)
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, CAMPANIA)
+        generate_campaign(folder, args.lideres, args.clientes, extension=".xls")
+        print(f"Campaña: {args.lideres} líderes de {args.clientes} clientes (.xls), "
+              f"latencia {args.latencia_ms} ms/viaje")
+
+        conn_full = new_database(args.latencia_ms)
+        conn_watch = new_database(args.latencia_ms)
+        watcher = vigilar_campania.CampaignWatcher(folder, CAMPANIA, lambda: conn_watch,
+                                                   os.path.join(tmp, "vigilado_Unificado.xlsx"), debounce=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            full_run(folder, os.path.join(tmp, "completo_Unificado.xlsx"), conn_full)
+            watcher.mark_existing(load=True)
+            watcher.poll()
+
+        # Llega el archivo de un líder nuevo y se vuelve a descargar el de otro con cambios
+        nuevo = args.lideres
+        generate_leader_workbook(os.path.join(folder, f"Lider_{500100 + nuevo}.xls"), str(500100 + nuevo),
+                                 args.clientes, seed=nuevo, first_nro=100000 + nuevo * args.clientes)
+        with contextlib.redirect_stdout(io.StringIO()):
+            added = watch_once(watcher)
+        generate_leader_workbook(os.path.join(folder, "Lider_500100.xls"), "500100",
+                                 args.clientes, seed=1000, first_nro=100000)
+        with contextlib.redirect_stdout(io.StringIO()):
+            changed = watch_once(watcher)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            full_run(folder, os.path.join(tmp, "completo_Unificado.xlsx"), conn_full)
+        full = time.perf_counter() - start
+
+        assert tables(conn_watch) == tables(conn_full), "La vigilancia no dejó las mismas tablas"
+        expected = read_unified(os.path.join(tmp, "completo_Unificado.xlsx"))
+        watched = read_unified(unified_path(os.path.join(tmp, "vigilado_Unificado.xlsx"), "parquet"))
+        assert watched.fillna("").equals(expected.fillna("")), "El archivo unificado no es el mismo"
+
+        print(f"   {'pasos 2 a 4 completos':<26} {full:8.2f} s")
+        print(f"   {'vigilar: líder nuevo':<26} {added:8.2f} s  ({full / added:5.1f}x)")
+        print(f"   {'vigilar: líder modificado':<26} {changed:8.2f} s  ({full / changed:5.1f}x)")
+        print(f"   (a la vigilancia se suman --debounce, {vigilar_campania.DEBOUNCE_SECONDS:g} s, "
+              f"y hasta un --intervalo, {vigilar_campania.POLL_INTERVAL:g} s)")
+        print("   Mismas tablas y mismo archivo unificado que la corrida completa ✅")
+
+
+if __name__ == "__main__":
+    main()
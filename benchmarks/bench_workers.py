@@ -0,0 +1,57 @@
+"""
+Benchmark de 2_unificar_excels.process_files con distintas cantidades de procesos.
+
+Mide el tiempo de unificación con 1, 2, 4 y 8 workers sobre una carpeta sintética
+y verifica que el resultado concatenado sea idéntico byte a byte (CSV) al secuencial.
+
+Uso: python benchmarks/bench_workers.py --lideres 40 --clientes 300
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+import contextlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+unificar = importlib.import_module("2_unificar_excels")
+from generar_campania import generate_campaign
+
+
+def unify(files, workers):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        df = pd.concat(unificar.process_files(files, workers), ignore_index=True)
+        elapsed = time.perf_counter() - start
+    return elapsed, df.to_csv(index=False).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lideres", type=int, default=40)
+    parser.add_argument("--clientes", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = sorted(generate_campaign(os.path.join(tmp, "C1025"), args.lideres, args.clientes))
+        print(f"Archivos sintéticos: {len(files)} líderes x {args.clientes} clientes (CPUs: {os.cpu_count()})")
+
+        t_base, reference = unify(files, 1)
+        print(f"   workers=1 : {t_base:8.3f} s")
+        for workers in args.workers:
+            if workers == 1:
+                continue
+            elapsed, output = unify(files, workers)
+            status = "idéntico ✅" if output == reference else "DIFERENTE ❌"
+            print(f"   workers={workers} : {elapsed:8.3f} s  ({t_base / elapsed:5.2f}x, {status})")
+
+
+if __name__ == "__main__":
+    main()
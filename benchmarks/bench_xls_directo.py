@@ -0,0 +1,69 @@
+"""
+Lectura directa de .xls en 2_unificar_excels.process_file.
+
+Genera archivos de líder .xls, los convierte a .xlsx con el motor Python de
+1_xls_xlsx y verifica que process_file produzca exactamente el mismo DataFrame
+desde el .xls original que desde el .xlsx. Mide además el tiempo de ambos caminos:
+convertir + leer .xlsx contra leer el .xls directamente.
+
+Uso: python benchmarks/bench_xls_directo.py --lideres 20 --clientes 300
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+import contextlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+conversor = importlib.import_module("1_xls_xlsx")
+unificar = importlib.import_module("2_unificar_excels")
+from generar_campania import generate_campaign
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lideres", type=int, default=20)
+    parser.add_argument("--clientes", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "C1025")
+        xls_files = sorted(generate_campaign(folder, args.lideres, args.clientes, extension=".xls"))
+        print(f"Archivos .xls sintéticos: {len(xls_files)} líderes x {args.clientes} clientes")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for xls_path in xls_files:
+                conversor.convert_xls_to_xlsx_python(xls_path, conversor.xlsx_path_for(xls_path, folder))
+            t_convert = time.perf_counter() - start
+
+            xlsx_files = unificar.find_leader_files(folder, "xlsx")
+            start = time.perf_counter()
+            from_xlsx = unificar.process_files(xlsx_files)
+            t_xlsx = time.perf_counter() - start
+
+            xls_files = unificar.find_leader_files(folder, "auto")
+            start = time.perf_counter()
+            from_xls = unificar.process_files(xls_files)
+            t_xls = time.perf_counter() - start
+
+        assert len(from_xls) == len(from_xlsx) == len(xls_files)
+        for a, b in zip(from_xls, from_xlsx):
+            pd.testing.assert_frame_equal(a, b)
+        pd.testing.assert_frame_equal(pd.concat(from_xls, ignore_index=True),
+                                      pd.concat(from_xlsx, ignore_index=True))
+
+        print(f"   .xls → .xlsx + leer .xlsx : {t_convert + t_xlsx:8.3f} s  (conversión {t_convert:.3f} s)")
+        print(f"   leer .xls directo         : {t_xls:8.3f} s")
+        print("   Salidas idénticas ✅")
+
+
+if __name__ == "__main__":
+    main()
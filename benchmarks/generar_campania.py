@@ -0,0 +1,148 @@
+import os
+import re
+import random
+import argparse
+from typing import List
+
+import openpyxl
+
+# Encabezado de dos filas tal como lo exporta el sistema de pedidos.
+# Las columnas 2 y 3 vienen desplazadas/vacías (FIXED_COLUMN_NAMES las salta).
+HEADER_ROW = [
+    "N° Cli.", "Cliente", "", "", "U. Ent.", "Falt.", "U. Ped", "P.V.P.",
+    "Ofertas", "Extras", "Costo Rev.", "Bonif.",
+]
+SUBHEADER_ROW = ["", "", "", "", "Unid.", "Unid.", "Unid.", "$", "$", "$", "$", "$"]
+
+# Algunas exportaciones usan el ordinal 'º' en lugar del signo de grado '°'
+HEADER_VARIANTS = ["N° Cli.", "Nº Cli."]
+
+NOMBRES = ["MARÍA", "JOSÉ", "ANA", "NÚÑEZ", "PEÑA", "GÓMEZ", "ROCÍO", "LUCÍA", "IBÁÑEZ", "CARLOS"]
+
+# Filas de datos por página impresa: el sistema repite el encabezado en cada página
+ROWS_PER_PAGE = 45
+
+
+def format_money(value: float) -> str:
+    """Formatea un importe al estilo argentino: $ 1.234,50"""
+    entero, decimales = f"{value:,.2f}".split(".")
+    return f"$ {entero.replace(',', '.')},{decimales}"
+
+
+def leader_rows(lider_nro: str, n_clients: int, seed: int = 0, campania: str = "C1025",
+                header_variants: bool = False, first_nro: int = 100000) -> List[list]:
+    """
+    Filas (valores de celda) de un archivo de líder, tal como las ve Excel.
+    Los Nro de cliente van de first_nro en adelante (6 dígitos, como clientes.Nro).
+    Con header_variants, el encabezado usa al azar 'N° Cli.' o 'Nº Cli.' como en las
+    distintas versiones del sistema de pedidos.
+    """
+    rng = random.Random(seed)
+    header = list(HEADER_ROW)
+    if header_variants:
+        header[0] = rng.choice(HEADER_VARIANTS)
+
+    rows = [
+        ["Reporte de Pedidos"],
+        [],
+        ["Líder :", lider_nro],
+        ["Campaña :", campania],
+        [],
+        header,
+        SUBHEADER_ROW,
+    ]
+
+    for i in range(n_clients):
+        # Salto de página: se repite el encabezado de dos filas (el filtro de Nro lo descarta)
+        if i and i % ROWS_PER_PAGE == 0:
+            rows.append([])
+            rows.append(header)
+            rows.append(SUBHEADER_ROW)
+
+        unidades = rng.randint(0, 40)
+        faltantes = rng.randint(0, min(unidades, 3))
+        pvp = unidades * rng.uniform(1000, 9000)
+        rows.append([
+            first_nro + i,
+            f"{rng.choice(NOMBRES)} {rng.choice(NOMBRES)} {lider_nro}-{i}",
+            None, None,
+            unidades - faltantes,
+            # Sin faltantes, el sistema a veces deja la celda vacía en lugar de 0
+            faltantes if faltantes or rng.random() < 0.5 else None,
+            unidades,
+            format_money(pvp),
+            rng.randint(0, 5), rng.randint(0, 2),
+            format_money(pvp * 0.7) if unidades else None,
+            rng.randint(0, 3),
+        ])
+        # Filas de ruido intercaladas (subtotales y notas) que el filtro de Nro debe descartar
+        noise = rng.random()
+        if noise < 0.05:
+            rows.append(["Subtotal", "", None, None, unidades])
+        elif noise < 0.07:
+            rows.append(["Obs.: cliente con pedido pendiente de aprobación"])
+
+    rows.append([])
+    rows.append(["Total General", "", None, None, n_clients])
+    return rows
+
+
+def generate_leader_workbook(file_path: str, lider_nro: str, n_clients: int, seed: int = 0,
+                             campania: str = "C1025", header_variants: bool = False,
+                             first_nro: int = 100000) -> None:
+    """Escribe un archivo de líder; el formato (.xlsx o .xls) se toma de la extensión."""
+    rows = leader_rows(lider_nro, n_clients, seed, campania, header_variants, first_nro)
+
+    if file_path.lower().endswith(".xls"):
+        import xlwt
+
+        wb = xlwt.Workbook()
+        ws = wb.add_sheet("Hoja1")
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                if value not in (None, ""):
+                    ws.write(r, c, value)
+        wb.save(file_path)
+        return
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    wb.save(file_path)
+
+
+def generate_campaign(folder: str, n_leaders: int, n_clients: int, seed: int = 0,
+                      extension: str = ".xlsx", header_variants: bool = False) -> List[str]:
+    """
+    Genera una carpeta de campaña con `n_leaders` archivos de `n_clients` clientes cada uno.
+    La campaña (CmmAA) se toma del nombre de la carpeta si lo tiene.
+    """
+    os.makedirs(folder, exist_ok=True)
+    match = re.search(r"C\d{4}", os.path.basename(os.path.normpath(folder)), re.IGNORECASE)
+    campania = match.group(0).upper() if match else "C1025"
+    paths = []
+    for i in range(n_leaders):
+        lider_nro = f"{500100 + i}"
+        path = os.path.join(folder, f"Lider_{lider_nro}{extension}")
+        # Cada líder tiene su propio rango de Nro de cliente
+        generate_leader_workbook(path, lider_nro, n_clients, seed=seed + i, campania=campania,
+                                 header_variants=header_variants, first_nro=100000 + i * n_clients)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera archivos de líder sintéticos.")
+    parser.add_argument("carpeta", help="Carpeta de campaña a crear (ej. /tmp/C1025)")
+    parser.add_argument("--lideres", type=int, default=10)
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--xls", action="store_true", help="Genera .xls (como los descarga el sistema) en lugar de .xlsx.")
+    parser.add_argument("--variantes", action="store_true",
+                        help="Mezcla los encabezados 'N° Cli.' y 'Nº Cli.' entre líderes.")
+    args = parser.parse_args()
+
+    files = generate_campaign(args.carpeta, args.lideres, args.clientes, args.semilla,
+                              ".xls" if args.xls else ".xlsx", args.variantes)
+    print(f"✅ Generados {len(files)} archivos en {args.carpeta}")
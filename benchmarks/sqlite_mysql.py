@@ -0,0 +1,144 @@
+"""
+Sustituto de mysql.connector sobre SQLite para los benchmarks.
+
+Expone la misma interfaz que usan los scripts de carga (cursor, execute, executemany,
+fetchone, fetchall, commit, rollback) traduciendo los marcadores %s de MySQL a ?,
+cuenta los viajes de ida y vuelta al servidor y, opcionalmente, simula la latencia
+de red de cada uno.
+"""
+import re
+import time
+import sqlite3
+
+# Clave única de cada tabla, necesaria para traducir ON DUPLICATE KEY UPDATE a ON CONFLICT
+UNIQUE_KEYS = {
+    "clientes": "Nro",
+    "pedidos": "Campaña, Nro",
+}
+
+
+def to_sqlite(sql: str) -> str:
+    """Traduce los marcadores y el upsert de MySQL a la sintaxis de SQLite."""
+    sql = sql.replace("%s", "?")
+    match = re.search(r"ON DUPLICATE KEY UPDATE(.*)$", sql, re.S)
+    if match:
+        table = re.search(r"INSERT\s+INTO\s+(\w+)", sql).group(1)
+        assignments = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", match.group(1))
+        sql = sql[:match.start()] + f"ON CONFLICT({UNIQUE_KEYS[table]}) DO UPDATE SET{assignments}"
+    return sql
+
+
+class RoundTripCursor:
+    def __init__(self, conn: "SQLiteStandIn"):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+
+    def _round_trip(self):
+        self._conn.round_trips += 1
+        if self._conn.latency:
+            time.sleep(self._conn.latency)
+
+    def execute(self, sql, params=()):
+        self._round_trip()
+        if sql.lstrip().upper().startswith("CREATE TABLE"):
+            # DDL de MySQL (COMMENT, CHARACTER SET...): las tablas se crean con create_*_table
+            return
+        self._cursor.execute(to_sqlite(sql), tuple(params))
+
+    def executemany(self, sql, seq_params):
+        # mysql.connector reescribe un INSERT con executemany en un único INSERT multi-fila:
+        # se contabiliza como un solo viaje al servidor.
+        self._round_trip()
+        self._cursor.executemany(to_sqlite(sql), list(seq_params))
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteStandIn:
+    def __init__(self, path: str = ":memory:", latency_ms: float = 0.0):
+        self.raw = sqlite3.connect(path)
+        self.latency = latency_ms / 1000.0
+        self.round_trips = 0
+
+    def cursor(self):
+        return RoundTripCursor(self)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.raw.close()
+
+
+def create_clientes_table(conn: SQLiteStandIn):
+    conn.raw.execute("""
+    CREATE TABLE IF NOT EXISTS clientes (
+        idCliente INTEGER PRIMARY KEY AUTOINCREMENT,
+        Nro VARCHAR(6) UNIQUE,
+        Cliente VARCHAR(255),
+        Lider VARCHAR(20)
+    )
+    """)
+
+
+def create_pedidos_table(conn: SQLiteStandIn):
+    conn.raw.execute("""
+    CREATE TABLE IF NOT EXISTS pedidos (
+        idPedidos INTEGER PRIMARY KEY AUTOINCREMENT,
+        Campaña VARCHAR(5) NOT NULL,
+        Nro VARCHAR(6) NOT NULL,
+        Unidades INT NULL,
+        Faltantes INT NULL,
+        PVP DECIMAL(10,2) NULL,
+        Costo_Rev DECIMAL(10,2) NULL,
+        UNIQUE (Campaña, Nro)
+    )
+    """)
+    # Cada carga de pedidos actualiza también los resúmenes de la campaña (resumenes.py)
+    create_resumen_tables(conn)
+
+
+def create_resumen_tables(conn: SQLiteStandIn):
+    conn.raw.execute("""
+    CREATE TABLE IF NOT EXISTS pedidos_lider (
+        Campaña VARCHAR(5) NOT NULL,
+        Lider VARCHAR(20) NOT NULL,
+        Clientes INT NOT NULL,
+        Unidades INT NULL,
+        Faltantes INT NULL,
+        PVP DECIMAL(14,2) NULL,
+        Costo_Rev DECIMAL(14,2) NULL,
+        actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (Campaña, Lider)
+    )
+    """)
+    conn.raw.execute("CREATE INDEX IF NOT EXISTS idx_lider ON pedidos_lider (Lider)")
+    conn.raw.execute("""
+    CREATE TABLE IF NOT EXISTS pedidos_campania (
+        Campaña VARCHAR(5) NOT NULL PRIMARY KEY,
+        Lideres INT NOT NULL,
+        Clientes INT NOT NULL,
+        Unidades INT NULL,
+        Faltantes INT NULL,
+        PVP DECIMAL(14,2) NULL,
+        Costo_Rev DECIMAL(14,2) NULL,
+        actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
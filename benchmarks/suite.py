@@ -0,0 +1,265 @@
+"""
+Suite de benchmarks reproducible del pipeline de pedidos.
+
+Genera una campaña sintética (generar_campania.py) y mide cada etapa de punta a punta:
+conversión .xls → .xlsx, unificación (sin y con caché), escritura y lectura del archivo
+unificado, preparación de pedidos y las cargas de clientes y pedidos (primera carga,
+recarga completa y recarga --diff). También mide las funciones calientes por separado
+(process_file, extract_lider_number, clean_monetary_value).
+
+La base es el sustituto SQLite (sqlite_mysql.py) o un MySQL/MariaDB local con --mysql.
+Los resultados (mediana de --repeticiones corridas) se comparan contra la línea base
+guardada en resultados/baseline.json; --guardar-baseline la reemplaza.
+
+Uso: python benchmarks/suite.py --lideres 20 --clientes 500 --repeticiones 3
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import getpass
+import platform
+import argparse
+import tempfile
+import importlib
+import statistics
+import contextlib
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+conversor = importlib.import_module("1_xls_xlsx")
+unificar = importlib.import_module("2_unificar_excels")
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+from archivo_unificado import read_unified, write_unified
+from generar_campania import format_money, generate_campaign
+from sqlite_mysql import SQLiteStandIn, create_clientes_table, create_pedidos_table
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+CAMPANIA = "C0125"
+
+
+def quiet(func: Callable, *args, **kwargs):
+    """Ejecuta func sin los mensajes de los scripts (sólo interesa el tiempo)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def timed(times: Dict[str, float], name: str, func: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = quiet(func, *args, **kwargs)
+    times[name] = time.perf_counter() - start
+    return result
+
+
+# ====================================================================
+# === BASE DE DATOS ===
+# ====================================================================
+
+def sqlite_connection(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = SQLiteStandIn(path)
+    create_clientes_table(conn)
+    create_pedidos_table(conn)
+    conn.commit()
+    return conn
+
+
+def mysql_connection(args):
+    import mysql.connector
+
+    password = os.environ.get("MYSQL_PWD") or getpass.getpass(f"Contraseña MySQL para {args.user}: ")
+    server = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=password)
+    server.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {args.database}")
+    server.close()
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                   password=password, database=args.database)
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS clientes")
+    cursor.execute("DROP TABLE IF EXISTS pedidos")
+    conn.commit()
+    cursor.close()
+    # Las cargas vuelven a crear las tablas: CREATE TABLE no se saltea por el caché del proceso
+    from conexion_mysql import reset_schema_cache
+    reset_schema_cache()
+    return conn
+
+
+# ====================================================================
+# === ETAPAS ===
+# ====================================================================
+
+def run_pipeline(folder: str, tmp: str, connect: Callable) -> Dict[str, float]:
+    """Una corrida completa sobre la campaña ya generada. Devuelve segundos por etapa."""
+    times: Dict[str, float] = {}
+
+    timed(times, "convertir_xls", conversor.convert_folder, folder, folder, "python", 1, True)
+
+    unificar.UnificationCache(os.path.join(folder, unificar.CACHE_DIR_NAME)).clear()
+    df = timed(times, "unificar", unificar.unify_campaign, folder, 1, True, "xls")
+    timed(times, "unificar_con_cache", unificar.unify_campaign, folder, 1, True, "xls")
+
+    base = os.path.join(tmp, f"{CAMPANIA}_Unificado.xlsx")
+    for fmt in ("xlsx", "parquet"):
+        timed(times, f"escribir_{fmt}", write_unified, df, base, [fmt])
+        df_read = timed(times, f"leer_{fmt}", read_unified, os.path.splitext(base)[0] + f".{fmt}")
+
+    pedidos, _ = timed(times, "preparar_pedidos", subir_pedidos.prepare_pedidos, df_read, CAMPANIA)
+
+    conn = connect()
+    try:
+        timed(times, "cargar_clientes", subir_clientes.load_clientes, conn, df_read)
+        timed(times, "cargar_pedidos", subir_pedidos.load_pedidos, conn, df_read, CAMPANIA)
+        timed(times, "recargar_pedidos", subir_pedidos.load_pedidos, conn, df_read, CAMPANIA)
+        timed(times, "recargar_pedidos_diff", subir_pedidos.load_pedidos, conn, df_read, CAMPANIA, diff=True)
+    finally:
+        conn.close()
+    return times
+
+
+def run_micro(folder: str) -> Dict[str, float]:
+    """Funciones calientes medidas por separado."""
+    times: Dict[str, float] = {}
+    first_file = sorted(f for f in os.listdir(folder) if f.endswith(".xls"))[0]
+    path = os.path.join(folder, first_file)
+
+    timed(times, "process_file", unificar.process_file, path)
+
+    df_raw = pd.read_excel(path, header=None, dtype=str).fillna("")
+    start = time.perf_counter()
+    for _ in range(200):
+        unificar.extract_lider_number(df_raw)
+    times["extract_lider_number_x200"] = time.perf_counter() - start
+
+    rng = random.Random(0)
+    values = [format_money(rng.uniform(0, 250000)) for _ in range(100000)]
+    start = time.perf_counter()
+    for value in values:
+        subir_pedidos.clean_monetary_value(value)
+    times["clean_monetary_value_x100k"] = time.perf_counter() - start
+    return times
+
+
+# ====================================================================
+# === RESULTADOS ===
+# ====================================================================
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    return {stage: round(statistics.median(run[stage] for run in runs), 6) for stage in runs[0]}
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "sistema": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> int:
+    """
+    Imprime la comparación contra la línea base. Devuelve cuántas etapas empeoraron.
+    Las diferencias menores a min_delta segundos se consideran ruido de medición.
+    """
+    if baseline.get("parametros") != results["parametros"]:
+        print(f"⚠️ La línea base se midió con otros parámetros: {baseline.get('parametros')}")
+
+    regressions = 0
+    print(f"\n   {'Etapa':<30} {'Actual':>9} {'Base':>9} {'Relación':>9}")
+    for stage, seconds in results["etapas"].items():
+        base = baseline.get("etapas", {}).get(stage)
+        if base is None:
+            print(f"   {stage:<30} {seconds:9.3f} {'-':>9}")
+            continue
+        ratio = seconds / base if base else float("inf")
+        mark = ""
+        if abs(seconds - base) < min_delta:
+            pass
+        elif ratio > 1 + tolerance:
+            mark = "  ⚠️ más lento"
+            regressions += 1
+        elif ratio < 1 - tolerance:
+            mark = "  ✅ más rápido"
+        print(f"   {stage:<30} {seconds:9.3f} {base:9.3f} {ratio:8.2f}x{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lideres", type=int, default=20)
+    parser.add_argument("--clientes", type=int, default=500, help="Clientes por líder.")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Variación relativa contra la base que se marca como cambio (por defecto 0.2 = 20%%).")
+    parser.add_argument("--minimo-ms", type=float, default=20,
+                        help="Diferencias menores a estos milisegundos no se marcan (por defecto 20).")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Archivo JSON de la línea base.")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guarda estos resultados como nueva línea base.")
+    parser.add_argument("--salida", help="Guarda además los resultados de esta corrida en este archivo JSON.")
+    parser.add_argument("--mysql", action="store_true", help="Usa un MySQL/MariaDB local en lugar de SQLite.")
+    parser.add_argument("--host", default=os.environ.get("MYSQL_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MYSQL_PORT", 3306)))
+    parser.add_argument("--user", default=os.environ.get("MYSQL_USER", "root"))
+    parser.add_argument("--database", default="bench_pedidos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, CAMPANIA)
+        start = time.perf_counter()
+        generate_campaign(folder, args.lideres, args.clientes, args.semilla, extension=".xls")
+        print(f"Campaña sintética: {args.lideres} líderes x {args.clientes} clientes "
+              f"({time.perf_counter() - start:.1f} s para generarla)")
+
+        if args.mysql:
+            connect = lambda: mysql_connection(args)
+        else:
+            connect = lambda: sqlite_connection(os.path.join(tmp, "pedidos.sqlite"))
+
+        runs = []
+        for i in range(args.repeticiones):
+            times = run_pipeline(folder, tmp, connect)
+            times.update(run_micro(folder))
+            runs.append(times)
+            print(f"   Corrida {i + 1}/{args.repeticiones}: {sum(times.values()):.2f} s")
+
+    results = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"lideres": args.lideres, "clientes": args.clientes, "semilla": args.semilla,
+                       "base": "mysql" if args.mysql else "sqlite"},
+        "entorno": environment(),
+        "repeticiones": args.repeticiones,
+        "etapas": summarize(runs),
+    }
+
+    if os.path.exists(args.baseline) and not args.guardar_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerancia, args.minimo_ms / 1000)
+        print(f"\nEtapas más lentas que la base: {regressions}")
+    else:
+        print(f"\n   {'Etapa':<30} {'Segundos':>9}")
+        for stage, seconds in results["etapas"].items():
+            print(f"   {stage:<30} {seconds:9.3f}")
+
+    paths = [args.salida] if args.salida else []
+    if args.guardar_baseline:
+        paths.append(args.baseline)
+    for path in paths:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ Resultados guardados en: {path}")
+
+
+if __name__ == "__main__":
+    main()
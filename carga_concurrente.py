@@ -0,0 +1,234 @@
+import time
+import threading
+import importlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+import mysql.connector
+
+from conexion_mysql import MAX_RETRIES, RETRY_BACKOFF, ensure_table, is_transient
+from directorio_clientes import ClientDirectory, get_client_directory, refresh_snapshot
+from instrumentacion import metrics
+from resumenes import ensure_rollup_tables, refresh_rollups
+
+# Los scripts numerados no se pueden importar con "import", se cargan por nombre
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+# ====================================================================
+# === CARGA CONCURRENTE DE CLIENTES Y PEDIDOS ===
+# ====================================================================
+# Los lotes de clientes y de pedidos se envían a la vez en varias conexiones de un pool
+# (cada lote en su propia transacción), con un máximo de lotes en vuelo: cuando se llega
+# al máximo, no se arma el siguiente lote hasta que termine alguno (contrapresión).
+# Los pedidos de clientes que se insertan en esta misma carga se envían recién cuando
+# todos los lotes de clientes confirmaron.
+
+WORKERS = 4
+
+
+class Batch(NamedTuple):
+    tabla: str
+    sql: str
+    rows: List[tuple]
+
+
+def make_batches(tabla: str, sql: str, rows: List[tuple], chunk_size: int) -> List[Batch]:
+    return [Batch(tabla, sql, chunk) for chunk in subir_pedidos.iter_chunks(rows, chunk_size)]
+
+
+class ConcurrentLoader:
+    """Envía lotes en `workers` conexiones del pool, con a lo sumo `max_pending` lotes en vuelo."""
+
+    def __init__(self, pool, workers: int = WORKERS, max_pending: Optional[int] = None):
+        self.pool = pool
+        self.workers = workers
+        self.max_pending = max(max_pending or 2 * workers, workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.retries = 0
+
+    def _send(self, batch: Batch) -> int:
+        """Un lote en su propia conexión y transacción; ante deadlock se reintenta con espera creciente."""
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                conn = self.pool.get_connection()
+                try:
+                    cursor = conn.cursor()
+                    with metrics.stage("insert", tabla=batch.tabla, filas=len(batch.rows), motor="concurrente"):
+                        cursor.executemany(batch.sql, batch.rows)
+                        conn.commit()
+                    cursor.close()
+                    return len(batch.rows)
+                except mysql.connector.Error as err:
+                    # Errores transitorios (conexion_mysql.TRANSIENT_ERRNOS): dos lotes de pedidos
+                    # pueden bloquearse entre sí sobre el índice único, o cortarse la conexión
+                    if conn.is_connected():
+                        conn.rollback()
+                    if not is_transient(err) or attempt == MAX_RETRIES:
+                        raise
+                    with self._lock:
+                        self.retries += 1
+                finally:
+                    conn.close()  # Devuelve la conexión al pool
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def _submit(self, executor: ThreadPoolExecutor, batch: Batch) -> Future:
+        self._slots.acquire()  # Contrapresión: espera a que termine algún lote en vuelo
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return executor.submit(self._send, batch)
+
+    def run(self, clientes: List[Batch], pedidos: List[Batch], dependientes: List[Batch]) -> Dict[str, object]:
+        """
+        Encola primero los lotes de clientes y enseguida los de pedidos de clientes que ya
+        existían. Los pedidos de clientes nuevos (dependientes) se encolan cuando todos los
+        lotes de clientes confirmaron; si alguno falló, no se envían.
+        Devuelve filas enviadas por tabla, lotes confirmados, errores y filas dependientes omitidas.
+        """
+        result = {"filas": {"clientes": 0, "pedidos": 0}, "confirmados": [], "errores": [],
+                  "dependientes_omitidos": 0}
+        futures: Dict[Future, Batch] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            client_futures = []
+            for batch in clientes:
+                future = self._submit(executor, batch)
+                client_futures.append(future)
+                futures[future] = batch
+
+            queue = deque(pedidos)
+            pending = list(dependientes)
+            while queue or pending:
+                if pending and all(f.done() for f in client_futures):
+                    if any(f.exception() for f in client_futures):
+                        result["dependientes_omitidos"] = sum(len(b.rows) for b in pending)
+                    else:
+                        queue.extendleft(reversed(pending))
+                    pending = []
+                    continue
+                if not queue:
+                    wait(client_futures)
+                    continue
+                batch = queue.popleft()
+                futures[self._submit(executor, batch)] = batch
+
+        for future, batch in futures.items():
+            error = future.exception()
+            if error:
+                result["errores"].append(f"{batch.tabla}: {error}")
+            else:
+                result["filas"][batch.tabla] += future.result()
+                result["confirmados"].append(batch)
+        return result
+
+
+def load_concurrent(pool, df_out: pd.DataFrame, campania: str, workers: int = WORKERS,
+                    max_pending: Optional[int] = None, chunk_size: int = subir_pedidos.CHUNK_SIZE,
+                    directory: Optional[ClientDirectory] = None, skip_orphans: bool = False,
+                    snapshot_path: Optional[str] = None, rollups: bool = True) -> Dict[str, object]:
+    """
+    Carga los clientes nuevos y los pedidos de la campaña a la vez sobre el pool (ver
+    ConcurrentLoader). A diferencia de load_clientes/load_pedidos, cada lote es su propia
+    transacción: si un lote falla, los demás quedan cargados y volver a correr la carga
+    completa los que faltan (ambos INSERT son idempotentes). Al final se recalculan los
+    resúmenes de la campaña con lo que quedó cargado (ver resumenes.py).
+    """
+    start = time.perf_counter()
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor()
+        if directory is None:
+            with metrics.stage("directorio_clientes") as etapa:
+                directory = get_client_directory(cursor, snapshot_path)
+                etapa.update(filas=len(directory), origen=directory.source)
+        ensure_table(cursor, subir_pedidos.SQL_CREATE_PEDIDOS)
+        if rollups:
+            ensure_rollup_tables(cursor)
+        with metrics.stage("select_existentes", tabla="pedidos", campania=campania) as etapa:
+            cursor.execute("SELECT Nro FROM pedidos WHERE Campaña = %s", (campania,))
+            nros_existentes = {str(nro) for (nro,) in cursor.fetchall()}
+            etapa["filas"] = len(nros_existentes)
+        cursor.close()
+    finally:
+        conn.close()
+
+    clientes_nuevos, clientes_saltados = subir_clientes.select_new_clientes(df_out, directory)
+    with metrics.stage("preparar_pedidos", campania=campania) as etapa:
+        pedidos, celdas_invalidas = subir_pedidos.prepare_pedidos(df_out, campania)
+        etapa["filas"] = len(pedidos)
+    # Los clientes nuevos del archivo no son huérfanos: sólo quedan los pedidos sin cliente
+    nros_nuevos = {row[0] for row in clientes_nuevos}
+    pedidos, huerfanos = subir_pedidos.find_orphans(pedidos, directory, skip_orphans, nros_nuevos)
+    # Un Nro repetido en el archivo iría en lotes distintos sin orden garantizado: queda el último
+    pedidos = list({row[1]: row for row in pedidos}.values())
+
+    dependientes = [row for row in pedidos if row[1] in nros_nuevos]
+    independientes = [row for row in pedidos if row[1] not in nros_nuevos]
+
+    batches = (
+        make_batches("clientes", subir_clientes.SQL_INSERT_CLIENTE, clientes_nuevos, chunk_size),
+        make_batches("pedidos", subir_pedidos.SQL_PEDIDOS, independientes, chunk_size),
+        make_batches("pedidos", subir_pedidos.SQL_PEDIDOS, dependientes, chunk_size),
+    )
+    loader = ConcurrentLoader(pool, workers, max_pending)
+    result = loader.run(*batches)
+    # Al directorio (compartido con otras cargas) sólo pasan los clientes de lotes confirmados
+    directory.add_many(row for batch in result["confirmados"] if batch.tabla == "clientes" for row in batch.rows)
+
+    if rollups or (snapshot_path and not result["errores"]):
+        conn = pool.get_connection()
+        try:
+            cursor = conn.cursor()
+            if rollups:
+                refresh_rollups(cursor, campania)
+                conn.commit()
+            if not result["errores"]:
+                refresh_snapshot(cursor, directory, snapshot_path)
+            cursor.close()
+        finally:
+            conn.close()
+
+    enviados = [row for batch in result["confirmados"] if batch.tabla == "pedidos" for row in batch.rows]
+    insertados = sum(1 for row in enviados if row[1] not in nros_existentes)
+    return {
+        "clientes_insertados": result["filas"]["clientes"],
+        "clientes_saltados": clientes_saltados,
+        "filas": result["filas"]["pedidos"],
+        "insertados": insertados,
+        "actualizados": len(enviados) - insertados,
+        "dependientes": len(dependientes),
+        "dependientes_omitidos": result["dependientes_omitidos"],
+        "huerfanos": len(huerfanos),
+        "celdas_invalidas": sum(celdas_invalidas.values()),
+        "lotes": sum(len(b) for b in batches),
+        "max_en_vuelo": loader.peak_in_flight,
+        "reintentos": loader.retries,
+        "errores": result["errores"],
+        "segundos": time.perf_counter() - start,
+    }
+
+
+def print_concurrent_summary(stats: Dict[str, object]) -> None:
+    print("\n--- Carga Concurrente Terminada ---")
+    print(f"   Clientes insertados (Nro nuevo): {stats['clientes_insertados']}")
+    print(f"   Clientes saltados (Nro preexistente): {stats['clientes_saltados']}")
+    print(f"   Pedidos insertados (nuevos): {stats['insertados']}")
+    print(f"   Pedidos actualizados (ya existían): {stats['actualizados']}")
+    print(f"   Pedidos de clientes nuevos (enviados después de confirmar los clientes): {stats['dependientes']}")
+    print(f"   Lotes: {stats['lotes']}, máximo en vuelo: {stats['max_en_vuelo']}, reintentos: {stats['reintentos']}")
+    if stats["dependientes_omitidos"]:
+        print(f"   ⚠️ Pedidos no enviados porque falló la carga de sus clientes: {stats['dependientes_omitidos']}")
+    for error in stats["errores"]:
+        print(f"   ❌ Lote con error: {error}")
+    if stats["segundos"] > 0:
+        print(f"   Tiempo: {stats['segundos']:.2f} s")
+    print("-----------------------------------")
@@ -0,0 +1,186 @@
+import os
+import re
+import tempfile
+from typing import Iterable, List, Optional
+
+# ====================================================================
+# === CARGA MASIVA CON LOAD DATA LOCAL INFILE ===
+# ====================================================================
+# Lo usan 3_subir_clientes.py y 4_subir_pedidos.py con --engine infile.
+# Las filas se escriben en un archivo temporal, se cargan con LOAD DATA LOCAL INFILE
+# en una tabla temporal de staging y se pasan a la tabla final con un único
+# INSERT ... SELECT ... ON DUPLICATE KEY UPDATE.
+
+ENGINES = ["executemany", "infile", "prepared"]
+
+# Con engine="prepared" (ver PreparedInsert), filas por cada INSERT multi-fila preparado.
+# MySQL admite hasta 65535 parámetros por sentencia: 1000 filas de pedidos son 6000.
+PREPARED_ROWS = 1000
+
+# Errores de MySQL cuando LOAD DATA LOCAL está deshabilitado en el servidor (1148, 3948)
+# o en el cliente (2068: la conexión no se abrió con allow_local_infile=True)
+LOCAL_INFILE_ERRORS = {1148, 2068, 3948}
+
+
+def _tsv_value(value) -> str:
+    """Formato de una celda para LOAD DATA (campos separados por tabulación, NULL como \\N)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, float):
+        return repr(value)
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def write_tsv(rows: Iterable[tuple], path: str) -> int:
+    """Escribe las filas en el formato por defecto de LOAD DATA. Devuelve cuántas se escribieron."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for row in rows:
+            f.write("\t".join(_tsv_value(value) for value in row))
+            f.write("\n")
+            count += 1
+    return count
+
+
+class BulkUpserter:
+    """
+    Envía lotes de filas a `table` con LOAD DATA LOCAL INFILE + INSERT ... SELECT.
+    Si local_infile está deshabilitado (en el servidor o en la conexión) avisa una vez y
+    sigue con executemany(sql_fallback), que es la carga de siempre.
+    update_columns vacío = los Nro existentes no se tocan (como la carga de clientes).
+    """
+
+    def __init__(self, cursor, table: str, columns: List[str], update_columns: List[str],
+                 sql_fallback: str, engine: str = "infile"):
+        self.cursor = cursor
+        self.table = table
+        self.columns = columns
+        self.update_columns = update_columns
+        self.sql_fallback = sql_fallback
+        self.engine = engine
+        self.staging = f"stg_{table}"
+        if self.engine == "infile" and not self._server_allows_local_infile():
+            self._fall_back("el servidor tiene local_infile = OFF")
+
+    def _server_allows_local_infile(self) -> bool:
+        self.cursor.execute("SELECT @@GLOBAL.local_infile")
+        (value,) = self.cursor.fetchone()
+        return str(value).upper() in ("1", "ON")
+
+    def _fall_back(self, reason: str) -> None:
+        print(f"⚠️ LOAD DATA LOCAL INFILE no disponible ({reason}); se usa executemany.")
+        self.engine = "executemany"
+
+    def _upsert_sql(self) -> str:
+        columns = ", ".join(self.columns)
+        if self.update_columns:
+            updates = ",\n    ".join(f"{self.table}.{col} = VALUES({col})" for col in self.update_columns)
+        else:
+            # Sin columnas a actualizar: la fila existente queda como está
+            updates = f"{self.table}.{self.columns[0]} = {self.table}.{self.columns[0]}"
+        # ORDER BY fila: si una clave se repite en el archivo gana la última, como con executemany.
+        # Las columnas se califican con la tabla porque staging tiene los mismos nombres.
+        return (f"INSERT INTO {self.table} ({columns})\n"
+                f"SELECT {columns} FROM {self.staging} ORDER BY fila\n"
+                f"ON DUPLICATE KEY UPDATE\n    {updates}")
+
+    def _send_infile(self, rows: List[tuple], tmp_dir: Optional[str]) -> None:
+        columns = ", ".join(self.columns)
+        self.cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.staging}")
+        # Mismos tipos que la tabla final, sin sus claves únicas, más el orden de llegada
+        self.cursor.execute(f"CREATE TEMPORARY TABLE {self.staging} (fila INT AUTO_INCREMENT PRIMARY KEY) "
+                            f"SELECT {columns} FROM {self.table} LIMIT 0")
+
+        fd, path = tempfile.mkstemp(suffix=".tsv", prefix=f"{self.table}_", dir=tmp_dir)
+        os.close(fd)
+        try:
+            write_tsv(rows, path)
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.staging} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({columns})",
+                (path.replace("\\", "/"),)
+            )
+            self.cursor.execute(self._upsert_sql())
+        finally:
+            os.remove(path)
+            self.cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.staging}")
+
+    def send(self, rows: List[tuple], tmp_dir: Optional[str] = None) -> None:
+        """Envía un lote dentro de la transacción en curso (no hace COMMIT)."""
+        if not rows:
+            return
+        if self.engine == "infile":
+            import mysql.connector  # ya importado por la conexión abierta; no se carga al importar este módulo
+            try:
+                self._send_infile(rows, tmp_dir)
+                return
+            except mysql.connector.Error as err:
+                if err.errno not in LOCAL_INFILE_ERRORS:
+                    raise
+                self._fall_back(str(err))
+        self.cursor.executemany(self.sql_fallback, rows)
+
+
+# ====================================================================
+# === INSERT MULTI-FILA CON SENTENCIA PREPARADA ===
+# ====================================================================
+# Con --engine prepared. executemany de un cursor preparado hace un viaje al servidor por
+# fila, así que lo que se prepara es el INSERT multi-fila que arma executemany de texto:
+# el servidor lo analiza una sola vez y cada lote viaja como parámetros binarios.
+
+_VALUES_GROUP = re.compile(r"VALUES\s*(\((?:\s*%s\s*,?)+\))")
+
+
+def multirow_sql(sql: str, rows: int) -> str:
+    """Repite el grupo VALUES (%s, ...) de un INSERT para enviar `rows` filas en una sentencia."""
+    match = _VALUES_GROUP.search(sql)
+    if match is None:
+        raise ValueError(f"La sentencia no tiene un grupo VALUES (%s, ...): {sql}")
+    groups = ", ".join([match.group(1)] * rows)
+    return f"{sql[:match.start(1)]}{groups}{sql[match.end(1):]}"
+
+
+class PreparedInsert:
+    """
+    Envía lotes con un INSERT de PREPARED_ROWS filas preparado una vez en el servidor
+    (cursor(prepared=True)); el resto de cada lote que no completa una sentencia va por
+    executemany de texto. Misma interfaz que BulkUpserter: send(filas), sin COMMIT.
+    Después de reconectar hay que llamar a reset(): la sentencia era de la sesión anterior.
+    """
+
+    engine = "prepared"
+
+    def __init__(self, conn, sql: str, rows_per_statement: int = PREPARED_ROWS):
+        self.conn = conn
+        self.sql = sql
+        self.rows_per_statement = rows_per_statement
+        # Siempre el mismo objeto str: el cursor sólo vuelve a preparar si cambia la sentencia
+        self.sql_multirow = multirow_sql(sql, rows_per_statement)
+        self.cursor = self.text_cursor = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Cursores nuevos; los anteriores se cierran para liberar la sentencia preparada en el servidor."""
+        for cursor in (self.cursor, self.text_cursor):
+            if cursor is None:
+                continue
+            try:
+                cursor.close()
+            except Exception:
+                # Después de una desconexión la sentencia ya no existe en el servidor
+                pass
+        self.cursor = self.conn.cursor(prepared=True)
+        self.text_cursor = self.conn.cursor()
+
+    def send(self, rows: List[tuple]) -> None:
+        """Envía un lote dentro de la transacción en curso (no hace COMMIT)."""
+        n = self.rows_per_statement
+        full = len(rows) - len(rows) % n
+        for i in range(0, full, n):
+            self.cursor.execute(self.sql_multirow, [value for row in rows[i:i + n] for value in row])
+        if full < len(rows):
+            self.text_cursor.executemany(self.sql, rows[full:])
+
+    def close(self) -> None:
+        self.cursor.close()
+        self.text_cursor.close()
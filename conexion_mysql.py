@@ -0,0 +1,180 @@
+import os
+import time
+import getpass # Importar getpass para una entrada de contraseña segura
+from typing import Callable, Dict, List, Set
+
+import mysql.connector
+from mysql.connector import pooling
+
+# ====================================================================
+# === CONEXIÓN A MYSQL (compartida por los scripts de carga) ===
+# ====================================================================
+
+# HOST y DATABASE (que suelen ser fijos)
+DB_HOST = 'localhost'
+DB_NAME = 'gerencia'
+
+
+def ask_db_config() -> dict:
+    """
+    Arma la configuración de conexión. Host, base, usuario y contraseña se toman de
+    MYSQL_HOST, MYSQL_DATABASE, MYSQL_USER y MYSQL_PWD si están definidas (MYSQL_PORT es
+    opcional); el usuario y la contraseña que falten se piden por consola.
+    """
+    db_user = os.environ.get("MYSQL_USER")
+    db_password = os.environ.get("MYSQL_PWD")
+    if not db_user or db_password is None:
+        print("--- Credenciales de MySQL ---")
+        # db_host = input("Ingrese el Host de la base de datos (ej. localhost): ").strip()
+        # db_name = input("Ingrese el nombre de la base de datos (ej. gerencia): ").strip()
+
+        # Solicitar usuario y contraseña
+        if not db_user:
+            db_user = input("Ingrese el Usuario de MySQL: ").strip()
+        # getpass oculta la entrada del usuario para la contraseña
+        if db_password is None:
+            db_password = getpass.getpass("Ingrese la Contraseña de MySQL: ")
+        print("-----------------------------\n")
+
+    # Configuración de la base de datos dinámica
+    config = {
+        "host": os.environ.get("MYSQL_HOST", DB_HOST),
+        "user": db_user,
+        "password": db_password,
+        "database": os.environ.get("MYSQL_DATABASE", DB_NAME)
+    }
+    if os.environ.get("MYSQL_PORT"):
+        config["port"] = int(os.environ["MYSQL_PORT"])
+    return config
+
+
+def create_pool(db_config: dict, size: int, name: str = "gerencia") -> pooling.MySQLConnectionPool:
+    """Pool de conexiones compartido (p. ej. para cargar varias campañas en paralelo)."""
+    return pooling.MySQLConnectionPool(pool_name=name, pool_size=size, **db_config)
+
+
+# ====================================================================
+# === POOL, ESQUEMA Y REINTENTOS (capa común de 3 y 4) ===
+# ====================================================================
+
+# Los scripts usan una conexión a la vez: el pool la deja abierta entre pasos (esquema,
+# clientes, pedidos, cada archivo de vigilar_campania) y la reconecta si se cayó.
+# Regla: la conexión de connect() se devuelve (close() o release()) antes de pedir otra;
+# lo que necesita varias a la vez (--batch, --concurrente) arma su pool con create_pool
+POOL_SIZE = 1
+
+# Errores que se resuelven repitiendo la transacción: lock wait timeout (1205), deadlock
+# (1213), servidor desconectado (2006) y conexión perdida durante la consulta (2013, 2055)
+TRANSIENT_ERRNOS = {1205, 1213, 2006, 2013, 2055}
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.1  # segundos; se duplica en cada intento
+
+_pools: Dict[tuple, pooling.MySQLConnectionPool] = {}
+# Sólo en memoria: cada ejecución de un script suelto vuelve a mandar sus CREATE TABLE IF NOT
+# EXISTS (un viaje por tabla). No se guarda entre ejecuciones porque una tabla borrada a mano
+# haría fallar la carga siguiente en lugar de volver a crearse.
+_schema_ready: Set[str] = set()
+
+
+def connect(db_config: dict):
+    """
+    Conexión del pool del proceso para esta configuración (el pool se crea la primera vez).
+    Se usa como mysql.connector.connect; al cerrarla vuelve al pool en lugar de cortarse.
+    Hay una sola por configuración (POOL_SIZE): pedir otra sin devolver la anterior es un error.
+    """
+    key = tuple(sorted(db_config.items()))
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = create_pool(db_config, POOL_SIZE, name=f"{DB_NAME}_{len(_pools) + 1}")
+    try:
+        return pool.get_connection()
+    except mysql.connector.errors.PoolError as err:
+        raise mysql.connector.errors.PoolError(
+            f"La conexión a MySQL de este proceso ya está en uso (pool de {POOL_SIZE}): hay que "
+            "devolverla con close() antes de pedir otra, o usar create_pool para varias a la vez."
+        ) from err
+
+
+def release(conn) -> None:
+    """
+    Devuelve la conexión al pool aunque esté caída: close() la devuelve pero puede fallar al
+    limpiar la sesión, y sin ella el próximo connect() no tendría conexión disponible.
+    """
+    try:
+        conn.rollback()
+    except mysql.connector.Error:
+        pass
+    try:
+        conn.close()
+    except mysql.connector.Error:
+        pass
+
+
+def ensure_table(cursor, ddl: str) -> None:
+    """CREATE TABLE IF NOT EXISTS una sola vez por proceso (las cargas siguientes del mismo proceso no lo repiten)."""
+    if ddl not in _schema_ready:
+        cursor.execute(ddl)
+        _schema_ready.add(ddl)
+
+def reset_schema_cache() -> None:
+    """Olvida las tablas ya aseguradas (p. ej. después de un DROP TABLE en un benchmark)."""
+    _schema_ready.clear()
+
+
+def is_transient(err: Exception) -> bool:
+    return isinstance(err, mysql.connector.Error) and err.errno in TRANSIENT_ERRNOS
+
+
+class BatchRetrier:
+    """
+    Envía los lotes de una transacción y la confirma; ante un error transitorio espera
+    (RETRY_BACKOFF, el doble en cada intento), reconecta si hace falta y repite todos los
+    lotes desde el último COMMIT, que se perdieron con el ROLLBACK. Los envíos tienen que
+    ser idempotentes (upserts), porque un COMMIT cortado puede haberse aplicado igual.
+    on_reconnect: funciones a llamar después de reconectar (p. ej. volver a preparar sentencias).
+    """
+
+    def __init__(self, conn, max_retries: int = MAX_RETRIES, backoff: float = RETRY_BACKOFF):
+        self.conn = conn
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.on_reconnect: List[Callable[[], None]] = []
+        self.pending: List[Callable[[], None]] = []
+        self.retries = 0
+
+    def _recover(self, err: Exception, attempt: int) -> None:
+        if not is_transient(err) or attempt == self.max_retries:
+            raise err
+        self.retries += 1
+        print(f"⚠️ Error transitorio de MySQL ({err.errno}); se repite la transacción "
+              f"({len(self.pending)} envíos desde el último COMMIT, intento {attempt + 1} de {self.max_retries}).")
+        time.sleep(self.backoff * 2 ** attempt)
+        try:
+            self.conn.rollback()
+        except mysql.connector.Error:
+            pass
+        if not self.conn.is_connected():
+            self.conn.reconnect(attempts=1)
+        for callback in self.on_reconnect:
+            callback()
+
+    def _run(self, sends: List[Callable[[], None]], commit: bool) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Primer intento: sólo lo nuevo; después de un ROLLBACK, todo lo pendiente
+                for send in (self.pending if attempt else sends):
+                    send()
+                if commit:
+                    self.conn.commit()
+                return
+            except mysql.connector.Error as err:
+                self._recover(err, attempt)
+
+    def send(self, send: Callable[[], None]) -> None:
+        """Ejecuta un envío dentro de la transacción en curso (no hace COMMIT)."""
+        self.pending.append(send)
+        self._run([send], commit=False)
+
+    def commit(self) -> None:
+        self._run([], commit=True)
+        self.pending = []
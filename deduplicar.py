@@ -0,0 +1,164 @@
+import os
+import argparse
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from instrumentacion import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ====================================================================
+# === CLIENTES REPETIDOS EN EL ARCHIVO UNIFICADO ===
+# ====================================================================
+# Un mismo Nro puede aparecer en los archivos de dos líderes o dos veces en el mismo
+# archivo. Antes de cargar, las filas de cada Nro se juntan en una sola según la política:
+#   ultimo: queda la última fila (los archivos se unifican en orden alfabético, así que
+#           es la del último archivo por nombre), como el upsert de pedidos en MySQL.
+#   sumar:  Cliente y Lider de la última fila; unidades y montos sumados.
+# Los Nro con distinto nombre o líder entre sus filas se informan como conflictos.
+# Las filas de un Nro sin repetir pasan sin tocar.
+
+DEDUP_POLICIES = ["ultimo", "sumar", "no"]
+
+UNIT_COLUMNS = ["U. Ent.", "Falt.", "U. Ped"]
+MONEY_COLUMNS = ["P.V.P.", "Ofertas", "Extras", "Costo Rev.", "Bonif."]
+
+
+def _parse_units(values: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    # Misma regla que clean_integer_series de 4_subir_pedidos.py (vacío = 0)
+    import pandas as pd
+
+    clean = values.astype(str).str.strip()
+    is_int = clean.str.fullmatch(r"[+-]?\d+")
+    parsed = pd.to_numeric(clean.where(is_int), errors="coerce").fillna(0)
+    return parsed, ~is_int & (clean != "")
+
+def _parse_money(values: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    # Misma regla que clean_monetary_series de 4_subir_pedidos.py ("$ 1.234,50")
+    import pandas as pd
+
+    clean = (values.astype(str).str.replace("$", "", regex=False).str.replace(" ", "", regex=False)
+             .str.replace(".", "", regex=False).str.replace(",", ".", regex=False).str.strip())
+    parsed = pd.to_numeric(clean, errors="coerce")
+    return parsed, parsed.isna() & (clean != "")
+
+def _format_units(value: float) -> str:
+    return str(int(value))
+
+def _format_money(value: float) -> str:
+    # Sin separador de miles: los scripts de carga lo leen igual que "$ 1.234,50"
+    import pandas as pd
+
+    return "" if pd.isna(value) else f"{value:.2f}".replace(".", ",")
+
+
+def find_conflicts(dups: "pd.DataFrame", nro: "pd.Series") -> "pd.DataFrame":
+    """Nro repetidos con distinto Cliente o Lider (sin distinguir mayúsculas ni espacios)."""
+    import pandas as pd
+
+    keys = pd.DataFrame({
+        "Nro": nro,
+        "cliente": dups["Cliente"].astype(str).str.strip().str.upper(),
+        "lider": dups["Lider"].astype(str).str.strip(),
+    })
+    distinct = keys.groupby("Nro", sort=False)[["cliente", "lider"]].nunique()
+    conflict_nros = distinct.index[(distinct["cliente"] > 1) | (distinct["lider"] > 1)]
+    if not len(conflict_nros):
+        return pd.DataFrame(columns=["Nro", "Filas", "Clientes", "Lideres"])
+
+    # Pocas filas: se arma el informe con un dict por Nro (más rápido que agg con funciones Python)
+    in_conflict = keys["Nro"].isin(conflict_nros)
+    report: Dict[str, Tuple[int, dict, dict]] = {}
+    for nro_value, cliente, lider in zip(keys["Nro"][in_conflict], dups["Cliente"][in_conflict],
+                                         keys["lider"][in_conflict]):
+        filas, clientes, lideres = report.get(nro_value) or (0, {}, {})
+        clientes[str(cliente).strip()] = None
+        lideres[lider] = None
+        report[nro_value] = (filas + 1, clientes, lideres)
+    return pd.DataFrame(
+        [(nro_value, filas, " | ".join(clientes), " | ".join(lideres))
+         for nro_value, (filas, clientes, lideres) in sorted(report.items())],
+        columns=["Nro", "Filas", "Clientes", "Lideres"],
+    )
+
+def dedupe_clientes(df: "pd.DataFrame", policy: str = "ultimo") -> Tuple["pd.DataFrame", "pd.DataFrame", Dict[str, int]]:
+    """
+    Junta las filas de cada Nro repetido según la política (ver arriba).
+    Devuelve (DataFrame sin Nro repetidos, conflictos, estadísticas). Cada Nro queda en la
+    posición de su última fila; las filas no repetidas no se modifican.
+    """
+    import pandas as pd
+
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Política de duplicados desconocida: {policy}")
+
+    nro = df["Nro"].astype(str).str.strip()
+    repeated = nro.duplicated(keep=False)
+    stats = {"filas": len(df), "nros_repetidos": 0, "filas_juntadas": 0, "conflictos": 0}
+    if policy == "no" or not repeated.any():
+        return df, find_conflicts(df.iloc[:0], nro.iloc[:0]), stats
+
+    dups = df[repeated]
+    dup_nro = nro[repeated]
+    conflicts = find_conflicts(dups, dup_nro)
+    keep = ~nro.duplicated(keep="last")
+    result = df[keep]
+
+    if policy == "sumar":
+        result = result.copy()
+        targets = (keep & repeated)[keep]  # última fila de cada Nro repetido
+        # Los Nro se pasan una sola vez a códigos enteros, que se usan para agrupar cada columna
+        codes, uniques = pd.factorize(dup_nro)
+        target_codes = pd.Index(uniques).get_indexer(nro[keep][targets])
+        for columns, parse, fmt in ((UNIT_COLUMNS, _parse_units, _format_units),
+                                    (MONEY_COLUMNS, _parse_money, _format_money)):
+            for col in columns:
+                if col not in df.columns:
+                    continue
+                parsed, invalid = parse(dups[col])
+                totals = parsed.groupby(codes).sum(min_count=1).map(fmt)
+                # Si alguna celda del Nro no se puede leer, queda esa celda para que la carga la informe
+                if invalid.any():
+                    bad = dups[col][invalid].groupby(codes[invalid.to_numpy()]).first()
+                    totals.loc[bad.index] = bad
+                result.loc[targets, col] = totals.to_numpy()[target_codes]
+
+    stats.update(nros_repetidos=int(dup_nro.nunique()), filas_juntadas=len(df) - len(result),
+                 conflictos=len(conflicts))
+    return result, conflicts, stats
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Agrega --dedup y --conflictos a la línea de comandos de un script de carga."""
+    parser.add_argument("--dedup", choices=DEDUP_POLICIES, default="ultimo",
+                        help="Qué hacer con un Nro repetido en el archivo unificado: 'ultimo' (por defecto) deja "
+                             "la última fila, 'sumar' suma unidades y montos, 'no' envía todas las filas.")
+    parser.add_argument("--conflictos", metavar="ARCHIVO",
+                        help="Guarda en un CSV los Nro repetidos con distinto nombre o líder.")
+
+
+def print_dedup_summary(stats: Dict[str, int], conflicts: "pd.DataFrame", policy: str) -> None:
+    if not stats["nros_repetidos"]:
+        return
+    print(f"⚠️ Clientes repetidos: {stats['nros_repetidos']} Nro en más de una fila; "
+          f"{stats['filas_juntadas']} filas juntadas (política '{policy}').")
+    if len(conflicts):
+        print(f"   Con distinto nombre o líder: {len(conflicts)}")
+        for row in conflicts.head(10).itertuples(index=False):
+            print(f"   Nro {row.Nro}: {row.Clientes} / líderes {row.Lideres}")
+        if len(conflicts) > 10:
+            print("   ...")
+
+def apply_dedup(df: "pd.DataFrame", policy: str = "ultimo",
+                conflicts_path: Optional[str] = None) -> "pd.DataFrame":
+    """Etapa de deduplicación de los scripts de carga: junta, informa y guarda los conflictos."""
+    if policy == "no":
+        return df
+    with metrics.stage("deduplicar", politica=policy) as etapa:
+        df, conflicts, stats = dedupe_clientes(df, policy)
+        etapa.update(filas=len(df), juntadas=stats["filas_juntadas"], conflictos=stats["conflictos"])
+    print_dedup_summary(stats, conflicts, policy)
+    if conflicts_path and len(conflicts):
+        conflicts.to_csv(conflicts_path, index=False, encoding="utf-8")
+        print(f"   Conflictos guardados en: {os.path.abspath(conflicts_path)}")
+    return df
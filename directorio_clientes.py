@@ -0,0 +1,128 @@
+import os
+import json
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# ====================================================================
+# === DIRECTORIO DE CLIENTES (compartido por los scripts de carga) ===
+# ====================================================================
+# Índice en memoria Nro → (Cliente, Lider) de la tabla clientes, cargado con un único
+# SELECT. 3_subir_clientes.py lo usa para saber qué clientes ya existen y
+# 4_subir_pedidos.py para marcar los pedidos de clientes que no están en la tabla.
+# Opcionalmente se guarda como snapshot local y se reutiliza mientras la tabla no cambie.
+
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".clientes_snapshot.json")
+SNAPSHOT_VERSION = 1
+
+# Tabla clientes (Nro es crucial que sea UNIQUE)
+SQL_CREATE_CLIENTES = """
+CREATE TABLE IF NOT EXISTS clientes (
+    idCliente INT AUTO_INCREMENT PRIMARY KEY,
+    Nro VARCHAR(6) UNIQUE COMMENT 'Nº Cliente',  -- Nro debe ser UNIQUE
+    Cliente VARCHAR(255) COMMENT 'Nombre de Cliente',
+    Lider VARCHAR(20) COMMENT 'Nº Líder'
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+# Huella de la tabla: las cargas sólo insertan clientes, así que si no cambian la cantidad
+# ni el último idCliente, la tabla es la misma que cuando se guardó el snapshot.
+SQL_FINGERPRINT = "SELECT COUNT(*), MAX(idCliente) FROM clientes"
+
+
+def table_fingerprint(cursor) -> list:
+    cursor.execute(SQL_FINGERPRINT)
+    count, max_id = cursor.fetchone()
+    return [int(count or 0), int(max_id or 0)]
+
+
+class ClientDirectory:
+    """Índice Nro → (Cliente, Lider) con búsqueda O(1)."""
+
+    def __init__(self, entries: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        self.entries: Dict[str, Tuple[str, Optional[str]]] = entries or {}
+        self.source = "vacío"
+
+    def __contains__(self, nro: str) -> bool:
+        return nro in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, nro: str) -> Optional[Tuple[str, Optional[str]]]:
+        return self.entries.get(nro)
+
+    def add(self, nro: str, cliente: str, lider: Optional[str]) -> None:
+        self.entries[nro] = (cliente, lider)
+
+    def add_many(self, rows: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        """Agrega filas (Nro, Cliente, Lider) ya confirmadas en la tabla."""
+        for nro, cliente, lider in rows:
+            self.entries[nro] = (cliente, lider)
+
+    def missing(self, nros: Iterable[str]) -> set:
+        """Nro que no están en el directorio (p. ej. pedidos de clientes no cargados)."""
+        return {nro for nro in nros if nro not in self.entries}
+
+    @classmethod
+    def load(cls, cursor) -> "ClientDirectory":
+        """Carga la tabla clientes completa con un solo SELECT."""
+        cursor.execute("SELECT Nro, Cliente, Lider FROM clientes")
+        directory = cls({str(nro): (cliente, lider) for nro, cliente, lider in cursor.fetchall()})
+        directory.source = "MySQL"
+        return directory
+
+    def save_snapshot(self, path: str, fingerprint: list) -> None:
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "huella": fingerprint,
+            "guardado": time.time(),
+            # Por columnas: el JSON se lee bastante más rápido que un objeto con una lista por cliente
+            "nro": list(self.entries),
+            "cliente": [cliente for cliente, _ in self.entries.values()],
+            "lider": [lider for _, lider in self.entries.values()],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, fingerprint: list) -> Optional["ClientDirectory"]:
+        """Devuelve el directorio guardado si sigue vigente (misma huella de la tabla), o None."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != SNAPSHOT_VERSION or data.get("huella") != fingerprint:
+            return None
+        directory = cls(dict(zip(data["nro"], zip(data["cliente"], data["lider"]))))
+        directory.source = "snapshot"
+        return directory
+
+
+def get_client_directory(cursor, snapshot_path: Optional[str] = None) -> ClientDirectory:
+    """
+    Directorio de clientes actual. Con snapshot_path, usa el snapshot local si la tabla no
+    cambió desde que se guardó (una consulta de COUNT/MAX en lugar de leer toda la tabla)
+    y si no, lee la tabla y actualiza el snapshot. Asegura la tabla clientes.
+    """
+    # Aquí y no arriba: importar el directorio (p. ej. con --dry-run) no carga el driver de MySQL
+    from conexion_mysql import ensure_table
+
+    ensure_table(cursor, SQL_CREATE_CLIENTES)
+    if snapshot_path:
+        fingerprint = table_fingerprint(cursor)
+        directory = ClientDirectory.load_snapshot(snapshot_path, fingerprint)
+        if directory is not None:
+            return directory
+        directory = ClientDirectory.load(cursor)
+        directory.save_snapshot(snapshot_path, fingerprint)
+        return directory
+    return ClientDirectory.load(cursor)
+
+
+def refresh_snapshot(cursor, directory: ClientDirectory, snapshot_path: Optional[str]) -> None:
+    """Guarda el directorio (ya con los clientes recién insertados y confirmados) con la huella actual."""
+    if snapshot_path:
+        directory.save_snapshot(snapshot_path, table_fingerprint(cursor))
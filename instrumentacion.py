@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import argparse
+import threading
+import contextlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# ====================================================================
+# === MÉTRICAS DE EJECUCIÓN (compartidas por todos los scripts) ===
+# ====================================================================
+# Cada etapa (búsqueda de archivos, process_file, concat, escritura, conexión, SELECT,
+# INSERT, COMMIT...) registra su duración, las filas procesadas y el pico de memoria
+# del proceso. Los registros se agregan como una línea JSON en METRICS_LOG para poder
+# comparar campañas y detectar regresiones.
+
+METRICS_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline_metricas.jsonl")
+PROFILE_FILE = "perfil.prof"
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso (MB), o None si no se puede medir."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil informa el pico del working set, si está instalado
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return round(peak / 2**20 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class Metrics:
+    """Registro de etapas de una ejecución. Sin log configurado sólo se guardan en memoria."""
+
+    def __init__(self):
+        self.script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+        self.run_id = uuid.uuid4().hex[:12]
+        self.log_path: Optional[str] = None
+        self.records: List[Dict[str, Any]] = []
+        # La carga --batch de 4_subir_pedidos registra etapas desde varios hilos
+        self._lock = threading.Lock()
+
+    def configure(self, log_path: Optional[str], script: Optional[str] = None) -> None:
+        self.log_path = log_path
+        if script:
+            self.script = script
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **fields):
+        """
+        Mide una etapa. Devuelve un diccionario donde quien llama puede agregar datos
+        (p. ej. etapa["filas"] = len(df)) que se guardan junto con la duración.
+        """
+        record: Dict[str, Any] = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.record(name, time.perf_counter() - start, **record)
+
+    def record(self, name: str, seconds: float, **fields) -> None:
+        """Registra una etapa medida por fuera (p. ej. en un proceso del pool)."""
+        entry = {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "script": self.script,
+            "corrida": self.run_id,
+            "etapa": name,
+            "segundos": round(seconds, 6),
+            **fields,
+            "pico_mb": peak_memory_mb(),
+        }
+        with self._lock:
+            self.records.append(entry)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# Instancia única: los módulos la importan y registran sus etapas sin pasarla como parámetro
+metrics = Metrics()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Agrega --metrics-log, --no-metrics y --profile a la línea de comandos de un script."""
+    parser.add_argument("--metrics-log", default=METRICS_LOG,
+                        help=f"Archivo JSON-lines donde se agregan las métricas por etapa (por defecto {METRICS_LOG}).")
+    parser.add_argument("--no-metrics", action="store_true", help="No guarda las métricas por etapa.")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_FILE, default=None, metavar="ARCHIVO",
+                        help=f"Ejecuta bajo cProfile y guarda el perfil (por defecto {PROFILE_FILE}).")
+
+def _dump_profile(profiler, path: str) -> None:
+    import pstats
+    profiler.disable()
+    profiler.dump_stats(path)
+    print(f"\n✅ Perfil cProfile guardado en: {os.path.abspath(path)} (funciones con más tiempo acumulado:)")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+def _report_metrics() -> None:
+    if metrics.log_path and metrics.records:
+        print(f"Métricas: {len(metrics.records)} etapas registradas en {metrics.log_path}")
+
+def setup(args: argparse.Namespace, script: str) -> None:
+    """
+    Configura las métricas según los argumentos de add_arguments y, con --profile,
+    perfila el resto de la ejecución (el perfil se guarda al terminar el script).
+    """
+    metrics.configure(None if args.no_metrics else args.metrics_log, script)
+    atexit.register(_report_metrics)
+    if args.profile:
+        # cProfile y pstats sólo se importan con --profile (se notan en el arranque)
+        import cProfile
+        profiler = cProfile.Profile()
+        # atexit ejecuta en orden inverso: primero se guarda el perfil, después el aviso de métricas
+        atexit.register(_dump_profile, profiler, args.profile)
+        profiler.enable()
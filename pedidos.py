@@ -0,0 +1,60 @@
+import os
+import sys
+import argparse
+import importlib
+from typing import List, Optional
+
+# ====================================================================
+# === LÍNEA DE COMANDOS ÚNICA ===
+# ====================================================================
+# python pedidos.py <subcomando> [opciones]. Cada subcomando importa su script (y con él
+# pandas, mysql.connector, openpyxl...) recién cuando se usa: la ayuda, un error en los
+# argumentos o la conversión no pagan el arranque de las librerías que no necesitan.
+# Las opciones de cada subcomando son las de su script (python pedidos.py load-orders --help),
+# incluida --dry-run, que verifica todo sin escribir la salida ni conectarse a MySQL.
+# Los scripts numerados se pueden seguir ejecutando por separado.
+
+SUBCOMMANDS = {
+    "convert": ("1_xls_xlsx", "Convierte los .xls de la campaña a .xlsx (paso opcional, sólo para archivar)."),
+    "unify": ("2_unificar_excels", "Unifica los archivos de los líderes en <carpeta>_Unificado."),
+    "load-clients": ("3_subir_clientes", "Carga en MySQL los clientes nuevos del archivo unificado."),
+    "load-orders": ("4_subir_pedidos", "Carga en MySQL los pedidos de la campaña del archivo unificado."),
+}
+
+ENVIRONMENT_HELP = """\
+Variables de entorno (los argumentos tienen prioridad):
+  PEDIDOS_CARPETA     carpeta de la campaña (convert, unify)
+  PEDIDOS_UNIFICADO   archivo unificado (load-clients, load-orders); si no está definida
+                      se usa <PEDIDOS_CARPETA>_Unificado.xlsx
+  MYSQL_HOST, MYSQL_PORT, MYSQL_DATABASE, MYSQL_USER, MYSQL_PWD
+                      conexión a MySQL; el usuario y la contraseña que falten se piden
+
+Ejemplos:
+  python pedidos.py unify C:\\...\\Minipedido\\C1025 --dry-run
+  python pedidos.py load-orders C:\\...\\Minipedido\\C1025_Unificado.xlsx --diff
+"""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Devuelve el código de salida del script del subcomando (0 si salió bien)."""
+    parser = argparse.ArgumentParser(prog="pedidos.py", epilog=ENVIRONMENT_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description="Procesa y carga los pedidos de una campaña.")
+    subparsers = parser.add_subparsers(dest="subcomando", required=True, metavar="SUBCOMANDO")
+    for name, (_, help_text) in SUBCOMMANDS.items():
+        # Sin ayuda propia: "--help" y el resto de las opciones las interpreta el script
+        subparsers.add_parser(name, help=help_text, description=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    if (args.subcomando in ("load-clients", "load-orders")
+            and not os.environ.get("PEDIDOS_UNIFICADO") and os.environ.get("PEDIDOS_CARPETA")):
+        # Se lee al importar el script, como archivo_entrada
+        os.environ["PEDIDOS_UNIFICADO"] = f"{os.path.normpath(os.environ['PEDIDOS_CARPETA'])}_Unificado.xlsx"
+
+    module_name, _ = SUBCOMMANDS[args.subcomando]
+    module = importlib.import_module(module_name)
+    return module.main(rest, prog=f"{parser.prog} {args.subcomando}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import argparse
+import importlib
+import contextlib
+from typing import List, Optional, Tuple
+
+import mysql.connector
+
+import deduplicar
+import instrumentacion
+from archivo_unificado import OUTPUT_FORMATS, write_unified
+from carga_masiva import ENGINES
+from conexion_mysql import ask_db_config, connect, create_pool
+from directorio_clientes import SNAPSHOT_FILE
+from instrumentacion import metrics
+
+import carga_concurrente
+
+# Los scripts numerados no se pueden importar con "import", se cargan por nombre
+conversor = importlib.import_module("1_xls_xlsx")
+unificar = importlib.import_module("2_unificar_excels")
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+# ====================================================================
+# === PIPELINE COMPLETO DE UNA CAMPAÑA (pasos 1 a 4 en un solo proceso) ===
+# ====================================================================
+# El DataFrame unificado pasa en memoria de la unificación a las dos cargas,
+# que comparten una única conexión a MySQL y el directorio de clientes.
+
+
+class StageTimer:
+    """Acumula el tiempo de cada etapa para el resumen final (y la registra en las métricas)."""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            with metrics.stage(name):
+                yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def report(self) -> None:
+        total = sum(seconds for _, seconds in self.stages)
+        print("\n--- Tiempos por etapa ---")
+        for name, seconds in self.stages:
+            share = seconds / total * 100 if total else 0
+            print(f"   {name:<28} {seconds:8.2f} s  ({share:4.1f}%)")
+        print(f"   {'Total':<28} {total:8.2f} s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Devuelve el código de salida: 0 si la campaña se cargó completa, 1 si algún paso falló."""
+    parser = argparse.ArgumentParser(description="Ejecuta la conversión, unificación y carga de una campaña.")
+    parser.add_argument("carpeta", help="Carpeta de la campaña (ej. C:\\...\\Minipedido\\C1025)")
+    parser.add_argument("--convert", action="store_true",
+                        help="Convierte también los .xls a .xlsx (sólo para archivar; la unificación lee los .xls).")
+    parser.add_argument("--backend", choices=["auto", "com", "python"], default="auto",
+                        help="Motor de conversión para --convert.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos en paralelo para la conversión y la unificación (por defecto, en la "
+                             "conversión los de 1_xls_xlsx.py y en la unificación uno solo).")
+    parser.add_argument("--no-cache", action="store_true", help="No usa la caché de unificación.")
+    parser.add_argument("--formats", nargs="*", choices=OUTPUT_FORMATS, default=[],
+                        help="Guarda además el archivo unificado en estos formatos (por defecto ninguno).")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Carga de pedidos por lotes de N filas (ver 4_subir_pedidos.py).")
+    parser.add_argument("--commit-every", type=int, default=subir_pedidos.COMMIT_EVERY,
+                        help="Lotes por COMMIT en la carga de pedidos por lotes.")
+    parser.add_argument("--engine", choices=ENGINES, default="executemany",
+                        help="Motor de carga de clientes y pedidos (infile = LOAD DATA LOCAL INFILE, "
+                             "prepared = INSERT preparado en el servidor).")
+    parser.add_argument("--skip-orphans", action="store_true",
+                        help="No carga los pedidos de clientes que no están en la tabla clientes.")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE, default=None, metavar="ARCHIVO",
+                        help="Reutiliza el snapshot local del directorio de clientes (ver directorio_clientes.py).")
+    parser.add_argument("--no-rollups", action="store_true",
+                        help="No actualiza los resúmenes por líder y por campaña (ver resumenes.py).")
+    parser.add_argument("--concurrent", type=int, default=0, metavar="N",
+                        help="Carga clientes y pedidos a la vez en N conexiones, un lote por transacción "
+                             "(ver carga_concurrente.py). Por defecto se cargan uno después del otro.")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Con --concurrent, máximo de lotes en vuelo (por defecto 2 x N).")
+    deduplicar.add_arguments(parser)
+    instrumentacion.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentacion.setup(args, "pipeline_campania")
+    if args.concurrent and args.engine != "executemany":
+        parser.error(f"--concurrent envía los lotes con executemany; no se puede usar junto con --engine {args.engine}")
+
+    folder = os.path.normpath(args.carpeta)
+    campania = subir_pedidos.extract_campania(folder)
+    if not campania:
+        print(f"❌ Error: No se pudo determinar la Campaña (CmmAA) del nombre de la carpeta '{folder}'.")
+        return 1
+
+    # Se piden las credenciales al inicio para no interrumpir el proceso a mitad de camino
+    db_config = ask_db_config()
+    if args.engine == "infile":
+        db_config["allow_local_infile"] = True
+    timer = StageTimer()
+    try:
+        status = run_pipeline(args, folder, campania, db_config, timer)
+    except (OSError, ValueError) as e:
+        # Archivo bloqueado o inaccesible, columnas o datos que no se pueden leer...
+        print(f"\n❌ Error inesperado: {type(e).__name__}: {e}")
+        status = 1
+    timer.report()
+    return status
+
+
+def run_pipeline(args: argparse.Namespace, folder: str, campania: str, db_config: dict,
+                 timer: StageTimer) -> int:
+    """Pasos 1 a 4 de la campaña; devuelve el código de salida de main."""
+    status = 0
+    # --- Paso 1 (opcional): conversión .xls → .xlsx ---
+    if args.convert:
+        with timer.stage("1. Conversión .xls → .xlsx"):
+            results = conversor.convert_folder(folder, folder, args.backend, args.workers)
+        if results:
+            conversor.print_summary(results, timer.stages[-1][1])
+        # Sólo es para archivar: la unificación lee los .xls aunque alguno no se haya convertido
+        if any(result.status == "fallido" for result in results):
+            status = 1
+
+    # --- Paso 2: unificación en memoria ---
+    with timer.stage("2. Unificación"):
+        df_unified = unificar.unify_campaign(folder, args.workers or 1, not args.no_cache)
+    if df_unified is None:
+        return 1
+    # Mismo contenido que se obtendría al leer el archivo unificado (celdas vacías como "")
+    df_unified = df_unified.fillna("")
+    print(f"   Campaña {campania}: {len(df_unified)} registros de clientes unificados.")
+
+    missing_cols = [col for col in ["Nro", "Cliente", "Lider"] + subir_pedidos.EXCEL_COLUMNS_TO_EXTRACT
+                    if col not in df_unified.columns]
+    if missing_cols:
+        print(f"❌ Error: La unificación NO generó las siguientes columnas: {missing_cols}")
+        return 1
+
+    if args.formats:
+        with timer.stage("2b. Guardar unificado"):
+            for path in write_unified(df_unified, f"{folder}_Unificado.xlsx", args.formats):
+                print(f"   Archivo guardado en: {os.path.abspath(path)}")
+
+    # El archivo unificado queda como en los archivos de los líderes; a las cargas les llega
+    # un solo registro por Nro (ver deduplicar.py)
+    with timer.stage("2c. Clientes repetidos"):
+        df_unified = deduplicar.apply_dedup(df_unified, args.dedup, args.conflictos)
+
+    if args.concurrent:
+        # --- Pasos 3 y 4 a la vez sobre un pool de conexiones ---
+        try:
+            pool = create_pool(db_config, args.concurrent)
+            print(f"✅ Pool de {args.concurrent} conexiones a MySQL establecido.")
+            with timer.stage("3+4. Carga concurrente"):
+                stats = carga_concurrente.load_concurrent(pool, df_unified, campania, args.concurrent,
+                                                          args.max_pending,
+                                                          args.chunk_size or subir_pedidos.CHUNK_SIZE,
+                                                          skip_orphans=args.skip_orphans,
+                                                          snapshot_path=args.snapshot,
+                                                          rollups=not args.no_rollups)
+            carga_concurrente.print_concurrent_summary(stats)
+        except mysql.connector.Error as err:
+            print(f"\n❌ Error de base de datos o conexión: {err}")
+            return 1
+        return 1 if stats["errores"] else status
+
+    # --- Pasos 3 y 4: carga a MySQL con una única conexión ---
+    conn = None
+    try:
+        with timer.stage("Conexión MySQL"):
+            conn = connect(db_config)
+        print("✅ Conexión a MySQL establecida con éxito.")
+
+        with timer.stage("Directorio de clientes"):
+            directory = subir_pedidos.load_directory(conn, args.snapshot)
+
+        with timer.stage("3. Carga de clientes"):
+            subir_clientes.load_clientes(conn, df_unified, engine=args.engine,
+                                         directory=directory, snapshot_path=args.snapshot)
+
+        # Los clientes recién insertados ya están en el directorio: sólo quedan huérfanos los
+        # pedidos sin cliente en el archivo ni en la tabla
+        with timer.stage("4. Carga de pedidos"):
+            subir_pedidos.load_pedidos(conn, df_unified, campania, args.chunk_size, args.commit_every,
+                                       engine=args.engine, directory=directory,
+                                       skip_orphans=args.skip_orphans, rollups=not args.no_rollups)
+
+    except mysql.connector.Error as err:
+        print(f"\n❌ Error de base de datos o conexión: {err}")
+        if conn and conn.is_connected():
+            conn.rollback()
+        return 1
+    except Exception:
+        # Lo enviado del paso que falló no se confirma; main informa el error
+        if conn and conn.is_connected():
+            conn.rollback()
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+            print("Conexión a MySQL cerrada.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
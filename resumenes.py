@@ -0,0 +1,106 @@
+from typing import List, Optional
+
+from directorio_clientes import SQL_CREATE_CLIENTES
+from instrumentacion import metrics
+
+# ====================================================================
+# === RESÚMENES POR CAMPAÑA (tablas precalculadas para los informes) ===
+# ====================================================================
+# pedidos_lider guarda los totales de cada campaña por líder y pedidos_campania los de
+# cada campaña. Se recalculan sólo para la campaña que se está cargando, en la misma
+# transacción que el último lote de pedidos (antes de su COMMIT), así los informes no
+# tienen que recorrer todo el historial de pedidos ni unirlo con clientes. Si la carga
+# confirma en varios COMMIT (--commit-every) y se corta, los resúmenes quedan como estaban
+# hasta que se vuelva a correr (--resume) o se usa --rebuild-rollups.
+# Las tablas se crean antes de la carga (ensure_rollup_tables), nunca durante el recálculo:
+# un CREATE TABLE hace COMMIT implícito y partiría la transacción.
+# El líder de cada pedido es el del cliente en la tabla clientes al momento de la carga;
+# los pedidos de clientes que no están en clientes se agrupan con Lider = ''.
+
+SQL_CREATE_PEDIDOS_LIDER = """
+CREATE TABLE IF NOT EXISTS pedidos_lider (
+    Campaña VARCHAR(5) NOT NULL,
+    Lider VARCHAR(20) NOT NULL COMMENT 'Nº Líder (vacío = clientes sin líder)',
+    Clientes INT NOT NULL,
+    Unidades INT NULL,
+    Faltantes INT NULL,
+    PVP DECIMAL(14,2) NULL,
+    Costo_Rev DECIMAL(14,2) NULL,
+    actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (Campaña, Lider),
+    KEY idx_lider (Lider)  -- Evolución de un líder a lo largo de las campañas
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+SQL_CREATE_PEDIDOS_CAMPANIA = """
+CREATE TABLE IF NOT EXISTS pedidos_campania (
+    Campaña VARCHAR(5) NOT NULL PRIMARY KEY,
+    Lideres INT NOT NULL,
+    Clientes INT NOT NULL,
+    Unidades INT NULL,
+    Faltantes INT NULL,
+    PVP DECIMAL(14,2) NULL,
+    Costo_Rev DECIMAL(14,2) NULL,
+    actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+SQL_DELETE_PEDIDOS_LIDER = "DELETE FROM pedidos_lider WHERE Campaña = %s"
+SQL_DELETE_PEDIDOS_CAMPANIA = "DELETE FROM pedidos_campania WHERE Campaña = %s"
+
+# Sólo las filas de la campaña (prefijo de uk_campana_nro) unidas a clientes por Nro (UNIQUE)
+SQL_RESUMEN_LIDER = """
+INSERT INTO pedidos_lider (Campaña, Lider, Clientes, Unidades, Faltantes, PVP, Costo_Rev)
+SELECT p.Campaña, COALESCE(c.Lider, ''), COUNT(*),
+       SUM(p.Unidades), SUM(p.Faltantes), SUM(p.PVP), SUM(p.Costo_Rev)
+FROM pedidos p
+LEFT JOIN clientes c ON c.Nro = p.Nro
+WHERE p.Campaña = %s
+GROUP BY p.Campaña, COALESCE(c.Lider, '')
+"""
+
+# El total de la campaña sale del resumen por líder, sin volver a leer pedidos
+SQL_RESUMEN_CAMPANIA = """
+INSERT INTO pedidos_campania (Campaña, Lideres, Clientes, Unidades, Faltantes, PVP, Costo_Rev)
+SELECT Campaña, SUM(CASE WHEN Lider <> '' THEN 1 ELSE 0 END), SUM(Clientes),
+       SUM(Unidades), SUM(Faltantes), SUM(PVP), SUM(Costo_Rev)
+FROM pedidos_lider
+WHERE Campaña = %s
+GROUP BY Campaña
+"""
+
+
+def ensure_rollup_tables(cursor) -> None:
+    """Crea las tablas de resúmenes; se llama antes de abrir la transacción de la carga."""
+    from conexion_mysql import ensure_table  # ver get_client_directory
+
+    # El resumen por líder une con clientes: en una base nueva puede no existir todavía
+    ensure_table(cursor, SQL_CREATE_CLIENTES)
+    ensure_table(cursor, SQL_CREATE_PEDIDOS_LIDER)
+    ensure_table(cursor, SQL_CREATE_PEDIDOS_CAMPANIA)
+
+
+def refresh_rollups(cursor, campania: str) -> Optional[int]:
+    """
+    Recalcula los resúmenes de una campaña (no hace COMMIT: queda en la transacción de
+    quien llama). Las tablas tienen que existir (ver ensure_rollup_tables).
+    Devuelve la cantidad de líderes de la campaña.
+    """
+    with metrics.stage("resumenes", campania=campania) as etapa:
+        cursor.execute(SQL_DELETE_PEDIDOS_LIDER, (campania,))
+        cursor.execute(SQL_DELETE_PEDIDOS_CAMPANIA, (campania,))
+        cursor.execute(SQL_RESUMEN_LIDER, (campania,))
+        lideres = cursor.rowcount
+        cursor.execute(SQL_RESUMEN_CAMPANIA, (campania,))
+        etapa["filas"] = lideres
+    return lideres
+
+
+def rebuild_rollups(cursor) -> List[str]:
+    """Recalcula los resúmenes de todas las campañas cargadas (p. ej. la primera vez)."""
+    ensure_rollup_tables(cursor)
+    cursor.execute("SELECT DISTINCT Campaña FROM pedidos")
+    campanias = sorted(campania for (campania,) in cursor.fetchall())
+    for campania in campanias:
+        refresh_rollups(cursor, campania)
+    return campanias
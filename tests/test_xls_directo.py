@@ -0,0 +1,37 @@
+"""
+process_file tiene que devolver lo mismo desde el .xls original que desde el .xlsx que
+genera 1_xls_xlsx.py (ver benchmarks/bench_xls_directo.py para la medición de tiempos).
+
+Uso: python -m pytest tests
+"""
+import os
+import sys
+import importlib
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+pytest.importorskip("xlwt")  # sólo para escribir los .xls de prueba
+pytest.importorskip("xlrd")
+
+conversor = importlib.import_module("1_xls_xlsx")
+unificar = importlib.import_module("2_unificar_excels")
+from generar_campania import generate_leader_workbook
+
+
+@pytest.mark.parametrize("header_variants", [False, True])
+def test_process_file_xls_igual_que_xlsx(tmp_path, header_variants):
+    xls_path = str(tmp_path / "Lider_500100.xls")
+    generate_leader_workbook(xls_path, "500100", 25, seed=3, header_variants=header_variants)
+    xlsx_path = conversor.xlsx_path_for(xls_path, str(tmp_path))
+    conversor.convert_xls_to_xlsx_python(xls_path, xlsx_path)
+
+    from_xls = unificar.process_file(xls_path)
+    from_xlsx = unificar.process_file(xlsx_path)
+
+    assert from_xls is not None and len(from_xls) == 25
+    pd.testing.assert_frame_equal(from_xls, from_xlsx)
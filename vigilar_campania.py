@@ -0,0 +1,435 @@
+import os
+import time
+import argparse
+import importlib
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import pandas as pd
+import mysql.connector
+
+import deduplicar
+import instrumentacion
+from archivo_unificado import COLUMNS_ORDER, OUTPUT_FORMATS, write_unified
+from conexion_mysql import ask_db_config, connect, release
+from directorio_clientes import SNAPSHOT_FILE, ClientDirectory
+from instrumentacion import metrics
+
+# Los scripts numerados no se pueden importar con "import", se cargan por nombre
+conversor = importlib.import_module("1_xls_xlsx")
+unificar = importlib.import_module("2_unificar_excels")
+subir_clientes = importlib.import_module("3_subir_clientes")
+subir_pedidos = importlib.import_module("4_subir_pedidos")
+
+# ====================================================================
+# === VIGILANCIA DE LA CARPETA DE UNA CAMPAÑA ===
+# ====================================================================
+# Proceso que queda corriendo sobre la carpeta CmmAA: cada --intervalo segundos lista los
+# archivos de líder (sin los temporales '~$' de Excel) y, cuando uno nuevo o modificado
+# no cambia de tamaño ni de fecha durante --debounce segundos (terminó de descargarse),
+# procesa sólo ese archivo: conversión opcional, process_file, archivo unificado y carga
+# de los clientes y pedidos de ese líder. Los demás líderes no se vuelven a leer: su
+# resultado queda en memoria (y en la caché de unificación para el próximo arranque).
+
+# Segundos entre dos revisiones de la carpeta
+POLL_INTERVAL = 2.0
+# Segundos que un archivo debe quedar sin cambios antes de procesarlo
+DEBOUNCE_SECONDS = 3.0
+# Formatos del archivo unificado que se reescriben en cada cambio (el .xlsx tarda demasiado)
+WATCH_FORMATS = ["parquet"]
+
+REQUIRED_COLUMNS = ["Nro", "Cliente", "Lider"] + subir_pedidos.EXCEL_COLUMNS_TO_EXTRACT
+
+
+class FileSignature(NamedTuple):
+    size: int
+    mtime: float
+
+
+def file_signature(path: str) -> Optional[FileSignature]:
+    """Tamaño y fecha de modificación, o None si el archivo ya no está (o está bloqueado)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return FileSignature(stat.st_size, stat.st_mtime)
+
+
+class CampaignWatcher:
+    """
+    Estado de la vigilancia de una carpeta: firma de cada archivo ya procesado, cambios
+    pendientes (esperando el debounce) y el resultado de process_file de cada líder.
+    connect() abre la conexión a MySQL; se reabre en el próximo archivo si se pierde.
+    """
+
+    def __init__(self, folder: str, campania: str, connect: Callable, output_file: str,
+                 formats: List[str] = WATCH_FORMATS, debounce: float = DEBOUNCE_SECONDS,
+                 backend=None, source: str = "auto", use_cache: bool = True,
+                 snapshot_path: Optional[str] = None, skip_orphans: bool = False,
+                 rollups: bool = True, dedup: str = "ultimo", conflicts_path: Optional[str] = None):
+        self.folder = folder
+        self.campania = campania
+        self.connect = connect
+        self.output_file = output_file
+        self.formats = formats
+        self.debounce = debounce
+        self.backend = backend
+        self.source = source
+        self.cache = unificar.UnificationCache(os.path.join(folder, unificar.CACHE_DIR_NAME)) if use_cache else None
+        self.snapshot_path = snapshot_path
+        self.skip_orphans = skip_orphans
+        self.rollups = rollups
+        self.dedup = dedup
+        self.conflicts_path = conflicts_path
+
+        self.conn = None
+        self.directory: Optional[ClientDirectory] = None
+        self.done: Dict[str, FileSignature] = {}
+        self.pending: Dict[str, Tuple[FileSignature, float]] = {}
+        self.frames: Dict[str, pd.DataFrame] = {}
+        # Nro → archivos de líder en los que aparece, para juntar un Nro repetido sin recorrer la campaña
+        self.nro_paths: Dict[str, Set[str]] = {}
+        self.processed = 0
+        self.failed = 0
+
+    # --- Detección de cambios ---
+
+    def scan(self, now: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """
+        Revisa la carpeta y devuelve (archivos listos para procesar, archivos borrados).
+        Un archivo está listo cuando su firma cambió respecto de la última procesada y
+        no volvió a cambiar en los últimos `debounce` segundos.
+        """
+        now = time.monotonic() if now is None else now
+        present = unificar.find_leader_files(self.folder, self.source)
+        ready = []
+        for path in present:
+            signature = file_signature(path)
+            if signature is None or self.done.get(path) == signature:
+                self.pending.pop(path, None)
+                continue
+            seen = self.pending.get(path)
+            if seen is None or seen[0] != signature:
+                self.pending[path] = (signature, now)
+            elif now - seen[1] >= self.debounce:
+                ready.append(path)
+
+        removed = [path for path in list(self.done) if path not in present]
+        for path in removed:
+            del self.done[path]
+            self._drop_frame(path)
+        return ready, removed
+
+    def mark_existing(self, load: bool = False) -> int:
+        """
+        Arma el unificado con los archivos que ya están en la carpeta (desde la caché si no
+        cambiaron). Con load=False se toman como ya cargados; con load=True quedan listos
+        para cargarse en la primera revisión, sin esperar el debounce.
+        """
+        file_list = unificar.find_leader_files(self.folder, self.source)
+        for path, df in unificar.iter_process_files(file_list, 1, self.cache):
+            signature = file_signature(path)
+            if signature is None:
+                continue
+            if load:
+                self.pending[path] = (signature, float("-inf"))
+            else:
+                self.done[path] = signature
+            if df is not None:
+                self._set_frame(path, df)
+        return len(file_list)
+
+    def _set_frame(self, path: str, df: pd.DataFrame) -> None:
+        self._drop_frame(path)
+        self.frames[path] = df
+        for nro in df["Nro"].astype(str).str.strip().unique() if "Nro" in df.columns else ():
+            self.nro_paths.setdefault(nro, set()).add(path)
+
+    def _drop_frame(self, path: str) -> None:
+        df = self.frames.pop(path, None)
+        if df is None or "Nro" not in df.columns:
+            return
+        for nro in df["Nro"].astype(str).str.strip().unique():
+            paths = self.nro_paths.get(nro)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.nro_paths[nro]
+
+    # --- Procesamiento de un archivo ---
+
+    def _convert(self, path: str) -> None:
+        """Conversión .xls → .xlsx de este archivo solo (para archivar, como 1_xls_xlsx.py)."""
+        if self.backend is None or not path.lower().endswith(".xls"):
+            return
+        xlsx_path = conversor.xlsx_path_for(path, self.folder)
+        if conversor.is_up_to_date(path, xlsx_path):
+            return
+        for result in self.backend.convert_many([(path, xlsx_path)]):
+            metrics.record("convertir", result.seconds, archivo=os.path.basename(path),
+                           estado=result.status, motor=self.backend.name)
+
+    def _ensure_connection(self):
+        if self.conn is None:
+            with metrics.stage("conexion_mysql"):
+                self.conn = self.connect()
+            print("✅ Conexión a MySQL establecida con éxito.")
+        if self.directory is None:
+            self.directory = subir_pedidos.load_directory(self.conn, self.snapshot_path)
+        return self.conn
+
+    def _drop_connection(self) -> None:
+        if self.conn is not None:
+            # Con un pool de una conexión, no devolverla dejaría sin conexión al próximo archivo
+            release(self.conn)
+        self.conn = None
+
+    def _rollback(self) -> None:
+        """Descarta lo enviado del archivo que falló; si la conexión no responde, se cierra."""
+        if self.conn is None:
+            return
+        try:
+            self.conn.rollback()
+        except Exception:
+            self._drop_connection()
+
+    def leader_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Filas a cargar para un líder: las de sus Nro en el unificado sin repetidos, así un
+        cliente que también está en otro líder se carga según la política de --dedup.
+        Cada Nro se junta sólo con sus propias filas, así que alcanza con las de los archivos
+        que comparten algún Nro con este líder (no se vuelve a recorrer toda la campaña).
+        """
+        if self.dedup == "no":
+            return df
+        nros = set(df["Nro"].astype(str).str.strip())
+        rows = self.unified_frame(nros).fillna("")
+        # Los conflictos de toda la campaña se guardan al escribir el unificado (write_output)
+        return deduplicar.apply_dedup(rows, self.dedup)
+
+    def upload(self, df: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """Carga los clientes nuevos y hace el upsert de los pedidos de un solo líder."""
+        conn = self._ensure_connection()
+        subir_clientes.load_clientes(conn, df, directory=self.directory, snapshot_path=self.snapshot_path)
+        return subir_pedidos.load_pedidos(conn, df, self.campania, directory=self.directory,
+                                          skip_orphans=self.skip_orphans, rollups=self.rollups,
+                                          verbose=False)
+
+    def process(self, path: str) -> bool:
+        """
+        Procesa un archivo listo. Devuelve False si la carga falló por la base de datos o porque
+        el archivo no se pudo leer: queda pendiente y se reintenta en la próxima revisión.
+        Cualquier otro error se informa y el archivo se vuelve a procesar cuando cambie; la
+        vigilancia sigue con los demás.
+        """
+        name = os.path.basename(path)
+        signature = file_signature(path)
+        if signature is None:
+            self.pending.pop(path, None)
+            return True
+        start = time.perf_counter()
+
+        try:
+            return self._process(path, name, signature, start)
+        except mysql.connector.Error as err:
+            print(f"\n❌ Error de base de datos o conexión con {name}: {err}")
+            print("   Se vuelve a intentar en la próxima revisión.")
+            self._drop_connection()
+            self.done.pop(path, None)
+            return False
+        except OSError as e:
+            # Archivo todavía bloqueado o a medio escribir: queda pendiente y se espera otro debounce
+            print(f"   ⚠️ {name}: no se pudo leer ({e}); se vuelve a intentar en la próxima revisión.")
+            self.done.pop(path, None)
+            self.pending[path] = (signature, time.monotonic())
+            return False
+        except Exception as e:
+            # Datos que no se pueden cargar, error de conversión...: no se reintenta hasta que el archivo cambie
+            self.failed += 1
+            print(f"   ❌ {name}: {type(e).__name__}: {e}; se vuelve a intentar cuando el archivo cambie.")
+            self._rollback()
+            self.done[path] = signature
+            self.pending.pop(path, None)
+            return True
+
+    def _process(self, path: str, name: str, signature: FileSignature, start: float) -> bool:
+        with metrics.stage("vigilar_archivo", archivo=name) as etapa:
+            self._convert(path)
+            # Sólo este archivo: iter_process_files lo toma de la caché si no cambió y si no la actualiza.
+            # Se consume entero para que guarde el índice de la caché al terminar (su finally)
+            [(_, df)] = list(unificar.iter_process_files([path], 1, self.cache))
+            self.done[path] = signature
+            self.pending.pop(path, None)
+            if df is None:
+                self._drop_frame(path)
+                self.failed += 1
+                print(f"   ⚠️ {name}: no se pudo extraer información; se vuelve a intentar cuando cambie.")
+                return True
+
+            self._set_frame(path, df)
+            df = df.reindex(columns=[col for col in COLUMNS_ORDER if col in df.columns]).fillna("")
+            missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+            if missing_cols:
+                self.failed += 1
+                print(f"   ❌ {name}: faltan las columnas {missing_cols}; no se carga en MySQL.")
+                return True
+
+            stats = self.upload(self.leader_rows(df))
+
+            etapa["filas"] = len(df)
+            self.processed += 1
+            latency = time.time() - signature.mtime
+            if stats:
+                print(f"   ✅ {name}: {len(df)} clientes, pedidos {int(stats['insertados'])} nuevos / "
+                      f"{int(stats['actualizados'])} actualizados, {stats['huerfanos']} huérfanos "
+                      f"({time.perf_counter() - start:.2f} s; {latency:.1f} s desde la descarga)")
+            else:
+                print(f"   ✅ {name}: {len(df)} clientes, sin pedidos válidos "
+                      f"({time.perf_counter() - start:.2f} s; {latency:.1f} s desde la descarga)")
+        return True
+
+    # --- Archivo unificado ---
+
+    def unified_frame(self, nros: Optional[Iterable[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Unificado armado con el resultado en memoria de cada líder, en el orden de unify_campaign.
+        Con nros, sólo las filas de esos Nro (leyendo sólo los archivos en los que aparecen).
+        """
+        if not self.frames:
+            return None
+        if nros is None:
+            frames = [self.frames[path] for path in sorted(self.frames, key=os.path.basename)]
+        else:
+            nros = set(nros)
+            paths = set().union(*(self.nro_paths.get(nro, ()) for nro in nros))
+            frames = [self.frames[path] for path in sorted(paths, key=os.path.basename)]
+            frames = [df[df["Nro"].astype(str).str.strip().isin(nros)] for df in frames]
+            if not frames:
+                return None
+        df = pd.concat(frames, ignore_index=True)
+        return df[[col for col in COLUMNS_ORDER if col in df.columns]]
+
+    def write_conflicts(self, df: pd.DataFrame) -> None:
+        """--conflictos: Nro repetidos con distinto nombre o líder en toda la campaña."""
+        nro = df["Nro"].astype(str).str.strip()
+        repeated = nro.duplicated(keep=False)
+        conflicts = deduplicar.find_conflicts(df[repeated].fillna(""), nro[repeated])
+        if len(conflicts):
+            conflicts.to_csv(self.conflicts_path, index=False, encoding="utf-8")
+
+    def write_output(self) -> None:
+        df = self.unified_frame()
+        if df is None:
+            return
+        if self.conflicts_path and "Nro" in df.columns:
+            self.write_conflicts(df)
+        if not self.formats:
+            return
+        with metrics.stage("escribir_unificado", filas=len(df), formatos=self.formats):
+            try:
+                write_unified(df, self.output_file, self.formats)
+            except Exception as e:
+                print(f"   ❌ Error al guardar el archivo unificado: {e}")
+                return
+        print(f"   Archivo unificado actualizado: {len(df)} registros de {len(self.frames)} líderes.")
+
+    # --- Ciclo ---
+
+    def poll(self) -> int:
+        """Una revisión de la carpeta. Devuelve la cantidad de archivos procesados."""
+        ready, removed = self.scan()
+        for path in removed:
+            print(f"-> {os.path.basename(path)} ya no está en la carpeta: se quita del archivo unificado "
+                  f"(sus pedidos quedan en MySQL).")
+        processed = 0
+        for path in ready:
+            if self.process(path):
+                processed += 1
+        if processed or removed:
+            # El índice de la caché ya lo guardó iter_process_files al procesar cada archivo
+            self.write_output()
+        return processed
+
+    def run(self, interval: float = POLL_INTERVAL, once: bool = False) -> None:
+        try:
+            while True:
+                try:
+                    self.poll()
+                except Exception as e:
+                    # Carpeta inaccesible por un momento (p. ej. unidad de red), caché que no se pudo guardar...
+                    print(f"❌ Error al revisar la carpeta: {type(e).__name__}: {e}")
+                if once and not self.pending:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nVigilancia detenida.")
+        finally:
+            if self.conn is not None:
+                release(self.conn)
+                self.conn = None
+                print("Conexión a MySQL cerrada.")
+            print(f"   Archivos cargados: {self.processed} | Sin datos o con error: {self.failed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vigila la carpeta de una campaña y carga cada archivo de líder "
+                                                 "apenas termina de descargarse.")
+    parser.add_argument("carpeta", help="Carpeta de la campaña (ej. C:\\...\\Minipedido\\C1025)")
+    parser.add_argument("--intervalo", type=float, default=POLL_INTERVAL,
+                        help=f"Segundos entre revisiones de la carpeta (por defecto {POLL_INTERVAL:g}).")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help="Segundos que un archivo debe quedar sin cambios antes de procesarlo "
+                             f"(por defecto {DEBOUNCE_SECONDS:g}).")
+    parser.add_argument("--cargar-existentes", action="store_true",
+                        help="Carga también los archivos que ya estaban en la carpeta al iniciar. Por defecto "
+                             "sólo se unifican y se cargan los que llegan o cambian después.")
+    parser.add_argument("--una-vez", action="store_true",
+                        help="Termina cuando no quedan archivos pendientes (en lugar de seguir vigilando).")
+    parser.add_argument("--convert", action="store_true",
+                        help="Convierte también cada .xls a .xlsx (sólo para archivar).")
+    parser.add_argument("--backend", choices=["auto", "com", "python"], default="auto",
+                        help="Motor de conversión para --convert.")
+    parser.add_argument("--source", choices=["auto", "xls", "xlsx"], default="auto",
+                        help="Archivos a vigilar (ver 2_unificar_excels.py --source).")
+    parser.add_argument("--no-cache", action="store_true", help="No usa la caché de unificación.")
+    parser.add_argument("--formats", nargs="*", choices=OUTPUT_FORMATS, default=WATCH_FORMATS,
+                        help="Formatos del archivo unificado que se reescriben en cada cambio "
+                             "(por defecto parquet; sin valores no se escribe).")
+    parser.add_argument("--skip-orphans", action="store_true",
+                        help="No carga los pedidos de clientes que no están en la tabla clientes.")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE, default=None, metavar="ARCHIVO",
+                        help="Reutiliza el snapshot local del directorio de clientes (ver directorio_clientes.py).")
+    parser.add_argument("--no-rollups", action="store_true",
+                        help="No actualiza los resúmenes por líder y por campaña (ver resumenes.py).")
+    deduplicar.add_arguments(parser)
+    instrumentacion.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentacion.setup(args, "vigilar_campania")
+
+    folder = os.path.normpath(args.carpeta)
+    if not os.path.isdir(folder):
+        print(f"❌ Error: La carpeta '{folder}' no existe.")
+        return
+    campania = subir_pedidos.extract_campania(folder)
+    if not campania:
+        print(f"❌ Error: No se pudo determinar la Campaña (CmmAA) del nombre de la carpeta '{folder}'.")
+        return
+
+    # Las credenciales se piden una sola vez, al iniciar
+    db_config = ask_db_config()
+    backend = conversor.get_backend(args.backend) if args.convert else None
+    watcher = CampaignWatcher(folder, campania, lambda: connect(db_config),
+                              f"{folder}_Unificado.xlsx", args.formats, args.debounce, backend,
+                              args.source, not args.no_cache, args.snapshot, args.skip_orphans,
+                              not args.no_rollups, args.dedup, args.conflictos)
+
+    existing = watcher.mark_existing(load=args.cargar_existentes)
+    if not args.cargar_existentes:
+        watcher.write_output()
+
+    print(f"👀 Vigilando {folder} (campaña {campania}): {existing} archivos al iniciar. "
+          f"Revisión cada {args.intervalo:g} s, debounce {args.debounce:g} s. Ctrl+C para terminar.")
+    watcher.run(args.intervalo, args.una_vez)
+
+
+if __name__ == "__main__":
+    main()